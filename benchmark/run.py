@@ -0,0 +1,298 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Offline export benchmark.
+#
+# Runs real export code paths (LibUtils.FormatValue, VRayStream,
+# ExportUtils.WritePluginParams, nodes/export.py) with plain CPython
+# using stand-ins for 'bpy', 'mathutils' and '_vray_for_blender'.
+#
+# Usage:
+#   python benchmark/run.py [--plugins N] [--frames M] [--animated K]
+#                           [--output result.json]
+#                           [--baseline baseline.json] [--save-baseline]
+#                           [--tolerance 0.1]
+#
+# Exit code is 1 if any benchmark is slower than the baseline
+# by more than the tolerance.
+#
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+
+BenchmarkDir = os.path.dirname(os.path.abspath(__file__))
+AddonDir     = os.path.dirname(BenchmarkDir)
+
+sys.path.insert(0, os.path.join(BenchmarkDir, "standins"))
+sys.path.insert(0, BenchmarkDir)
+
+# Register add-on directory as 'vb30' package without running
+# its __init__.py, which registers Blender classes
+vb30 = types.ModuleType('vb30')
+vb30.__path__ = [AddonDir]
+sys.modules['vb30'] = vb30
+
+import bpy
+
+from vb30.lib import LibUtils
+from vb30.lib import ExportUtils
+from vb30.lib.VRayStream import VRayExportFiles
+from vb30.lib.VRayStream import VRayFilePaths
+from vb30.lib.VRayStream import VRayPluginExporter
+
+import synthetic
+
+
+DefaultBaselineFilepath = os.path.join(BenchmarkDir, "baseline.json")
+
+
+def GetOutput(exportDir, animation, frameStart, frameEnd):
+    pm = VRayFilePaths()
+    pm.setExportDirectory(exportDir)
+    pm.setExportFilename("benchmark")
+    pm.setSeparateFiles(True)
+
+    fm = VRayExportFiles(pm)
+    fm.init()
+
+    o = VRayPluginExporter()
+    o.setFileManager(fm)
+    o.setAnimation(animation)
+    o.setFrameStart(frameStart)
+    o.setFrameEnd(frameEnd)
+    o.setFrameStep(1)
+
+    return o
+
+
+def GetOutputSize(exportDir):
+    return sum(os.path.getsize(os.path.join(exportDir, f)) for f in os.listdir(exportDir))
+
+
+########  ######## ##    ##  ######  ##     ##
+##     ## ##       ###   ## ##    ## ##     ##
+##     ## ##       ####  ## ##       ##     ##
+########  ######   ## ## ## ##       #########
+##     ## ##       ##  #### ##       ##     ##
+##     ## ##       ##   ### ##    ## ##     ##
+########  ######## ##    ##  ######  ##     ##
+
+# Each benchmark returns (number of operations, number of output bytes)
+#
+
+def BenchFormatValue(scene, exportDir):
+    ops = 0
+    nbytes = 0
+    for frame in scene.frames():
+        for plugin in scene.plugins:
+            for value in plugin.getAttrs(frame).values():
+                nbytes += len(LibUtils.FormatValue(value))
+                ops += 1
+    return ops, nbytes
+
+
+def BenchStreamExport(scene, exportDir):
+    o = GetOutput(exportDir, scene.numFrames > 1, 1, scene.numFrames)
+
+    ops = 0
+    for frame in scene.frames():
+        o.setFrame(frame)
+        for plugin in scene.plugins:
+            o.set(plugin.pluginType, plugin.pluginID, plugin.pluginName)
+            o.writeHeader()
+            for attrName, value in plugin.getAttrs(frame).items():
+                o.writeAttibute(attrName, value)
+                ops += 1
+            o.writeFooter()
+    o.done()
+
+    return ops, GetOutputSize(exportDir)
+
+
+def BenchWritePluginParams(scene, exportDir):
+    o = GetOutput(exportDir, scene.numFrames > 1, 1, scene.numFrames)
+
+    pluginModule = synthetic.SyntheticPluginModule(len(scene.plugins[0].staticAttrs) + len(scene.plugins[0].animatedAttrs))
+
+    bus = {
+        'output' : o,
+        'scene'  : bpy.context.scene,
+    }
+
+    listData = [(float(i), float(i), float(i)) for i in range(256)]
+
+    ops = 0
+    for frame in scene.frames():
+        o.setFrame(frame)
+        rnd = random.Random(0)
+        for plugin in scene.plugins:
+            propGroup = pluginModule.getPropGroup(rnd, frame)
+            o.set(pluginModule.TYPE, pluginModule.ID, plugin.pluginName)
+            o.writeHeader()
+            ExportUtils.WritePluginParams(bus, pluginModule, plugin.pluginName, propGroup, {'list_00' : listData})
+            o.writeFooter()
+            ops += 1
+    o.done()
+
+    return ops, GetOutputSize(exportDir)
+
+
+def BenchNodeExport(scene, exportDir):
+    from vb30.nodes import export as NodesExport
+
+    ops = 0
+    nbytes = 0
+    for frame in scene.frames():
+        for ntree in scene.nodeTrees:
+            outputNode = NodesExport.GetOutputNode(ntree)
+            pluginName = NodesExport.WriteConnectedNode(None, ntree, outputNode.inputs['Material'])
+            nbytes += len(pluginName)
+            ops += 1
+    return ops, nbytes
+
+
+Benchmarks = (
+    ('format_value',        BenchFormatValue),
+    ('stream_export',       BenchStreamExport),
+    ('write_plugin_params', BenchWritePluginParams),
+    ('node_export',         BenchNodeExport),
+)
+
+
+def RunBenchmark(benchFunc, scene, repeat):
+    best = None
+    for i in range(repeat):
+        exportDir = tempfile.mkdtemp(prefix="vb30_benchmark_")
+        try:
+            ts = time.perf_counter()
+            ops, nbytes = benchFunc(scene, exportDir)
+            te = time.perf_counter() - ts
+        finally:
+            shutil.rmtree(exportDir, ignore_errors=True)
+        if best is None or te < best[0]:
+            best = (te, ops, nbytes)
+
+    # Separate run for memory, tracing slows down the code
+    exportDir = tempfile.mkdtemp(prefix="vb30_benchmark_")
+    try:
+        tracemalloc.start()
+        benchFunc(scene, exportDir)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(exportDir, ignore_errors=True)
+
+    te, ops, nbytes = best
+
+    return {
+        'seconds'       : te,
+        'ops'           : ops,
+        'ops_per_sec'   : ops / te if te else 0.0,
+        'bytes'         : nbytes,
+        'bytes_per_sec' : nbytes / te if te else 0.0,
+        'peak_memory'   : peak,
+    }
+
+
+def CompareWithBaseline(results, baseline, tolerance):
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if not base or 'ops_per_sec' not in result or not base.get('ops_per_sec'):
+            continue
+        ratio = result['ops_per_sec'] / base['ops_per_sec']
+        result['baseline_ratio'] = ratio
+        if ratio < 1.0 - tolerance:
+            regressions.append("%s: %.1f%% slower than baseline" % (name, (1.0 - ratio) * 100.0))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="V-Ray For Blender offline export benchmark")
+    parser.add_argument('--plugins',  type=int, default=2000, help="Number of plugins")
+    parser.add_argument('--frames',   type=int, default=5,    help="Number of frames")
+    parser.add_argument('--animated', type=int, default=3,    help="Number of animated attributes per plugin")
+    parser.add_argument('--repeat',   type=int, default=3,    help="Number of timed runs, best is reported")
+    parser.add_argument('--only',     action='append', help="Run only this benchmark")
+    parser.add_argument('--output',   help="Write results JSON to file")
+    parser.add_argument('--baseline', default=DefaultBaselineFilepath, help="Baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="Store results as baseline")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="Allowed slowdown against baseline")
+    args = parser.parse_args()
+
+    scene = synthetic.SyntheticScene(args.plugins, args.frames, args.animated)
+
+    results = {
+        'python'     : platform.python_version(),
+        'platform'   : platform.platform(),
+        'parameters' : {
+            'plugins'  : args.plugins,
+            'frames'   : args.frames,
+            'animated' : args.animated,
+        },
+        'benchmarks' : {},
+    }
+
+    for name, benchFunc in Benchmarks:
+        if args.only and name not in args.only:
+            continue
+        try:
+            results['benchmarks'][name] = RunBenchmark(benchFunc, scene, args.repeat)
+        except Exception as e:
+            results['benchmarks'][name] = {'error' : "%s: %s" % (type(e).__name__, e)}
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get('parameters') != results['parameters']:
+            results['baseline_warning'] = "Baseline is generated with different parameters"
+        regressions = CompareWithBaseline(results, baseline, args.tolerance)
+        results['regressions'] = regressions
+
+    resultsJson = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(resultsJson)
+    print(resultsJson)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Minimal '_vray_for_blender' stand-in for the offline benchmark.
+# Native export calls write nothing and return plugin names.
+#
+
+import binascii
+import struct
+
+
+_TransformStruct = struct.Struct('<9f3d')
+
+
+def getTransformHex(tm):
+    data = _TransformStruct.pack(
+        tm[0][0], tm[1][0], tm[2][0],
+        tm[0][1], tm[1][1], tm[2][1],
+        tm[0][2], tm[1][2], tm[2][2],
+        tm[0][3], tm[1][3], tm[2][3],
+    )
+    return 'TransformHex("%s")' % binascii.hexlify(data).decode('ascii').upper()
+
+
+def exportNode(ntreePointer, nodePointer, socketPointer):
+    return "NT%xN%x" % (ntreePointer, nodePointer)
+
+
+def exportMesh(contextPointer, obPointer, geomName, propGroup, outputFile):
+    outputFile.write("\nGeomStaticMesh %s {\n}\n" % geomName)
+
+
+def _NoOp(*args, **kwargs):
+    return None
+
+
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+    return _NoOp
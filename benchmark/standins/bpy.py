@@ -0,0 +1,197 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Minimal 'bpy' stand-in for running export code with plain CPython.
+# Only what the benchmarked modules touch at import and export time
+# is provided; any other type or operator resolves to a dummy.
+#
+
+import os
+import sys
+import tempfile
+import types as _types
+
+
+########  ########   #######  ########   ######
+##     ## ##     ## ##     ## ##     ## ##    ##
+##     ## ##     ## ##     ## ##     ## ##
+########  ########  ##     ## ########   ######
+##        ##   ##   ##     ## ##              ##
+##        ##    ##  ##     ## ##        ##    ##
+##        ##     ##  #######  ##         ######
+
+props = _types.ModuleType('bpy.props')
+
+# Like Blender 2.7x property functions return (function, arguments)
+def _MakeProperty(propName):
+    def prop(**kwargs):
+        return (prop, kwargs)
+    prop.__name__ = propName
+    return prop
+
+for _propName in ('BoolProperty', 'BoolVectorProperty', 'CollectionProperty', 'EnumProperty',
+                  'FloatProperty', 'FloatVectorProperty', 'IntProperty', 'IntVectorProperty',
+                  'PointerProperty', 'StringProperty', 'RemoveProperty'):
+    setattr(props, _propName, _MakeProperty(_propName))
+
+
+######## ##    ## ########  ########  ######
+   ##     ##  ##  ##     ## ##       ##    ##
+   ##      ####   ##     ## ##       ##
+   ##       ##    ########  ######    ######
+   ##       ##    ##        ##             ##
+   ##       ##    ##        ##       ##    ##
+   ##       ##    ##        ########  ######
+
+class bpy_struct:
+    def as_pointer(self):
+        return id(self)
+
+
+class BlendData(bpy_struct):
+    filepath = ""
+
+    def __init__(self):
+        self.objects   = []
+        self.materials = []
+        self.meshes    = []
+        self.images    = []
+        self.groups    = {}
+        self.node_groups = []
+        self.scenes    = []
+        self.lamps     = []
+        self.cameras   = []
+        self.textures  = []
+        self.worlds    = []
+
+
+types = _types.ModuleType('bpy.types')
+types.bpy_struct = bpy_struct
+types.BlendData  = BlendData
+
+_typesCache = {}
+
+def _GetType(typeName):
+    if typeName.startswith('__'):
+        raise AttributeError(typeName)
+    if typeName not in _typesCache:
+        _typesCache[typeName] = type(typeName, (bpy_struct,), {})
+    return _typesCache[typeName]
+
+types.__getattr__ = _GetType
+
+
+#### ##    ##  ######  ########    ###    ##    ##  ######  ########  ######
+ ##  ###   ## ##    ##    ##      ## ##   ###   ## ##    ## ##       ##    ##
+ ##  ####  ## ##          ##     ##   ##  ####  ## ##       ##       ##
+ ##  ## ## ##  ######     ##    ##     ## ## ## ## ##       ######    ######
+ ##  ##  ####       ##    ##    ######### ##  #### ##       ##             ##
+ ##  ##   ### ##    ##    ##    ##     ## ##   ### ##    ## ##       ##    ##
+#### ##    ##  ######     ##    ##     ## ##    ##  ######  ########  ######
+
+class Namespace(_types.SimpleNamespace):
+    def as_pointer(self):
+        return id(self)
+
+
+def _MakeScene():
+    Exporter = Namespace(
+        debug              = False,
+        draft              = False,
+        draft_texture_size = 'NONE',
+        data_format        = 'ZIP',
+        backend            = 'STD',
+        activeLayers       = 'ACTIVE',
+    )
+    VRayDR = Namespace(
+        on           = False,
+        assetSharing = 'TRANSFER',
+    )
+    return Namespace(
+        name   = "Scene",
+        camera = None,
+        objects = [],
+        frame_current = 1,
+        render = Namespace(engine='VRAY_RENDER', fps=24, fps_base=1.0),
+        vray   = Namespace(Exporter=Exporter, VRayDR=VRayDR),
+    )
+
+
+data = BlendData()
+
+context = Namespace(
+    scene = _MakeScene(),
+    user_preferences = Namespace(addons={}, themes=[]),
+)
+
+
+########  ##     ## ##    ##
+##     ## ###   ### ###   ##
+##     ## #### #### ####  ##
+##     ## ## ### ## ## ## ##
+##     ## ##     ## ##  ####
+##     ## ##     ## ##   ###
+########  ##     ## ##    ##
+
+app = _types.ModuleType('bpy.app')
+app.background  = True
+app.version     = (2, 79, 0)
+app.binary_path = sys.executable
+app.handlers    = Namespace(
+    persistent = lambda f: f,
+    **{name : [] for name in ('load_pre', 'load_post', 'save_pre', 'save_post', 'exit',
+                              'frame_change_pre', 'frame_change_post', 'scene_update_pre',
+                              'scene_update_post', 'render_pre', 'render_post',
+                              'new_material', 'object_update')}
+)
+
+utils = _types.ModuleType('bpy.utils')
+_ADDON_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_USER_PATH  = os.path.join(tempfile.gettempdir(), "vb30_benchmark")
+utils.script_paths     = lambda subdir=None: [_ADDON_PATH]
+utils.user_resource    = lambda resourceType, path="", create=False: _USER_PATH
+utils.register_class   = lambda cls: None
+utils.unregister_class = lambda cls: None
+
+path = _types.ModuleType('bpy.path')
+path.abspath  = lambda p, start=None, library=None: p[2:] if p.startswith("//") else p
+path.basename = os.path.basename
+path.clean_name = lambda name, replace="_": name
+
+
+class _Ops:
+    def __getattr__(self, name):
+        return _Ops()
+
+    def __call__(self, *args, **kwargs):
+        return {'FINISHED'}
+
+ops = _Ops()
+
+sys.modules['bpy.props'] = props
+sys.modules['bpy.types'] = types
+sys.modules['bpy.app']   = app
+sys.modules['bpy.utils'] = utils
+sys.modules['bpy.path']  = path
@@ -0,0 +1,104 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Minimal 'mathutils' stand-in for the offline benchmark
+#
+
+
+class Vector:
+    def __init__(self, seq=(0.0, 0.0, 0.0)):
+        self._data = list(seq)
+
+    x = property(lambda self: self._data[0])
+    y = property(lambda self: self._data[1])
+    z = property(lambda self: self._data[2])
+
+    def __getitem__(self, i):
+        return self._data[i]
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __neg__(self):
+        return Vector(-v for v in self._data)
+
+    def copy(self):
+        return Vector(self._data)
+
+
+class Color:
+    def __init__(self, rgb=(0.0, 0.0, 0.0)):
+        self._data = list(rgb)
+
+    r = property(lambda self: self._data[0])
+    g = property(lambda self: self._data[1])
+    b = property(lambda self: self._data[2])
+
+    def __getitem__(self, i):
+        return self._data[i]
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        return iter(self._data)
+
+
+class Matrix:
+    def __init__(self, rows=None):
+        if rows is None:
+            rows = [[1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+        self._rows = [list(row) for row in rows]
+
+    @classmethod
+    def Identity(cls, size):
+        return cls([[1.0 if i == j else 0.0 for j in range(size)] for i in range(size)])
+
+    @classmethod
+    def Translation(cls, v):
+        m = cls.Identity(4)
+        for i in range(3):
+            m._rows[i][3] = v[i]
+        return m
+
+    @property
+    def col(self):
+        return [[row[j] for row in self._rows] for j in range(len(self._rows[0]))]
+
+    def __getitem__(self, i):
+        return self._rows[i]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __mul__(self, other):
+        n = len(self._rows)
+        return Matrix([[sum(self._rows[i][k] * other[k][j] for k in range(n)) for j in range(n)] for i in range(n)])
+
+    def copy(self):
+        return Matrix(self._rows)
@@ -0,0 +1,171 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Synthetic scene generator for the offline benchmark.
+# Generates plugins with static and animated attributes of all
+# commonly exported value types, plugin descriptions for
+# WritePluginParams and material node trees.
+#
+
+import random
+
+import bpy
+import mathutils
+
+
+StaticAttrTypes = ('INT', 'FLOAT', 'BOOL', 'COLOR', 'VECTOR', 'TRANSFORM', 'STRING')
+AnimatedAttrTypes = ('FLOAT', 'COLOR', 'TRANSFORM')
+
+PluginTypes = (
+    ('OBJECT',   'Node'),
+    ('BRDF',     'BRDFVRayMtl'),
+    ('TEXTURE',  'TexBitmap'),
+    ('LIGHT',    'LightOmni'),
+    ('GEOMETRY', 'GeomStaticMesh'),
+)
+
+
+def GetValue(attrType, rnd, frame=0):
+    if attrType == 'INT':
+        return rnd.randint(0, 1000)
+    if attrType == 'FLOAT':
+        return rnd.random() * 10.0 + frame * 0.1
+    if attrType == 'BOOL':
+        return rnd.random() > 0.5
+    if attrType == 'COLOR':
+        return mathutils.Color((rnd.random(), rnd.random(), (rnd.random() + frame * 0.01) % 1.0))
+    if attrType == 'VECTOR':
+        return mathutils.Vector((rnd.random(), rnd.random(), rnd.random()))
+    if attrType == 'TRANSFORM':
+        tm = mathutils.Matrix.Identity(4)
+        tm[0][3] = rnd.random() + frame
+        tm[1][3] = rnd.random()
+        tm[2][3] = rnd.random()
+        return tm
+    return '"%s"' % ("path/to/file_%i.png" % rnd.randint(0, 1000))
+
+
+class SyntheticPlugin:
+    def __init__(self, index, numStatic, numAnimated, rnd):
+        self.pluginType, self.pluginID = PluginTypes[index % len(PluginTypes)]
+        self.pluginName = "%s_%05i" % (self.pluginID, index)
+
+        self.staticAttrs = {
+            "static_%02i" % i : GetValue(StaticAttrTypes[i % len(StaticAttrTypes)], rnd)
+                for i in range(numStatic)
+        }
+
+        self.animatedAttrs = {
+            "animated_%02i" % i : AnimatedAttrTypes[i % len(AnimatedAttrTypes)]
+                for i in range(numAnimated)
+        }
+
+        self.seed = rnd.random()
+
+    def getAttrs(self, frame):
+        rnd = random.Random(self.seed)
+        attrs = dict(self.staticAttrs)
+        for attrName, attrType in self.animatedAttrs.items():
+            attrs[attrName] = GetValue(attrType, rnd, frame)
+        return attrs
+
+
+# Plugin module like the ones in 'plugins' for WritePluginParams
+#
+class SyntheticPluginModule:
+    ID   = 'SyntheticPlugin'
+    TYPE = 'BRDF'
+
+    def __init__(self, numAttrs, numListAttrs=1):
+        self.PluginParams = []
+        for i in range(numAttrs):
+            attrType = StaticAttrTypes[i % len(StaticAttrTypes)]
+            if attrType == 'TRANSFORM':
+                attrType = 'FLOAT'
+            self.PluginParams.append({
+                'attr'    : "param_%02i" % i,
+                'type'    : attrType,
+                'default' : None,
+            })
+        for i in range(numListAttrs):
+            self.PluginParams.append({
+                'attr'    : "list_%02i" % i,
+                'type'    : 'VECTOR_LIST',
+                'default' : None,
+            })
+
+    def getPropGroup(self, rnd, frame):
+        propGroup = bpy.Namespace()
+        for attrDesc in self.PluginParams:
+            if attrDesc['type'] == 'VECTOR_LIST':
+                continue
+            value = GetValue(attrDesc['type'], rnd, frame)
+            if attrDesc['type'] == 'STRING':
+                value = value.strip('"')
+            setattr(propGroup, attrDesc['attr'], value)
+        return propGroup
+
+
+class SyntheticNode(bpy.Namespace):
+    pass
+
+
+class SyntheticNodeTree(bpy.Namespace):
+    pass
+
+
+# Material node tree: output node connected to a chain of nodes
+#
+def GenerateNodeTree(index, numNodes):
+    nodes = []
+    output = SyntheticNode(name="Output", bl_idname='VRayNodeOutputMaterial', inputs={})
+    nodes.append(output)
+
+    prevNode = None
+    for i in range(numNodes):
+        node = SyntheticNode(name="Node%i" % i, bl_idname='VRayNodeBRDFVRayMtl', inputs={})
+        if prevNode:
+            node.inputs['Diffuse'] = bpy.Namespace(links=[bpy.Namespace(from_node=prevNode, from_socket=None)])
+        nodes.append(node)
+        prevNode = node
+
+    output.inputs['Material'] = bpy.Namespace(links=[bpy.Namespace(from_node=prevNode, from_socket=None)])
+
+    return SyntheticNodeTree(name="Material%i" % index, bl_idname='VRayNodeTreeMaterial', nodes=nodes)
+
+
+class SyntheticScene:
+    def __init__(self, numPlugins, numFrames, numAnimated, numStatic=8, numNodeTrees=None, seed=0):
+        rnd = random.Random(seed)
+
+        self.numFrames = numFrames
+        self.plugins = [SyntheticPlugin(i, numStatic, numAnimated, rnd) for i in range(numPlugins)]
+
+        if numNodeTrees is None:
+            numNodeTrees = max(1, numPlugins // 10)
+        self.nodeTrees = [GenerateNodeTree(i, 8) for i in range(numNodeTrees)]
+
+    def frames(self):
+        return range(1, self.numFrames + 1)
@@ -22,9 +22,12 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import collections
 import inspect
 import os
+import queue
 import sys
+import threading
 import traceback
 import time
 import datetime
@@ -55,7 +58,14 @@ def Color(text, color=None):
         return text
 
 
+# Resolved once per export by BeginExport(); None means
+# settings are read from the current scene
+DebugMode = None
+
+
 def IsDebugMode():
+    if DebugMode is not None:
+        return DebugMode
     if hasattr(bpy.context, 'scene'):
         if bpy.context.scene.vray.Exporter.debug:
             return True
@@ -84,11 +94,172 @@ def PrintError(message):
 
 
 def Debug(message, msgType='INFO'):
-    if not IsDebugMode() and msgType in {'INFO'}:
+    if msgType in {'INFO'} and not IsDebugMode():
         return
     PrintInfo(message, msgType)
 
 
+# Export log
+#
+# Levels are resolved once per export into 'LogLevels', so a disabled
+# message costs a dict lookup; arguments are formatted only if written.
+#
+LOG_DEBUG = 10
+LOG_INFO  = 20
+LOG_ERROR = 40
+
+LogLevelNames = {
+    'DEBUG' : LOG_DEBUG,
+    'INFO'  : LOG_INFO,
+    'ERROR' : LOG_ERROR,
+}
+
+LogCategories = ('STREAM', 'SETTINGS', 'NODES', 'DR', 'PROCESS')
+
+# Category -> minimal level written; empty outside of export
+LogLevels = {}
+
+# Last records for inspection after export
+LogRecords = collections.deque(maxlen=4096)
+
+LogWriter = None
+
+# Number of running exports; preview could be exported while
+# production export runs and must not reset its settings
+LogDepth = 0
+LogLock  = threading.Lock()
+
+
+class VRayLogWriter(threading.Thread):
+    def __init__(self, filepath):
+        super().__init__(name="VRayLogWriter", daemon=True)
+        self.queue = queue.Queue()
+        # Opened here so errors are reported to the caller
+        self.file  = open(filepath, 'a', encoding='utf-8')
+
+    def run(self):
+        with self.file as f:
+            while True:
+                line = self.queue.get()
+                if line is None:
+                    break
+                f.write(line)
+                if self.queue.empty():
+                    f.flush()
+
+    def write(self, line):
+        self.queue.put(line)
+
+    def stop(self):
+        self.queue.put(None)
+        self.join()
+
+
+def ParseLogLevels(spec):
+    """Parses "dr=debug,process=info" into {'DR' : 10, 'PROCESS' : 20}"""
+    levels = {}
+    for item in spec.split(','):
+        if not '=' in item:
+            continue
+        category, level = (s.strip().upper() for s in item.split('=', 1))
+        if category in LogCategories and level in LogLevelNames:
+            levels[category] = LogLevelNames[level]
+    return levels
+
+
+def BeginExport(scene):
+    global LogDepth
+
+    with LogLock:
+        LogDepth += 1
+        if LogDepth > 1:
+            return
+        ResolveLogSettings(scene)
+
+
+def ResolveLogSettings(scene):
+    global DebugMode
+    global LogWriter
+
+    VRayExporter = scene.vray.Exporter
+
+    DebugMode = VRayExporter.debug
+
+    LogLevels.clear()
+    LogRecords.clear()
+    for category in LogCategories:
+        LogLevels[category] = LOG_DEBUG if DebugMode else LOG_INFO
+    for category in VRayExporter.log_categories:
+        LogLevels[category] = LOG_DEBUG
+
+    # Targeted logging without touching scene settings
+    if 'VRAY_FOR_BLENDER_LOG' in os.environ:
+        LogLevels.update(ParseLogLevels(os.environ['VRAY_FOR_BLENDER_LOG']))
+
+    if VRayExporter.log_filepath:
+        logFilepath = bpy.path.abspath(VRayExporter.log_filepath)
+        try:
+            LogWriter = VRayLogWriter(logFilepath)
+            LogWriter.start()
+        except Exception as e:
+            LogWriter = None
+            PrintInfo("Error opening log file \"%s\": %s" % (logFilepath, e), msgType='ERROR')
+
+
+def EndExport():
+    global DebugMode
+    global LogWriter
+    global LogDepth
+
+    with LogLock:
+        if not LogDepth:
+            return
+        LogDepth -= 1
+        if LogDepth:
+            return
+
+        if LogWriter:
+            LogWriter.stop()
+            LogWriter = None
+
+        LogLevels.clear()
+
+        DebugMode = None
+
+
+def IsLogEnabled(category, level=LOG_DEBUG):
+    minLevel = LogLevels.get(category)
+    if minLevel is None:
+        # Not exporting; only debug messages depend on scene settings
+        return level >= LOG_INFO or IsDebugMode()
+    return level >= minLevel
+
+
+def Log(category, level, message, *args):
+    """'message' is formatted with 'args' only if written.
+    Debug messages must not be logged from threads outside of export."""
+    minLevel = LogLevels.get(category)
+    if minLevel is None:
+        if not IsLogEnabled(category, level):
+            return
+    elif level < minLevel:
+        return
+    if args:
+        message = message % args
+
+    LogRecords.append((time.time(), category, level, message))
+
+    if LogWriter:
+        LogWriter.write("%s %-8s %-5s %s\n" % (
+            datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3],
+            category,
+            'ERROR' if level >= LOG_ERROR else 'INFO' if level >= LOG_INFO else 'DEBUG',
+            message,
+        ))
+    else:
+        PrintInfo("%s: %s" % (category, message), msgType='ERROR' if level >= LOG_ERROR else 'INFO')
+
+
 # Prints fancy dict
 #
 def PrintDict(title, params, spacing=2):
@@ -26,11 +26,13 @@ import os
 import sys
 import subprocess
 import ipaddress
+import threading
+import time
 
 import bpy
 import _vray_for_blender
 
-from vb30.lib import SysUtils
+from vb30.lib import SysUtils, DraftUtils, BlenderUtils
 from vb30 import export, debug
 
 from vb30.lib.VRayStream import VRayExportFiles
@@ -48,6 +50,16 @@ if HAS_VB35:
 # This will hold handle to subprocess.Popen to the zmq server if
 # it is started in local mode, and it should be terminated on Shutdown()
 #
+# Server process and heartbeat are owned by a supervisor thread: it polls
+# the process, checks the heartbeat, restarts dead local server with backoff
+# and publishes cached health state. Render and viewport paths only read
+# the cached state and never wait for the process poll or heartbeat.
+#
+# Local server could also be warm started on file load or when switching
+# to V-Ray engine, so the first render doesn't wait for the server startup.
+# Supervisor shuts the server down after configured idle time
+# without active render or viewport sessions.
+#
 class ZMQProcess:
     log_lvl_translate = {
         'ERROR': '4',
@@ -55,14 +67,52 @@ class ZMQProcess:
         'DEBUG': '2',
         'INFO': '1',
     }
-    _zmq_process = None
-    _heartbeat_running = False
+
+    # Supervisor check interval (seconds)
+    check_interval = 0.5
+
+    # Restart backoff (seconds)
+    restart_delay_min = 1.0
+    restart_delay_max = 30.0
+
+    def __init__(self):
+        self._zmq_process = None
+        self._heartbeat_running = False
+        # Set by the supervisor after server restart; heartbeat
+        # is restarted from the main thread
+        self._heartbeat_restart = False
+
+        self._lock = threading.Lock()
+        self._supervisor = None
+        self._supervisor_stop = threading.Event()
+        self._supervised_settings = None
+
+        # Cached health state
+        self._running = False
+        self._heartbeat_latency = None
+        self._heartbeat_time = None
+        self._restarts = 0
+
+        # Set from the main thread, read by the supervisor
+        self._debug = False
+        self._idle_timeout = 0.0
+        self._last_used = time.time()
+        self._spawn_time = None
+
+        # Active render / viewport sessions; server is never idle while > 0
+        self._sessions = 0
 
     def _get_settings(self):
         settings = bpy.context.scene.vray.Exporter
         return settings.zmq_address, str(settings.zmq_port), settings.zmq_log_level
 
-    def start_heartbeat(self):
+    # Local / remote mode and server settings the supervisor was started with
+    #
+    def _get_supervised_settings(self):
+        addr, port, log_lvl = self._get_settings()
+        return self.is_local(), addr, port, log_lvl
+
+    def _get_heartbeat_address(self):
         addr, port, _ = self._get_settings()
         ip = 'localhost'
         try:
@@ -71,14 +121,33 @@ class ZMQProcess:
             debug.PrintError("Failed parsing ip addr from [%s], falling back to %s" % (addr, ip))
             bpy.context.scene.vray.Exporter.zmq_address = ip
 
-        self._heartbeat_running = _vray_for_blender_rt.zmq_heartbeat_start("tcp://%s:%s" % (ip, port))
+        return "tcp://%s:%s" % (ip, port)
+
+    # Heartbeat calls are serialized with the lock: the supervisor
+    # thread checks the heartbeat while the main thread starts / stops it
+    #
+    def start_heartbeat(self):
+        address = self._get_heartbeat_address()
+
+        with self._lock:
+            self._heartbeat_running = _vray_for_blender_rt.zmq_heartbeat_start(address)
         debug.Debug('ZMQ starting heartbeat = %s' % self._heartbeat_running)
 
     def stop_heartbeat(self):
-        _vray_for_blender_rt.zmq_heartbeat_stop()
-        self._heartbeat_running = False
+        with self._lock:
+            _vray_for_blender_rt.zmq_heartbeat_stop()
+            self._heartbeat_running = False
         debug.Debug('ZMQ stopping heartbeat')
 
+    # Heartbeat connection belongs to the dead server process,
+    # restart it after the supervisor has restarted the server
+    #
+    def _check_heartbeat_restart(self):
+        if self._heartbeat_restart:
+            self._heartbeat_restart = False
+            self.stop_heartbeat()
+            self.start_heartbeat()
+
     def use_zmq(self):
         return SysUtils.hasZMQEnabled()
 
@@ -97,42 +166,117 @@ class ZMQProcess:
 
     def check_start(self):
         if self.use_zmq():
-            if self.is_local():
+            self.touch()
+            self._check_heartbeat_restart()
+            if self.is_supervised() and self._get_supervised_settings() != self._supervised_settings:
+                debug.Debug('ZMQ settings changed, restarting server')
+                self._shutdown()
+            if not self.is_supervised():
                 self.start()
-            self.check_heartbeat()
+
+    def touch(self):
+        self._last_used = time.time()
+
+    def acquire(self):
+        with self._lock:
+            self._sessions += 1
+        self.touch()
+
+    def release(self):
+        with self._lock:
+            self._sessions = max(self._sessions - 1, 0)
+        self.touch()
+
+    def warm_start(self):
+        if not self.use_zmq():
+            return
+        if not bpy.context.scene.vray.Exporter.zmq_warm_start:
+            return
+        if not self.is_local() or self.is_supervised():
+            return
+        debug.Debug('ZMQ warm start')
+        self.touch()
+        self.start()
+
+    def is_supervised(self):
+        return self._supervisor is not None and self._supervisor.is_alive()
 
     def is_running(self):
-        running = False
-        if self._zmq_process is not None:
-            self._zmq_process.poll()
+        if self.is_supervised():
+            self._check_heartbeat_restart()
+            return self._running
+        return self._check_running()
+
+    def get_heartbeat_latency(self):
+        return self._heartbeat_latency
+
+    def get_heartbeat_time(self):
+        return self._heartbeat_time
 
-        if self._zmq_process is not None\
-            and self._zmq_process.returncode is None:
-            running = True
+    def get_restarts(self):
+        return self._restarts
+
+    def _process_alive(self):
+        with self._lock:
+            process = self._zmq_process
+        return process is not None and process.poll() is None
+
+    def _check_heartbeat(self):
+        with self._lock:
+            if not self._heartbeat_running:
+                return False
+
+            ts = time.time()
+            alive = _vray_for_blender_rt.zmq_heartbeat_check()
+        if alive:
+            self._heartbeat_time = time.time()
+            self._heartbeat_latency = self._heartbeat_time - ts
+        return alive
+
+    def _check_running(self):
+        running = self._process_alive()
 
         if self._heartbeat_running:
-            running = _vray_for_blender_rt.zmq_heartbeat_check()
+            running = self._check_heartbeat()
             if not running:
                 self.stop_heartbeat()
 
         return running
 
     def start(self):
-        if not self.is_running():
-            if not self.is_local():
-                self.check_heartbeat()
-            else:
-                self._check_process()
+        if self.is_running():
+            return
+
+        if not self.is_local():
+            self.check_heartbeat()
+            self._start_supervisor(None, None)
+        else:
+            cmd, env = self._get_server_command()
+            if cmd is None:
+                return
+            self.start_heartbeat()
+            self._start_process(cmd, env)
+            self._start_supervisor(cmd, env)
+
+    def _shutdown(self):
+        self._stop_supervisor()
+        self.stop_heartbeat()
+
+        with self._lock:
+            process = self._zmq_process
+            self._zmq_process = None
+
+        if process:
+            debug.Debug('Zmq terminating process')
+            process.terminate()
+
+        self._running = False
 
     def stop(self):
-        if self.is_running():
+        if self.is_running() or self.is_supervised():
             try:
                 debug.Debug('Zmq stopped - stopping all viewports')
-                self.stop_heartbeat()
-
-                if self._zmq_process:
-                    debug.Debug('Zmq terminating process')
-                    self._zmq_process.terminate()
+                self._shutdown()
 
                 for area in bpy.context.screen.areas:
                     if area.type == 'VIEW_3D':
@@ -148,43 +292,136 @@ class ZMQProcess:
         self.stop()
         self.check_start()
 
-    def _check_process(self):
+    # Server command line and environment are resolved from the main thread,
+    # supervisor thread must not access Blender data
+    #
+    def _get_server_command(self):
         _, port, log_lvl = self._get_settings()
 
-        if self._zmq_process is not None:
-            self._zmq_process.poll()
-            debug.Debug("ZMQ: %s -> code[%s]" % (self._zmq_process, self._zmq_process.returncode))
+        executable_path = SysUtils.GetZmqPath()
 
-        if self._zmq_process is None or self._zmq_process.returncode is not None:
-            executable_path = SysUtils.GetZmqPath()
+        if not executable_path or not os.path.exists(executable_path):
+            debug.PrintError("Can't find V-Ray ZMQ Server!")
+            return None, None
 
-            if not executable_path or not os.path.exists(executable_path):
-                debug.PrintError("Can't find V-Ray ZMQ Server!")
+        env = os.environ.copy()
+        if sys.platform == "win32":
+            if 'VRAY_ZMQSERVER_APPSDK_PATH' not in env:
+                debug.PrintError('Environment variable VRAY_ZMQSERVER_APPSDK_PATH is missing!')
             else:
-                try:
-                    env = os.environ.copy()
-                    if sys.platform == "win32":
-                        if 'VRAY_ZMQSERVER_APPSDK_PATH' not in env:
-                            debug.PrintError('Environment variable VRAY_ZMQSERVER_APPSDK_PATH is missing!')
-                        else:
-                            appsdk = os.path.dirname(env['VRAY_ZMQSERVER_APPSDK_PATH'])
-                            env['PATH'] = env['PATH'] + os.pathsep + appsdk
-                            env['VRAY_PATH'] = appsdk
-                            old_ld = (os.pathsep + env['LD_LIBRARY_PATH']) if 'LD_LIBRARY_PATH' in env else ''
-                            env['LD_LIBRARY_PATH'] = appsdk + old_ld
-
-                    cmd = [
-                        executable_path,
-                        "-p", port,
-                        "-log", self.log_lvl_translate[log_lvl],
-                        "-vfb"
-                    ]
-                    debug.Debug(' '.join(cmd))
-
-                    self.start_heartbeat()
-                    self._zmq_process = subprocess.Popen(cmd, env=env)
-                except Exception as e:
-                    debug.PrintError(e)
+                appsdk = os.path.dirname(env['VRAY_ZMQSERVER_APPSDK_PATH'])
+                env['PATH'] = env['PATH'] + os.pathsep + appsdk
+                env['VRAY_PATH'] = appsdk
+                old_ld = (os.pathsep + env['LD_LIBRARY_PATH']) if 'LD_LIBRARY_PATH' in env else ''
+                env['LD_LIBRARY_PATH'] = appsdk + old_ld
+
+        cmd = [
+            executable_path,
+            "-p", port,
+            "-log", self.log_lvl_translate[log_lvl],
+            "-vfb"
+        ]
+
+        return cmd, env
+
+    def _start_process(self, cmd, env):
+        debug.Debug(' '.join(cmd))
+        try:
+            process = subprocess.Popen(cmd, env=env)
+        except Exception as e:
+            debug.PrintError(e)
+            return False
+
+        with self._lock:
+            self._zmq_process = process
+            self._spawn_time = time.time()
+        return True
+
+    def _start_supervisor(self, cmd, env):
+        self._stop_supervisor()
+
+        settings = bpy.context.scene.vray.Exporter
+
+        self._debug = debug.IsDebugMode()
+        self._idle_timeout = settings.zmq_idle_timeout * 60.0
+        self._supervised_settings = self._get_supervised_settings()
+
+        self._supervisor_stop.clear()
+        self._supervisor = threading.Thread(
+            target=self._supervise,
+            args=(cmd, env),
+            name="VRayZmqSupervisor",
+        )
+        self._supervisor.daemon = True
+        self._supervisor.start()
+
+    def _stop_supervisor(self):
+        if self._supervisor is None:
+            return
+        self._supervisor_stop.set()
+        if self._supervisor is not threading.current_thread():
+            self._supervisor.join(self.check_interval * 4)
+        self._supervisor = None
+
+    # Runs in the supervisor thread: Debug() and PrintError() read scene
+    # settings through bpy.context, so only PrintInfo() is used here
+    #
+    def _supervise(self, cmd, env):
+        restart_delay = self.restart_delay_min
+        restart_time  = None
+
+        while not self._supervisor_stop.is_set():
+            if cmd is not None:
+                alive = self._process_alive()
+                if alive:
+                    restart_delay = self.restart_delay_min
+                    restart_time  = None
+                else:
+                    now = time.time()
+                    if restart_time is None:
+                        debug.PrintInfo("ZMQ server is not running, restarting in %.1f sec" % restart_delay, msgType='ERROR')
+                        restart_time = now + restart_delay
+                    elif now >= restart_time:
+                        if self._start_process(cmd, env):
+                            self._restarts += 1
+                            self._heartbeat_restart = True
+                        restart_delay = min(restart_delay * 2.0, self.restart_delay_max)
+                        restart_time  = None
+            else:
+                alive = True
+
+            if self._heartbeat_running:
+                self._running = alive and self._check_heartbeat()
+            else:
+                self._running = alive and cmd is not None
+
+            if self._running and self._spawn_time is not None:
+                if self._debug:
+                    debug.PrintInfo("ZMQ server ready in %.2f sec" % (time.time() - self._spawn_time))
+                self._spawn_time = None
+
+            if cmd is not None and self._idle_timeout > 0.0 and not self._sessions:
+                if time.time() - self._last_used > self._idle_timeout:
+                    self._idle_shutdown()
+                    break
+
+            self._supervisor_stop.wait(self.check_interval)
+
+    # Called from the supervisor thread; heartbeat is left running and
+    # will be restarted with the server on the next check_start()
+    #
+    def _idle_shutdown(self):
+        with self._lock:
+            process = self._zmq_process
+            self._zmq_process = None
+            self._spawn_time = None
+
+        if process and process.poll() is None:
+            if self._debug:
+                debug.PrintInfo("ZMQ server is idle, shutting down")
+            process.terminate()
+
+        self._running = False
 
 if HAS_ZMQ:
     ZMQ = ZMQProcess()
@@ -200,6 +437,8 @@ def init():
 
 
 def shutdown():
+    DraftUtils.TextureCache.shutdown()
+
     _vray_for_blender.free()
     if HAS_VB35:
         _vray_for_blender_rt.unload()
@@ -249,6 +488,7 @@ class VRayRendererRT(VRayRendererBase):
     def __init__(self):
         debug.Debug("__init__()")
         self.renderer = None
+        self.zmq_session = False
 
     def __del__(self):
         debug.Debug("__del__()")
@@ -256,6 +496,16 @@ class VRayRendererRT(VRayRendererBase):
         if hasattr(self, 'renderer') and self.renderer is not None:
             _vray_for_blender_rt.free(self.renderer)
 
+        if getattr(self, 'zmq_session', False):
+            ZMQ.release()
+
+    # Keeps the server from idle shutdown while this engine renders
+    #
+    def _acquire_zmq(self):
+        if self.renderer and not self.zmq_session:
+            ZMQ.acquire()
+            self.zmq_session = True
+
     # Production rendering
     #
     def update(self, data, scene):
@@ -276,6 +526,7 @@ class VRayRendererRT(VRayRendererBase):
                 }
 
                 self.renderer = _vray_for_blender_rt.init(**arguments)
+                self._acquire_zmq()
 
             if self.renderer:
                 _vray_for_blender_rt.update(self.renderer)
@@ -306,11 +557,13 @@ class VRayRendererRT(VRayRendererBase):
                 data=bpy.data.as_pointer(),
                 scene=bpy.context.scene.as_pointer(),
             )
+            self._acquire_zmq()
 
         if self.renderer:
             _vray_for_blender_rt.view_update(self.renderer)
 
     def _view_draw(self, context):
+        ZMQ.touch()
         if self.renderer:
             _vray_for_blender_rt.view_draw(self.renderer)
 
@@ -330,14 +583,39 @@ def GetRegClasses():
     return reg_classes
 
 
+@bpy.app.handlers.persistent
+def zmq_warm_start(e):
+    ZMQ.warm_start()
+
+
+# Warm start the server when V-Ray becomes the active engine
+#
+_activeEngine = None
+
+@bpy.app.handlers.persistent
+def zmq_engine_switch(scene):
+    global _activeEngine
+    renderEngine = scene.render.engine
+    if renderEngine != _activeEngine:
+        _activeEngine = renderEngine
+        if renderEngine == VRayRendererRT.bl_idname:
+            ZMQ.warm_start()
+
+
 def register():
     for regClass in GetRegClasses():
         bpy.utils.register_class(regClass)
 
     if HAS_ZMQ:
         bpy.app.handlers.load_post.append(lambda: ZMQ.check_heartbeat())
+        BlenderUtils.AddEvent(bpy.app.handlers.load_post, zmq_warm_start)
+        BlenderUtils.AddEvent(bpy.app.handlers.scene_update_post, zmq_engine_switch)
 
 
 def unregister():
     for regClass in GetRegClasses():
         bpy.utils.unregister_class(regClass)
+
+    if HAS_ZMQ:
+        BlenderUtils.DelEvent(bpy.app.handlers.load_post, zmq_warm_start)
+        BlenderUtils.DelEvent(bpy.app.handlers.scene_update_post, zmq_engine_switch)
@@ -32,7 +32,8 @@ from vb30.lib.VRayStream import VRayExportFiles
 from vb30.lib.VRayStream import VRayPluginExporter
 from vb30.lib.VRayStream import VRayFilePaths
 
-from vb30.lib import SysUtils, BlenderUtils
+from vb30.lib import SysUtils, BlenderUtils, PreviewUtils, VisibilityUtils, CostUtils
+from vb30.lib import GeomCacheUtils, AnalyzeUtils, NameUtils, AssetUtils
 
 from vb30.nodes import export as NodesExport
 
@@ -43,6 +44,8 @@ from vb30.exporting import exp_frame
 from vb30.exporting import exp_run
 from vb30.exporting import exp_anim_full
 from vb30.exporting import exp_anim_camera_loop
+from vb30.exporting import exp_render_layers
+from vb30.exporting import exp_load
 
 from vb30 import debug
 
@@ -68,7 +71,10 @@ def Export(bus, scene, engine, isPreview=False):
 
     exp_channels.ExportRenderElements(bus)
 
-    if VRayExporter.animation_mode in {'FRAMEBYFRAME', 'NONE'}:
+    if VRayExporter.animation_mode == 'NONE' and VRayExporter.use_render_layers and not isPreview:
+        err = exp_render_layers.ExportRenderLayers(bus)
+
+    elif VRayExporter.animation_mode in {'FRAMEBYFRAME', 'NONE'}:
         err = exp_frame.ExportSingleFrame(bus)
 
     elif VRayExporter.animation_mode == 'CAMERA_LOOP':
@@ -140,8 +146,45 @@ def ExportEx(bus):
     o.setFileManager(fm)
     o.setPreview(engine.is_preview)
 
+    if not engine.is_preview:
+        AnalyzeUtils.LastExportFilepath = fm.getOutputFilepath()
+
     bus['exporter'] = exp_init.InitExporter(bus)
 
+    # Names are memoized per export; renamed / deleted datablocks
+    # must not keep their old names or collision slots
+    NameUtils.NameRegistry.reset()
+
+    # Resolved paths and created directories are memoized per export;
+    # own instance, so concurrent preview export doesn't reset it
+    bus['paths'] = AssetUtils.VRayPathService()
+
+    # Resolves hide / include lists; reused for all exported frames
+    bus['visibility'] = VisibilityUtils.VRayVisibilityResolver(scene)
+
+    # Cached files are included by absolute path from the local user
+    # cache, render nodes can't read them
+    bus['geometryCache'] = None
+    if VRayExporter.geometry_cache and VRayExporter.use_python_instancer and not VRayDR.on:
+        GeomCacheUtils.GeometryCache.setCacheDir(bpy.path.abspath(VRayExporter.geometry_cache_dir))
+        GeomCacheUtils.GeometryCache.resetStats()
+        bus['geometryCache'] = GeomCacheUtils.GeometryCache
+
+    if VRayExporter.cost_check and not engine.is_preview:
+        reportFilepath = os.path.join(pm.getExportDirectory(), "%s_cost.json" % pm.getExportFilename())
+
+        # Estimate is advisory: never abort the export on its errors
+        try:
+            stats = CostUtils.Estimate(bus, reportFilepath)
+        except Exception as e:
+            debug.ExceptionInfo(e)
+            debug.PrintError("Cost estimate failed; skipping")
+        else:
+            warning = CostUtils.CheckThresholds(scene, stats)
+            if warning:
+                debug.PrintError(warning)
+                engine.report({'WARNING'}, warning)
+
     try:
         # We do everything here basically because we want to close files
         # if smth goes wrong...
@@ -197,10 +240,46 @@ def ExportEx(bus):
         exp_init.ShutdownExporter(bus)
         o.done()
 
+    if bus['geometryCache']:
+        bus['geometryCache'].printStats()
+    NameUtils.NameRegistry.printStats()
+    bus['paths'].printStats()
+
+    # Referenced assets for DR transfer and analysis
+    if not engine.is_preview and err is None:
+        bus['paths'].writeManifest(os.path.join(pm.getExportDirectory(), "%s_assets.json" % pm.getExportFilename()))
+
     return err
 
 
+def GetPreviewCacheKey(bus):
+    scene = bus['scene']
+    o     = bus['output']
+
+    previewType = 'MATERIAL'
+    if BlenderUtils.IsPreviewWorld(scene):
+        previewType = 'WORLD'
+    elif BlenderUtils.IsTexturePreview(scene):
+        previewType = 'TEXTURE'
+
+    try:
+        return PreviewUtils.Cache.getKey(o.getFileManager().getOutputFilepath(), previewType)
+    except Exception as e:
+        debug.ExceptionInfo(e)
+    return None
+
+
 def ExportAndRun(engine, scene):
+    # Log levels are resolved once here, not per message,
+    # and apply to both export and renderer start
+    try:
+        debug.BeginExport(bpy.context.scene)
+        return ExportAndRunEx(engine, scene)
+    finally:
+        debug.EndExport()
+
+
+def ExportAndRunEx(engine, scene):
     if engine.test_break():
         return "Export is interrupted!"
 
@@ -246,10 +325,34 @@ def ExportAndRun(engine, scene):
     if err is not None:
         return err
 
+    previewKey = None
+    if engine.is_preview and bpy.context.scene.vray.Exporter.preview_cache:
+        previewKey = GetPreviewCacheKey(bus)
+        if previewKey is not None:
+            imageFile = PreviewUtils.Cache.get(previewKey, ".exr")
+            if imageFile:
+                debug.Debug("Preview cache: Using cached image")
+                exp_load.LoadImageFile(scene, engine, imageFile)
+                return None
+
+            # Remove previous preview image, so we never
+            # cache an image of some other material
+            previewImageFile = o.getFileManager().getPathManager().getImgLoadFilepath()
+            if os.path.exists(previewImageFile):
+                try:
+                    os.remove(previewImageFile)
+                except OSError:
+                    previewKey = None
+
     err = exp_run.RunEx(bus)
     if err is not None:
         return err
 
+    if previewKey is not None and not engine.test_break():
+        maxSize = bpy.context.scene.vray.Exporter.preview_cache_size * 1024 * 1024
+        PreviewUtils.Cache.store(previewKey, previewImageFile, maxSize)
+        PreviewUtils.Cache.printStats()
+
     return None
 
 
@@ -268,6 +371,13 @@ def RenderScene(engine, scene):
 
     err = None
 
+    if engine.is_preview:
+        # Preview scene doesn't have our settings,
+        # use settings from the actual scene
+        previewDelay = bpy.context.scene.vray.Exporter.preview_delay / 1000.0
+
+        return PreviewUtils.RenderPreview(engine, scene, ExportAndRun, previewDelay)
+
     if VRayExporter.animation_mode == 'FRAMEBYFRAME':
         # Store current frame
         selected_frame = scene.frame_current
@@ -22,10 +22,15 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import os
+
 import bpy
 
 import _vray_for_blender
 
+from vb30.lib import LibUtils
+from vb30.lib.VRayStream import VRaySimplePluginExporter
+
 from vb30 import debug
 
 from . import exp_camera, exp_scene, exp_init
@@ -49,6 +54,88 @@ def IsHideFromViewUsed(cameras):
     return False
 
 
+def GetEnabledCameraPlugins(camera):
+    VRayCamera = camera.data.vray
+
+    enabled = []
+    for pluginName in {'SettingsMotionBlur', 'SettingsCameraDof', 'CameraPhysical'}:
+        propGroup = getattr(VRayCamera, pluginName)
+        for enableAttr in {'use', 'on'}:
+            if hasattr(propGroup, enableAttr) and getattr(propGroup, enableAttr):
+                enabled.append(pluginName)
+    return sorted(enabled)
+
+
+def IsCameraPluginsDiffer(cameras):
+    # Override file can't remove a plugin defined in the shared scene,
+    # so disabled camera plugins must be the same for all cameras
+    enabled = GetEnabledCameraPlugins(cameras[0])
+    for camera in cameras[1:]:
+        if GetEnabledCameraPlugins(camera) != enabled:
+            return True
+    return False
+
+
+def GetCameraImgFilepath(pm, camera):
+    imgFilename = pm.getImgFilename()
+    if not imgFilename:
+        return None
+
+    name, ext = os.path.splitext(imgFilename)
+
+    return os.path.join(pm.getImgDirpath(), "%s_%s%s" % (name, LibUtils.CleanString(camera.name), ext))
+
+
+@debug.TimeIt
+def ExportCameraLoopSplit(bus, cameras):
+    """Exports the scene once and a camera override file per camera;
+    override file includes the shared scene and redefines camera plugins"""
+    o = bus['output']
+
+    fm = o.getFileManager()
+    pm = fm.getPathManager()
+
+    # Shared scene is exported with the first camera
+    bus['camera'] = cameras[0]
+
+    err = exp_scene.ExportScene(bus)
+    if err is not None:
+        return err
+
+    sceneFilepath = fm.getOutputFilepath()
+    basePath      = os.path.splitext(sceneFilepath)[0]
+
+    jobs = []
+    for camera in cameras:
+        overrideFilepath = "%s_%s.vrscene" % (basePath, LibUtils.CleanString(camera.name))
+
+        with open(overrideFilepath, 'w') as f:
+            f.write("// V-Ray For Blender\n")
+            f.write("// Camera Loop: %s\n" % camera.name)
+            f.write('\n#include "%s"\n' % os.path.basename(sceneFilepath))
+
+            cameraBus = dict(bus)
+            cameraBus['output'] = VRaySimplePluginExporter(outputFile=f)
+            cameraBus['camera'] = camera
+
+            exp_camera.ExportCamera(cameraBus)
+
+        jobs.append({
+            'name'      : camera.name,
+            'sceneFile' : overrideFilepath,
+            'imgFile'   : GetCameraImgFilepath(pm, camera),
+        })
+
+    bus['camera'] = cameras[0]
+    bus['renderJobs'] = {
+        'title'     : "Camera Loop",
+        'processes' : bus['scene'].vray.Exporter.camera_loop_processes,
+        'jobs'      : jobs,
+    }
+
+    return None
+
+
 @debug.TimeIt
 def ExportCameraLoop(bus):
     scene  = bus['scene']
@@ -65,6 +152,16 @@ def ExportCameraLoop(bus):
 
     cameras = sorted(cameras, key=lambda c: c.name)
 
+    if VRayExporter.camera_loop_split:
+        if IsHideFromViewUsed(cameras):
+            debug.PrintError('"Export Once" Camera Loop doesn\'t support "Hide From View"; exporting as animation')
+        elif IsCameraPluginsDiffer(cameras):
+            debug.PrintError('"Export Once" Camera Loop requires the same Physical Camera, DoF and Motion Blur state for all cameras; exporting as animation')
+        elif VRayScene.VRayDR.on and VRayScene.VRayDR.assetSharing == 'TRANSFER':
+            debug.PrintError('"Export Once" Camera Loop doesn\'t support "Transfer Assets"; exporting as animation')
+        else:
+            return ExportCameraLoopSplit(bus, cameras)
+
     # We will create animated camera from 'cameras'
     o.setAnimation(True)
     o.setFrameStart(1)
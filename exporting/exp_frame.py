@@ -29,6 +29,8 @@ from vb30.lib import BlenderUtils
 
 from . import exp_init
 from . import exp_scene
+from . import exp_camera
+from . import exp_objects
 from . import exp_anim_full
 
 
@@ -80,6 +82,94 @@ def GetMotionBlurFrames(bus):
     return mb_duration, mb_interval_center
 
 
+def IsDeforming(ob):
+    VRayObject = ob.vray
+    return VRayObject.motion_blur_deform or VRayObject.subframes > 0
+
+
+def UpdateMovingObjects(scene, matrices, moving):
+    """Adds pointers of the objects with world matrix different from
+    the first motion blur sample to 'moving'; on the first sample
+    'matrices' is empty and is filled instead"""
+    isFirst = not matrices
+
+    for ob in scene.objects:
+        key = ob.as_pointer()
+        if key in moving:
+            continue
+
+        # Emitter could stay in place while particles / dupli move
+        if ob.particle_systems or ob.dupli_type != 'NONE':
+            moving.add(key)
+            continue
+
+        tm = tuple(v for row in ob.matrix_world for v in row)
+        if isFirst:
+            matrices[key] = tm
+        elif matrices.get(key) != tm:
+            moving.add(key)
+
+
+@debug.TimeIt
+def ExportTransformSamples(bus):
+    """Motion blur export that re-exports only what changes per sample:
+    the first sample is exported fully, then only camera, transforms of
+    objects moved since the first sample and geometry of "Deforming" objects"""
+    scene = bus['scene']
+    o     = bus['output']
+
+    err = None
+
+    exp_init.InitAnimation(bus, isAnimation=True)
+
+    # Store current frame
+    selected_frame = scene.frame_current
+
+    frames = []
+    f = o.frameStart
+    while(f <= o.frameEnd):
+        frames.append(f)
+        f += o.frameStep
+
+    allObjects = set(ob.as_pointer() for ob in scene.objects)
+    deforming  = set(ob.as_pointer() for ob in scene.objects if IsDeforming(ob))
+
+    # Transforms are compared on the samples exported anyway,
+    # so no extra scene evaluation is needed
+    matrices = {}
+    moving   = set()
+
+    for i, f in enumerate(frames):
+        scene.frame_set(f)
+        o.setFrame(f)
+        _vray_for_blender.setFrame(f)
+
+        UpdateMovingObjects(scene, matrices, moving)
+
+        if i == 0:
+            err = exp_scene.ExportScene(bus)
+        else:
+            static = allObjects - moving - deforming
+
+            err = exp_camera.ExportCamera(bus)
+            if err is None:
+                # Rigid objects: transforms only
+                err = exp_objects.ExportObjects(bus, exportMeshes=False, skipExtra=static | deforming)
+            if err is None and deforming:
+                err = exp_objects.ExportObjects(bus, exportMeshes=True, skipExtra=allObjects - deforming,
+                                                exportInstancers=False)
+        if err is not None:
+            break
+
+    debug.Debug("MB Samples: %i; Static: %i; Deforming: %i; Moving: %i" % (
+        len(frames), len(allObjects - moving - deforming), len(deforming), len(moving - deforming)))
+
+    # Restore selected frame
+    scene.frame_set(selected_frame)
+
+    return err
+
+
 @debug.TimeIt
 def ExportSingleFrame(bus):
     o      = bus['output']
@@ -111,7 +201,10 @@ def ExportSingleFrame(bus):
         o.setFrameEnd(frameEnd)
         o.setFrameStep(frameStep)
 
-        err = exp_anim_full.ExportFullRange(bus)
+        if VRayExporter.motion_blur_sampling == 'TRANSFORM':
+            err = ExportTransformSamples(bus)
+        else:
+            err = exp_anim_full.ExportFullRange(bus)
 
     else:
         _vray_for_blender.setFrame(scene.frame_current)
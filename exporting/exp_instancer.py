@@ -0,0 +1,483 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import array
+import binascii
+import struct
+
+import bpy
+import mathutils
+
+import _vray_for_blender
+
+from vb30.lib import BlenderUtils, LibUtils
+from vb30.nodes import export as NodesExport
+
+from vb30 import debug
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Bulk Instancer2 export for particles and dupli groups.
+#
+# Instance transforms are gathered with foreach_get and written as a single
+# Instancer2 plugin per particle system / dupli group. Instanced objects are
+# exported as hidden prototype nodes; emitters and dupli empties are skipped
+# in the native scene export.
+#
+# Prototypes must be meshes with at most one material; otherwise
+# the emitter / dupli group is left to the native exporter.
+#
+
+# Particle alive state values as returned by foreach_get
+ParticleDead   = 1
+ParticleUnborn = 2
+ParticleAlive  = 3
+
+InstanceRenderTypes = {'OBJECT', 'GROUP'}
+
+# TransformHex: 3x3 float matrix (columns) + double offset
+TransformStruct = struct.Struct('<9f3d')
+
+ZeroTransformHex = binascii.hexlify(TransformStruct.pack(*([0.0] * 12))).decode('ascii').upper()
+
+
+def GetTransformHex(tmData):
+    return binascii.hexlify(tmData).decode('ascii').upper()
+
+
+def GetTransformHexList(tmData, count):
+    hexData = binascii.hexlify(tmData).decode('ascii').upper()
+    itemSize = TransformStruct.size * 2
+    return [hexData[i*itemSize:(i+1)*itemSize] for i in range(count)]
+
+
+def UnpackMatrix(tmData, index):
+    v = TransformStruct.unpack_from(tmData, index * TransformStruct.size)
+    return mathutils.Matrix((
+        (v[0], v[3], v[6], v[9]),
+        (v[1], v[4], v[7], v[10]),
+        (v[2], v[5], v[8], v[11]),
+        (0.0,  0.0,  0.0,  1.0),
+    ))
+
+
+def PackMatrix(tm):
+    return TransformStruct.pack(
+        tm[0][0], tm[1][0], tm[2][0],
+        tm[0][1], tm[1][1], tm[2][1],
+        tm[0][2], tm[1][2], tm[2][2],
+        tm[0][3], tm[1][3], tm[2][3],
+    )
+
+
+# Returns packed TransformHex data for the particles:
+#   location * rotation * size
+#
+def PackParticleTransforms(locations, rotations, sizes):
+    count = len(sizes)
+
+    if numpy is not None:
+        loc  = numpy.frombuffer(locations, dtype=numpy.float32).reshape(count, 3)
+        quat = numpy.frombuffer(rotations, dtype=numpy.float32).reshape(count, 4).astype(numpy.float64)
+        size = numpy.frombuffer(sizes,     dtype=numpy.float32).astype(numpy.float64)
+
+        w, x, y, z = quat[:,0], quat[:,1], quat[:,2], quat[:,3]
+
+        tm = numpy.empty((count, 9), dtype=numpy.float64)
+        # Column 0
+        tm[:,0] = 1.0 - 2.0 * (y*y + z*z)
+        tm[:,1] = 2.0 * (x*y + w*z)
+        tm[:,2] = 2.0 * (x*z - w*y)
+        # Column 1
+        tm[:,3] = 2.0 * (x*y - w*z)
+        tm[:,4] = 1.0 - 2.0 * (x*x + z*z)
+        tm[:,5] = 2.0 * (y*z + w*x)
+        # Column 2
+        tm[:,6] = 2.0 * (x*z + w*y)
+        tm[:,7] = 2.0 * (y*z - w*x)
+        tm[:,8] = 1.0 - 2.0 * (x*x + y*y)
+
+        tm *= size[:,None]
+
+        packed = numpy.empty(count, dtype=[('m', '<f4', 9), ('o', '<f8', 3)])
+        packed['m'] = tm
+        packed['o'] = loc
+        return packed.tobytes()
+
+    data = bytearray(TransformStruct.size * count)
+    for i in range(count):
+        s = sizes[i]
+        w, x, y, z = rotations[i*4:i*4+4]
+        TransformStruct.pack_into(data, i * TransformStruct.size,
+            (1.0 - 2.0 * (y*y + z*z)) * s, (2.0 * (x*y + w*z)) * s, (2.0 * (x*z - w*y)) * s,
+            (2.0 * (x*y - w*z)) * s, (1.0 - 2.0 * (x*x + z*z)) * s, (2.0 * (y*z + w*x)) * s,
+            (2.0 * (x*z + w*y)) * s, (2.0 * (y*z - w*x)) * s, (1.0 - 2.0 * (x*x + y*y)) * s,
+            locations[i*3], locations[i*3+1], locations[i*3+2],
+        )
+    return bytes(data)
+
+
+# Returns packed TransformHex velocities (offset change per frame)
+# from the particle locations on this and the previous frame
+#
+def PackParticleVelocities(locations, prevLocations):
+    count = len(locations) // 3
+
+    if numpy is not None:
+        loc     = numpy.frombuffer(locations,     dtype=numpy.float32).reshape(count, 3)
+        prevLoc = numpy.frombuffer(prevLocations, dtype=numpy.float32).reshape(count, 3)
+
+        packed = numpy.zeros(count, dtype=[('m', '<f4', 9), ('o', '<f8', 3)])
+        packed['o'] = loc.astype(numpy.float64) - prevLoc
+        return packed.tobytes()
+
+    data = bytearray(TransformStruct.size * count)
+    for i in range(count):
+        TransformStruct.pack_into(data, i * TransformStruct.size,
+            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0,
+            locations[i*3]   - prevLocations[i*3],
+            locations[i*3+1] - prevLocations[i*3+1],
+            locations[i*3+2] - prevLocations[i*3+2],
+        )
+    return bytes(data)
+
+
+# Returns (locations, rotations, sizes, prevLocations) of the rendered particles
+#
+def GetParticleData(psys):
+    settings  = psys.settings
+    particles = psys.particles
+
+    count = len(particles)
+
+    locations = array.array('f', [0.0]) * (count * 3)
+    prevLocs  = array.array('f', [0.0]) * (count * 3)
+    rotations = array.array('f', [0.0]) * (count * 4)
+    sizes     = array.array('f', [0.0]) * count
+    states    = array.array('i', [0])   * count
+
+    particles.foreach_get('location',      locations)
+    particles.foreach_get('prev_location', prevLocs)
+    particles.foreach_get('rotation',    rotations)
+    particles.foreach_get('size',        sizes)
+    particles.foreach_get('alive_state', states)
+
+    renderStates = {ParticleAlive}
+    if settings.show_unborn:
+        renderStates.add(ParticleUnborn)
+    if settings.use_dead:
+        renderStates.add(ParticleDead)
+
+    if all(state in renderStates for state in states):
+        return locations, rotations, sizes, prevLocs
+
+    indices = [i for i, state in enumerate(states) if state in renderStates]
+
+    return (
+        array.array('f', (locations[i*3+k] for i in indices for k in range(3))),
+        array.array('f', (rotations[i*4+k] for i in indices for k in range(4))),
+        array.array('f', (sizes[i] for i in indices)),
+        array.array('f', (prevLocs[i*3+k] for i in indices for k in range(3))),
+    )
+
+
+def IsInstancerEmitter(ob):
+    if not ob.vray.use_instancer:
+        return False
+    if ob.type not in {'MESH'} or not len(ob.particle_systems):
+        return False
+    for psys in ob.particle_systems:
+        if psys.settings.render_type not in InstanceRenderTypes:
+            return False
+    return True
+
+
+def IsInstancerDupliGroup(ob):
+    return ob.vray.use_instancer and ob.dupli_type == 'GROUP' and ob.dupli_group is not None
+
+
+def IsEmitterShown(ob):
+    return ob.vray.dupliShowEmitter or any(psys.settings.use_render_emitter for psys in ob.particle_systems)
+
+
+def GetMaterials(ob):
+    return [slot.material for slot in ob.material_slots if slot.material is not None]
+
+
+def GetParticleSources(psys):
+    settings = psys.settings
+    if settings.render_type == 'OBJECT':
+        return [settings.dupli_object] if settings.dupli_object else []
+    return list(settings.dupli_group.objects) if settings.dupli_group else []
+
+
+# Returns why objects can't be exported as prototypes or None
+#
+def GetUnsupportedReason(objects):
+    for ob in objects:
+        if ob.type not in {'MESH'}:
+            return '"%s" is not a mesh' % ob.name
+        if len(GetMaterials(ob)) > 1:
+            return '"%s" has multiple materials' % ob.name
+    return None
+
+
+def GetMaterialName(bus, ob):
+    materials = GetMaterials(ob)
+    if not materials:
+        return None
+    ma = materials[0]
+    if not ma.vray.ntree:
+        return None
+    outputNode = NodesExport.GetNodeByType(ma.vray.ntree, 'VRayNodeOutputMaterial')
+    if not outputNode:
+        return None
+    return NodesExport.WriteConnectedNode(bus, ma.vray.ntree, outputNode.inputs['Material'])
+
+
+# Exports object mesh once per export and writes node with it
+#
+def ExportMeshNode(bus, ob, nodeName, transform, visible=True):
+    o  = bus['output']
+    fm = o.getFileManager()
+
+    exportedMeshes = bus['cache'].setdefault('instancerMeshes', set())
+
+    geometryCache = bus.get('geometryCache')
+    if geometryCache:
+        # Geometry file could be kept from the previous export,
+        # so include cached file from the nodes file.
+        # Identical meshes share the plugin named by their content
+        geomName = geometryCache.exportMesh(bus['scene'], ob, fm.getOutputFile('OBJECT'), exportedMeshes)
+    else:
+        geomName = BlenderUtils.GetObjectName(ob, prefix='IPME')
+        if geomName not in exportedMeshes:
+            if fm.overwriteGeometry:
+                _vray_for_blender.exportMesh(
+                    bpy.context.as_pointer(),
+                    ob.as_pointer(),
+                    geomName,
+                    None,
+                    fm.getOutputFile('GEOMETRY')
+                )
+            exportedMeshes.add(geomName)
+
+    materialName = GetMaterialName(bus, ob)
+
+    o.set('OBJECT', 'Node', nodeName)
+    o.writeHeader()
+    o.writeAttibute('geometry', geomName)
+    if materialName:
+        o.writeAttibute('material', materialName)
+    o.writeAttibute('transform', transform)
+    o.writeAttibute('visible', visible)
+    o.writeFooter()
+
+    return nodeName
+
+
+def ExportPrototype(bus, ob):
+    nodeName = BlenderUtils.GetObjectName(ob, prefix='IP')
+    return ExportMeshNode(bus, ob, nodeName, mathutils.Matrix.Identity(4), visible=False)
+
+
+def WriteInstancer(bus, instancerName, tmHexList, velHexList, nodeNames):
+    o = bus['output']
+
+    instances = ",".join(
+        'List(%i,TransformHex("%s"),TransformHex("%s"),%s)' % (i, tmHex, velHex, nodeName)
+            for i, (tmHex, velHex, nodeName) in enumerate(zip(tmHexList, velHexList, nodeNames))
+    )
+
+    o.set('OBJECT', 'Instancer2', instancerName)
+    o.writeHeader()
+    o.writeAttibute('instances', "List(%i,%s)" % (o.frameNumber, instances) if instances else "List(%i)" % o.frameNumber)
+    o.writeAttibute('use_time_instancing', False)
+    o.writeFooter()
+
+
+def ExportParticleInstancer(bus, ob, psys):
+    settings = psys.settings
+
+    sources = GetParticleSources(psys)
+    if not sources:
+        return 0
+
+    locations, rotations, sizes, prevLocations = GetParticleData(psys)
+    count = len(sizes)
+
+    tmData = PackParticleTransforms(locations, rotations, sizes)
+    tmHexList = GetTransformHexList(tmData, count)
+
+    velHexList = GetTransformHexList(PackParticleVelocities(locations, prevLocations), count)
+
+    protoNames = [ExportPrototype(bus, source) for source in sources]
+
+    if settings.render_type == 'GROUP' and settings.use_whole_group:
+        # Every particle instances the whole group with object offsets
+        dupliOffset = mathutils.Matrix.Translation(-settings.dupli_group.dupli_offset)
+        offsets = [dupliOffset * source.matrix_world for source in sources]
+
+        particleVelHexList = velHexList
+
+        tmHexList  = []
+        velHexList = []
+        nodeNames  = []
+        for i in range(count):
+            particleTm = UnpackMatrix(tmData, i)
+            for offset, protoName in zip(offsets, protoNames):
+                tmHexList.append(GetTransformHex(PackMatrix(particleTm * offset)))
+                velHexList.append(particleVelHexList[i])
+                nodeNames.append(protoName)
+    else:
+        # Objects are picked sequentially
+        nodeNames = [protoNames[i % len(protoNames)] for i in range(count)]
+
+    instancerName = BlenderUtils.GetObjectName(ob, prefix='IPS') + LibUtils.CleanString(psys.name)
+
+    WriteInstancer(bus, instancerName, tmHexList, velHexList, nodeNames)
+
+    return len(nodeNames)
+
+
+# Returns packed TransformHex velocities: change of the transforms
+# per frame since the previous exported frame of this instancer
+#
+def GetDupliVelocities(bus, instancerName, tmData, count):
+    o = bus['output']
+
+    prevTransforms = bus['cache'].setdefault('instancerTransforms', {})
+
+    prevFrame, prevTmData = prevTransforms.get(instancerName, (None, None))
+    prevTransforms[instancerName] = (o.frameNumber, tmData)
+
+    if prevFrame is None or prevFrame >= o.frameNumber or len(prevTmData) != len(tmData):
+        return [ZeroTransformHex] * count
+
+    frameScale = 1.0 / (o.frameNumber - prevFrame)
+
+    velData = bytearray(len(tmData))
+    for i in range(count):
+        v     = TransformStruct.unpack_from(tmData,     i * TransformStruct.size)
+        vPrev = TransformStruct.unpack_from(prevTmData, i * TransformStruct.size)
+        TransformStruct.pack_into(velData, i * TransformStruct.size,
+            *((a - b) * frameScale for a, b in zip(v, vPrev)))
+
+    return GetTransformHexList(velData, count)
+
+
+# Instances of the same group from all dupli group empties are
+# written into a single Instancer2
+#
+def ExportDupliGroupInstancer(bus, group, empties):
+    sources = list(group.objects)
+    if not sources:
+        return 0
+
+    dupliOffset = mathutils.Matrix.Translation(-group.dupli_offset)
+    offsets = [dupliOffset * source.matrix_world for source in sources]
+
+    protoNames = [ExportPrototype(bus, source) for source in sources]
+
+    tmData = bytearray(TransformStruct.size * len(empties) * len(sources))
+    nodeNames = []
+    i = 0
+    for empty in empties:
+        for offset, protoName in zip(offsets, protoNames):
+            tm = empty.matrix_world * offset
+            TransformStruct.pack_into(tmData, i * TransformStruct.size,
+                tm[0][0], tm[1][0], tm[2][0],
+                tm[0][1], tm[1][1], tm[2][1],
+                tm[0][2], tm[1][2], tm[2][2],
+                tm[0][3], tm[1][3], tm[2][3],
+            )
+            nodeNames.append(protoName)
+            i += 1
+
+    instancerName = LibUtils.CleanString("IGR%s" % group.name)
+
+    tmData = bytes(tmData)
+
+    WriteInstancer(bus, instancerName, GetTransformHexList(tmData, i),
+                   GetDupliVelocities(bus, instancerName, tmData, i), nodeNames)
+
+    return i
+
+
+# Exports instancers and returns objects that must be skipped
+# by the native exporter
+#
+@debug.TimeIt
+def ExportInstancers(bus):
+    scene = bus['scene']
+
+    skipObjects = []
+
+    emitters    = []
+    dupliGroups = {}
+
+    for ob in scene.objects:
+        if not BlenderUtils.ObjectVisible(bus, ob):
+            continue
+        if IsInstancerEmitter(ob):
+            sources = [source for psys in ob.particle_systems for source in GetParticleSources(psys)]
+            if IsEmitterShown(ob):
+                sources.append(ob)
+            reason = GetUnsupportedReason(sources)
+            if reason:
+                debug.PrintError("Instancer: %s; exporting \"%s\" particles natively" % (reason, ob.name))
+                continue
+            emitters.append(ob)
+        elif IsInstancerDupliGroup(ob):
+            dupliGroups.setdefault(ob.dupli_group, []).append(ob)
+
+    for group in list(dupliGroups):
+        reason = GetUnsupportedReason(group.objects)
+        if reason:
+            debug.PrintError("Instancer: %s; exporting \"%s\" group natively" % (reason, group.name))
+            del dupliGroups[group]
+
+    numInstances = 0
+
+    for ob in emitters:
+        for psys in ob.particle_systems:
+            numInstances += ExportParticleInstancer(bus, ob, psys)
+
+        if IsEmitterShown(ob):
+            ExportMeshNode(bus, ob, BlenderUtils.GetObjectName(ob), ob.matrix_world)
+
+        skipObjects.append(ob)
+
+    for group, empties in dupliGroups.items():
+        numInstances += ExportDupliGroupInstancer(bus, group, empties)
+        skipObjects.extend(empties)
+
+    debug.Debug("Instancer: %i emitters, %i dupli groups, %i instances" % (len(emitters), len(dupliGroups), numInstances))
+
+    return skipObjects
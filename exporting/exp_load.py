@@ -28,6 +28,25 @@ import os
 from vb30 import debug
 
 
+def GetResolution(scene):
+    resolution_x = int(scene.render.resolution_x * scene.render.resolution_percentage * 0.01)
+    resolution_y = int(scene.render.resolution_y * scene.render.resolution_percentage * 0.01)
+    return resolution_x, resolution_y
+
+
+def LoadImageFile(scene, engine, imageFile):
+    resolution_x, resolution_y = GetResolution(scene)
+
+    result = engine.begin_result(0, 0, resolution_x, resolution_y)
+    layer = result.layers[0]
+    if imageFile:
+        try:
+            layer.load_from_file(imageFile)
+        except Exception as e:
+            debug.Debug("Error loading file! [%s]" % e, msgType='ERROR')
+    engine.end_result(result)
+
+
 def LoadImage(scene, engine, o, p):
     debug.Debug("LoadImage()")
 
@@ -48,22 +67,19 @@ def LoadImage(scene, engine, o, p):
     # There was some version that was always adding frame number
     imageFilePreviewCompat = imageFile.replace("preview.exr", "preview.000%i.exr" % scene.frame_current)
 
-    resolution_x = int(scene.render.resolution_x * scene.render.resolution_percentage * 0.01)
-    resolution_y = int(scene.render.resolution_y * scene.render.resolution_percentage * 0.01)
-
     # TODO: Create VRayImage loader and load image while rendering
     #
     while True:
+        # Preview is obsolete - newer one is already requested
+        if engine.is_preview and engine.test_break():
+            p.kill()
+            break
         if not p.is_running():
-            result = engine.begin_result(0, 0, resolution_x, resolution_y)
-            layer = result.layers[0]
-            try:
-                if os.path.exists(imageFile):
-                    layer.load_from_file(imageFile)
-                elif engine.is_preview and os.path.exists(imageFilePreviewCompat):
-                    layer.load_from_file(imageFilePreviewCompat)
-            except Exception as e:
-                debug.Debug("Error loading file! [%s]" % e, msgType='ERROR')
-            engine.end_result(result)
+            loadFile = None
+            if os.path.exists(imageFile):
+                loadFile = imageFile
+            elif engine.is_preview and os.path.exists(imageFilePreviewCompat):
+                loadFile = imageFilePreviewCompat
+            LoadImageFile(scene, engine, loadFile)
             break
         time.sleep(0.1)
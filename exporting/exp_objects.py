@@ -28,9 +28,11 @@ from vb30.lib import BlenderUtils
 
 from vb30 import debug
 
+from . import exp_instancer
+
 
 @debug.TimeIt
-def ExportObjects(bus, exportNodes=True, exportMeshes=None):
+def ExportObjects(bus, exportNodes=True, exportMeshes=None, skipExtra=None, exportInstancers=True):
     o      = bus['output']
     scene  = bus['scene']
     camera = bus['camera']
@@ -40,10 +42,29 @@ def ExportObjects(bus, exportNodes=True, exportMeshes=None):
 
     # Setup object to skip, this is mainly from "Effect" gizmos
     skipObjects = [ob.as_pointer() for ob in bus['skipObjects']]
+    if skipExtra:
+        skipObjects.extend(skipExtra)
+
+    # Visibility could change with the frame (animated layers),
+    # update before anything checks it
+    if 'visibility' in bus:
+        bus['visibility'].update()
+
+    # Particles and dupli groups exported with Instancer2
+    if VRayExporter.use_python_instancer and exportNodes:
+        if exportInstancers:
+            bus['instancerObjects'] = [ob.as_pointer() for ob in exp_instancer.ExportInstancers(bus)]
+        # Objects handled by the instancer exported earlier for
+        # this frame must not be exported natively either
+        skipObjects.extend(bus.get('instancerObjects', ()))
+
     _vray_for_blender.setSkipObjects(bus['exporter'], skipObjects)
 
     # Setup "Hide From View"
-    hideFromView = BlenderUtils.GetCameraHideLists(camera)
+    if 'visibility' in bus:
+        hideFromView = bus['visibility'].getCameraHideLists(camera)
+    else:
+        hideFromView = BlenderUtils.GetCameraHideLists(camera)
     _vray_for_blender.setHideFromView(bus['exporter'], hideFromView)
 
     # In DR we export to a single file so we must force mesh re-export
@@ -0,0 +1,156 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import os
+
+from vb30.lib import LibUtils, BlenderUtils
+from vb30.lib import VisibilityUtils
+from vb30.lib.VRayStream import VRaySimplePluginExporter
+
+from vb30 import debug
+
+from . import exp_frame
+
+
+def GetRenderLayers(scene):
+    return [srl for srl in scene.render.layers if srl.use]
+
+
+def GetLayerImgFilepath(pm, srl):
+    imgFilename = pm.getImgFilename()
+    if not imgFilename:
+        return None
+
+    name, ext = os.path.splitext(imgFilename)
+
+    return os.path.join(pm.getImgDirpath(), "%s_%s%s" % (name, LibUtils.CleanString(srl.name), ext))
+
+
+# Hides objects that are exported to the shared scene,
+# but are not on the render layer's layers
+#
+def WriteLayerOverrides(bus, o, sharedMask, layerMask):
+    scene      = bus['scene']
+    visibility = bus['visibility']
+
+    for ob in scene.objects:
+        if ob.type in BlenderUtils.NonGeometryTypes and ob.type != 'LAMP':
+            continue
+        if ob.hide_render:
+            continue
+
+        obMask = visibility.getLayerMask(ob)
+        if not obMask & sharedMask or obMask & layerMask:
+            continue
+
+        # Plain sanitized names, same as written by the native exporter
+        if ob.type == 'LAMP':
+            o.set('LIGHT', LibUtils.GetLightPluginName(ob.data), BlenderUtils.GetObjectName(ob))
+            o.writeHeader()
+            o.writeAttibute('enabled', False)
+            o.writeFooter()
+        else:
+            o.set('OBJECT', 'Node', BlenderUtils.GetObjectName(ob))
+            o.writeHeader()
+            o.writeAttibute('visible', False)
+            o.writeFooter()
+
+
+# Exports objects of all enabled render layers into a shared scene once,
+# then writes an override file per render layer, that includes the shared
+# scene and hides objects not on the layer
+#
+@debug.TimeIt
+def ExportRenderLayers(bus):
+    scene = bus['scene']
+    o     = bus['output']
+
+    VRayScene    = scene.vray
+    VRayExporter = VRayScene.Exporter
+
+    renderLayers = GetRenderLayers(scene)
+    if not renderLayers:
+        return "No render layers are enabled!"
+
+    # Override files include the shared scene by name, which
+    # render servers don't have with transferred assets
+    if VRayScene.VRayDR.on and VRayScene.VRayDR.assetSharing == 'TRANSFER':
+        return '"Render Layers" export doesn\'t support "Transfer Assets" Distributed Rendering!'
+
+    fm = o.getFileManager()
+    pm = fm.getPathManager()
+
+    layerMasks = [VisibilityUtils.LayersToMask(srl.layers) for srl in renderLayers]
+
+    sharedMask = 0
+    for layerMask in layerMasks:
+        sharedMask |= layerMask
+
+    # Native exporter takes objects from the "Active Layers" setting,
+    # so layers of all render layers are set active for the shared export
+    activeLayers       = VRayExporter.activeLayers
+    customRenderLayers = tuple(VRayExporter.customRenderLayers)
+
+    VRayExporter.activeLayers       = 'CUSTOM'
+    VRayExporter.customRenderLayers = [bool(sharedMask & (1 << l)) for l in range(20)]
+    bus['visibility'].markDirty()
+
+    try:
+        err = exp_frame.ExportSingleFrame(bus)
+    finally:
+        VRayExporter.activeLayers       = activeLayers
+        VRayExporter.customRenderLayers = customRenderLayers
+        bus['visibility'].markDirty()
+
+    if err is not None:
+        return err
+
+    sceneFilepath = fm.getOutputFilepath()
+    basePath      = os.path.splitext(sceneFilepath)[0]
+
+    jobs = []
+    for srl, layerMask in zip(renderLayers, layerMasks):
+        overrideFilepath = "%s_%s.vrscene" % (basePath, LibUtils.CleanString(srl.name))
+
+        with open(overrideFilepath, 'w') as f:
+            f.write("// V-Ray For Blender\n")
+            f.write("// Render Layer: %s\n" % srl.name)
+            f.write('\n#include "%s"\n' % os.path.basename(sceneFilepath))
+
+            WriteLayerOverrides(bus, VRaySimplePluginExporter(outputFile=f), sharedMask, layerMask)
+
+        jobs.append({
+            'name'      : srl.name,
+            'sceneFile' : overrideFilepath,
+            'imgFile'   : GetLayerImgFilepath(pm, srl),
+        })
+
+    bus['renderJobs'] = {
+        'title'     : "Render Layers",
+        'processes' : VRayExporter.render_layers_processes,
+        'jobs'      : jobs,
+    }
+
+    return None
@@ -22,37 +22,61 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import concurrent.futures
+import subprocess
+import threading
+import time
+
 import bpy
 
 from vb30.lib.VRayProcess import VRayProcess
-from vb30.lib import SysUtils
+from vb30.lib import SysUtils, PreviewUtils, NetworkUtils
 
 from vb30 import debug
 
 from . import exp_load
 
 
-def Run(bus):
-    debug.Debug("Run()")
+def GetRenderhostPort(VRayDR, node):
+    return node.port if node.port_override else VRayDR.port
+
+
+# Checks enabled render hosts and orders them by response time,
+# so V-Ray doesn't wait for the dead hosts connection timeout
+#
+def RankRenderhosts(VRayDR):
+    hosts = []
+    for n in VRayDR.nodes:
+        if n.use:
+            hostname = "%s:%s" % (n.address,n.port) if n.port_override else n.address
+            hosts.append((hostname, n.address, GetRenderhostPort(VRayDR, n)))
+
+    reachable, unreachable = NetworkUtils.Prober.rank(hosts, VRayDR.probeTimeout, VRayDR.probeCacheTime)
 
+    debug.Log('DR', debug.LOG_DEBUG, "Render hosts: %s", ", ".join(reachable))
+    if unreachable:
+        debug.PrintError("Unreachable render hosts: %s" % ", ".join(unreachable))
+
+    if VRayDR.probeUnreachable == 'LAST':
+        return reachable + unreachable
+    return reachable
+
+
+# Process with settings common for all render jobs
+#
+def InitProcess(bus):
     scene  = bus['scene']
-    engine = bus['engine']
-    o      = bus['output']
 
     VRayScene    = scene.vray
     VRayExporter = VRayScene.Exporter
     VRayDR       = VRayScene.VRayDR
-    RTEngine     = VRayScene.RTEngine
 
     vrayCmd = SysUtils.GetVRayStandalonePath()
     if not vrayCmd:
         raise Exception("V-Ray not found!")
 
-    imageToBlender = VRayExporter.animation_mode == 'NONE' and not scene.render.use_border and VRayExporter.auto_save_render and VRayExporter.image_to_blender
-
     p = VRayProcess()
     p.setVRayStandalone(vrayCmd)
-    p.setSceneFile(o.fileManager.getOutputFilepath())
     p.setAutorun(VRayExporter.autorun)
     p.setVerboseLevel(VRayExporter.verboseLevel)
     p.setShowProgress(VRayExporter.showProgress)
@@ -75,17 +99,6 @@ def Run(bus):
 
         p.setRegion(x0, y0, x1, y1, useCrop=scene.render.use_crop_to_border)
 
-    if imageToBlender:
-        p.setWaitExit(True)
-        p.setAutoclose(True)
-
-    if engine.is_preview:
-        p.setPreview(True)
-        p.setShowProgress(0)
-        p.setVerboseLevel(0)
-        p.setAutoclose(True)
-        p.setDisplayVFB(False)
-
     if VRayDR.on:
         if len(VRayDR.nodes):
             transferAssets = VRayDR.assetSharing == 'TRANSFER'
@@ -95,16 +108,51 @@ def Run(bus):
 
             p.setDistributed(2 if VRayDR.renderOnlyOnNodes else 1)
 
-            hosts = []
-            for n in VRayDR.nodes:
-                if n.use:
-                    hosts.append("%s:%s" % (n.address,n.port) if n.port_override else n.address)
+            if VRayDR.probeHosts:
+                hosts = RankRenderhosts(VRayDR)
+            else:
+                hosts = []
+                for n in VRayDR.nodes:
+                    if n.use:
+                        hosts.append("%s:%s" % (n.address,n.port) if n.port_override else n.address)
 
             p.setRenderhosts(hosts)
             p.setPortNumber(VRayDR.port)
             p.setTransferAssets(transferAssets)
             p.setLimitHosts(VRayDR.limitHosts)
 
+    if not scene.render.threads_mode == 'AUTO':
+        p.setThreads(scene.render.threads)
+
+    return p
+
+
+def Run(bus):
+    debug.Log('PROCESS', debug.LOG_DEBUG, "Run()")
+
+    scene  = bus['scene']
+    engine = bus['engine']
+    o      = bus['output']
+
+    VRayScene    = scene.vray
+    VRayExporter = VRayScene.Exporter
+
+    imageToBlender = VRayExporter.animation_mode == 'NONE' and not scene.render.use_border and VRayExporter.auto_save_render and VRayExporter.image_to_blender
+
+    p = InitProcess(bus)
+    p.setSceneFile(o.fileManager.getOutputFilepath())
+
+    if imageToBlender:
+        p.setWaitExit(True)
+        p.setAutoclose(True)
+
+    if engine.is_preview:
+        p.setPreview(True)
+        p.setShowProgress(0)
+        p.setVerboseLevel(0)
+        p.setAutoclose(True)
+        p.setDisplayVFB(False)
+
     if VRayExporter.animation_mode == 'NONE':
         p.setFrames(scene.frame_current)
 
@@ -116,9 +164,6 @@ def Run(bus):
     else:
         p.setFrames(o.frameStart, o.frameEnd, o.frameStep)
 
-    if not scene.render.threads_mode == 'AUTO':
-        p.setThreads(scene.render.threads)
-
     if bpy.app.background or VRayExporter.wait:
         p.setWaitExit(True)
         if bpy.app.background:
@@ -131,15 +176,104 @@ def Run(bus):
 
     p.run()
 
+    if engine.is_preview:
+        PreviewUtils.Scheduler.setProcess(p)
+
     if imageToBlender or engine.is_preview:
         exp_load.LoadImage(scene, engine, o, p)
 
 
+def RenderJob(name, p):
+    ts = time.time()
+    errCode = subprocess.call(p.getCommandLine())
+    return name, errCode, time.time() - ts
+
+
+# Runs from a background thread, so only PrintInfo() is used here
+#
+def RenderJobs(title, jobs, processes):
+    ts = time.time()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(RenderJob, name, p) for name, p in jobs]
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                name, errCode, te = future.result()
+            except Exception as e:
+                debug.PrintInfo("%s: %s" % (title, e), msgType='ERROR')
+                continue
+
+            if errCode:
+                debug.PrintInfo("%s: \"%s\" failed with code %i [%.2f sec]" % (title, name, errCode, te), msgType='ERROR')
+            else:
+                debug.PrintInfo("%s: \"%s\" done [%.2f sec]" % (title, name, te))
+
+    debug.PrintInfo("%s: %i jobs rendered in %.2f sec" % (title, len(jobs), time.time() - ts))
+
+
+# Renders override files written by "Export Once" camera loop or
+# render layers export on a pool of concurrent V-Ray processes.
+#
+# bus['renderJobs'] = {
+#     'title'     : "Camera Loop",
+#     'processes' : 2,
+#     'jobs'      : [{'name' : ..., 'sceneFile' : ..., 'imgFile' : ...}, ...],
+# }
+#
+def RunJobs(bus):
+    debug.Log('PROCESS', debug.LOG_DEBUG, "RunJobs()")
+
+    scene = bus['scene']
+
+    VRayExporter = scene.vray.Exporter
+
+    renderJobs = bus['renderJobs']
+
+    title     = renderJobs['title']
+    processes = renderJobs['processes']
+
+    jobs = []
+    for job in renderJobs['jobs']:
+        p = InitProcess(bus)
+        p.setSceneFile(job['sceneFile'])
+        if job['imgFile']:
+            p.setOutputFile(job['imgFile'])
+        p.setFrames(scene.frame_current)
+
+        # Pool slot is freed only when V-Ray exits
+        p.setAutoclose(True)
+
+        if bpy.app.background and not VRayExporter.display_vfb_in_batch:
+            p.setDisplayVFB(False)
+
+        jobs.append((job['name'], p))
+
+    if not VRayExporter.autorun:
+        for name, p in jobs:
+            debug.Log('PROCESS', debug.LOG_INFO, "Command Line: %s", " ".join(p.getCommandLine()))
+        return
+
+    jobs[0][1].setupEnvironment()
+
+    debug.PrintInfo("%s: rendering %i jobs with %i processes" % (title, len(jobs), processes))
+
+    if bpy.app.background or VRayExporter.wait:
+        RenderJobs(title, jobs, processes)
+    else:
+        t = threading.Thread(target=RenderJobs, args=(title, jobs, processes))
+        t.daemon = True
+        t.start()
+
+
 def RunEx(bus):
-    debug.Debug("RunEx()")
+    debug.Log('PROCESS', debug.LOG_DEBUG, "RunEx()")
 
     try:
-        Run(bus)
+        if bus.get('renderJobs'):
+            RunJobs(bus)
+        else:
+            Run(bus)
     except Exception as e:
         debug.ExceptionInfo(e)
         return "Run error: %s" % e
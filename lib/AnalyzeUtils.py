@@ -0,0 +1,292 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import re
+
+
+# Streams .vrscene file (following "#include" statements) and reports
+# size and composition: bytes and counts per plugin type, largest plugins,
+# animated vs static attributes, interpolate keys and duplicate plugin bodies.
+#
+# Module doesn't depend on Blender and could be used from command line:
+#   python AnalyzeUtils.py scene.vrscene [--top N] [--output report.json]
+#
+
+# Last analysis result, shown in the UI
+LastAnalysis = {}
+
+# Last exported scene filepath, default for the analyzer operator
+LastExportFilepath = ""
+
+PluginStartRe = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)\s+(\S+?)\s*\{(.*)$')
+IncludeRe     = re.compile(r'^#include\s+"([^"]+)"')
+TokenRe       = re.compile(r'[()"]')
+
+
+# Returns number of keys in "interpolate(...)" value,
+# quoted strings (hex data) are skipped without scanning
+#
+def GetInterpolateKeys(value):
+    start = value.find('interpolate(')
+    if start < 0:
+        return 0
+
+    keys  = 0
+    depth = 0
+    pos   = start + len('interpolate')
+    while True:
+        m = TokenRe.search(value, pos)
+        if not m:
+            break
+        c = m.group()
+        pos = m.end()
+        if c == '"':
+            end = value.find('"', pos)
+            if end < 0:
+                break
+            pos = end + 1
+        elif c == '(':
+            depth += 1
+            if depth == 2:
+                keys += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                break
+    return keys
+
+
+class VRaySceneAnalyzer:
+    def __init__(self, topN=20):
+        self.topN = topN
+
+        self.files      = []
+        self.totalBytes = 0
+
+        # Plugin type: [names, blocks, bytes]
+        self.types = {}
+
+        # Plugin name: (type, bytes)
+        self.plugins = {}
+
+        self.animatedAttrs = 0
+        self.staticAttrs   = 0
+
+        # "Type.attr": keys
+        self.interpolateKeys = {}
+
+        # (type, body hash): [bytes, names]
+        self.bodies = {}
+
+    def analyze(self, filepath):
+        self.analyzeFile(os.path.abspath(filepath), set())
+        return self.getReport()
+
+    def analyzeFile(self, filepath, visited):
+        if filepath in visited:
+            return
+        visited.add(filepath)
+
+        if not os.path.exists(filepath):
+            self.files.append({'filepath' : filepath, 'bytes' : 0, 'error' : "File not found"})
+            return
+
+        fileBytes = os.path.getsize(filepath)
+        self.files.append({'filepath' : filepath, 'bytes' : fileBytes})
+        self.totalBytes += fileBytes
+
+        fileDir = os.path.dirname(filepath)
+
+        # Current plugin state
+        pluginType = None
+        pluginName = None
+        pluginSize = 0
+        pluginHash = None
+        attrLine   = ""
+
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                stripped = line.strip()
+
+                if pluginType is None:
+                    if not stripped or stripped.startswith('//'):
+                        continue
+
+                    m = IncludeRe.match(stripped)
+                    if m:
+                        includeFilepath = m.group(1)
+                        if not os.path.isabs(includeFilepath):
+                            includeFilepath = os.path.join(fileDir, includeFilepath)
+                        self.analyzeFile(os.path.normpath(includeFilepath), visited)
+                        continue
+
+                    m = PluginStartRe.match(stripped)
+                    if not m:
+                        continue
+
+                    pluginType, pluginName, rest = m.groups()
+                    pluginSize = len(line)
+                    pluginHash = hashlib.sha1()
+                    attrLine   = ""
+
+                    # Single line plugin
+                    rest = rest.strip()
+                    if rest.endswith('}'):
+                        for attr in rest[:-1].split(';'):
+                            if attr.strip():
+                                self.addAttribute(pluginType, attr.strip() + ';', pluginHash)
+                        self.addPlugin(pluginType, pluginName, pluginSize, pluginHash)
+                        pluginType = None
+                    continue
+
+                pluginSize += len(line)
+
+                if stripped == '}':
+                    if attrLine:
+                        self.addAttribute(pluginType, attrLine, pluginHash)
+                    self.addPlugin(pluginType, pluginName, pluginSize, pluginHash)
+                    pluginType = None
+                    continue
+
+                # Attribute value could span several lines
+                attrLine += stripped
+                if attrLine.endswith(';'):
+                    self.addAttribute(pluginType, attrLine, pluginHash)
+                    attrLine = ""
+
+    def addAttribute(self, pluginType, attrLine, pluginHash):
+        pluginHash.update(attrLine.encode('utf-8'))
+
+        attrName, sep, value = attrLine.partition('=')
+        if not sep:
+            return
+
+        if value.lstrip().startswith('interpolate('):
+            self.animatedAttrs += 1
+            key = "%s.%s" % (pluginType, attrName.strip())
+            self.interpolateKeys[key] = self.interpolateKeys.get(key, 0) + GetInterpolateKeys(value)
+        else:
+            self.staticAttrs += 1
+
+    def addPlugin(self, pluginType, pluginName, pluginSize, pluginHash):
+        typeStats = self.types.setdefault(pluginType, [0, 0, 0])
+
+        # Animated plugins are written once per frame
+        if pluginName not in self.plugins:
+            typeStats[0] += 1
+            self.plugins[pluginName] = (pluginType, pluginSize)
+        else:
+            self.plugins[pluginName] = (pluginType, self.plugins[pluginName][1] + pluginSize)
+
+        typeStats[1] += 1
+        typeStats[2] += pluginSize
+
+        body = self.bodies.setdefault((pluginType, pluginHash.digest()), [pluginSize, set()])
+        body[1].add(pluginName)
+
+    def getReport(self):
+        types = {
+            pluginType : {'count' : s[0], 'blocks' : s[1], 'bytes' : s[2]}
+                for pluginType, s in self.types.items()
+        }
+
+        top = heapq.nlargest(self.topN, self.plugins.items(), key=lambda item: item[1][1])
+
+        duplicates = []
+        for (pluginType, bodyHash), (size, names) in self.bodies.items():
+            if len(names) > 1:
+                duplicates.append({
+                    'type'   : pluginType,
+                    'bytes'  : size,
+                    'count'  : len(names),
+                    'wasted' : size * (len(names) - 1),
+                    'names'  : sorted(names)[:10],
+                })
+        duplicateBytes = sum(d['wasted'] for d in duplicates)
+        duplicates = heapq.nlargest(self.topN, duplicates, key=lambda d: d['wasted'])
+
+        keys = heapq.nlargest(self.topN, self.interpolateKeys.items(), key=lambda item: item[1])
+
+        return {
+            'files'   : self.files,
+            'bytes'   : self.totalBytes,
+            'plugins' : len(self.plugins),
+            'types'   : types,
+            'top'     : [{'name' : name, 'type' : s[0], 'bytes' : s[1]} for name, s in top],
+            'attributes' : {
+                'animated' : self.animatedAttrs,
+                'static'   : self.staticAttrs,
+            },
+            'interpolate_keys' : [{'attr' : attr, 'keys' : n} for attr, n in keys],
+            'duplicates' : duplicates,
+            'duplicate_bytes' : duplicateBytes,
+        }
+
+
+def GetDefaultReportFilepath(filepath):
+    return "%s_analysis.json" % os.path.splitext(filepath)[0]
+
+
+def Analyze(filepath, reportFilepath=None, topN=20):
+    global LastAnalysis
+
+    report = VRaySceneAnalyzer(topN).analyze(filepath)
+
+    if reportFilepath is None:
+        reportFilepath = GetDefaultReportFilepath(filepath)
+    with open(reportFilepath, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    report['report'] = reportFilepath
+
+    LastAnalysis = report
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze .vrscene size and composition")
+    parser.add_argument('filepath', help=".vrscene file")
+    parser.add_argument('--top',    type=int, default=20, help="Number of items in top lists")
+    parser.add_argument('--output', help="Report JSON filepath (stdout if not set)")
+    args = parser.parse_args()
+
+    report = VRaySceneAnalyzer(args.top).analyze(args.filepath)
+
+    reportJson = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(reportJson)
+    else:
+        print(reportJson)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import json
+import os
+
+import bpy
+
+from vb30 import debug
+
+from . import BlenderUtils
+from . import PathUtils
+
+
+# Path service created for each export: memoizes resolved file paths per
+# (path, library), creates each directory at most once, copies each DR asset
+# once and records the set of referenced existing files.
+#
+class VRayPathService:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # (filepath, library filepath) -> full filepath
+        self.resolved = {}
+        # filepath -> filepath with created directory
+        self.dirFilepaths = {}
+        # directory -> created directory
+        self.dirs = {}
+        # source filepath -> DR shared filepath
+        self.drAssets = {}
+
+        # Referenced file assets (resolved source paths)
+        self.assets = set()
+        # Referenced paths that are not existing files
+        self.missing = set()
+
+        self.lookups = 0
+
+    def getFullFilepath(self, filepath, holder=None):
+        library = holder.library.filepath if holder is not None and holder.library else None
+
+        key = (filepath, library)
+
+        fullFilepath = self.resolved.get(key)
+        if fullFilepath is None:
+            fullFilepath = BlenderUtils.GetFullFilepath(filepath, holder)
+            self.resolved[key] = fullFilepath
+        else:
+            self.lookups += 1
+
+        return fullFilepath
+
+    def createDirectory(self, directory):
+        createdDirectory = self.dirs.get(directory)
+        if createdDirectory is None:
+            createdDirectory = PathUtils.CreateDirectory(directory)
+            self.dirs[directory] = createdDirectory
+        return createdDirectory
+
+    def createDirectoryFromFilepath(self, filepath):
+        dirFilepath = self.dirFilepaths.get(filepath)
+        if dirFilepath is None:
+            dirPath, fileName = os.path.split(bpy.path.abspath(filepath))
+            dirFilepath = os.path.join(self.createDirectory(dirPath), fileName)
+            self.dirFilepaths[filepath] = dirFilepath
+        return dirFilepath
+
+    def copyDRAsset(self, bus, filepath):
+        drFilepath = self.drAssets.get(filepath)
+        if drFilepath is None:
+            drFilepath = PathUtils.CopyDRAsset(bus, filepath)
+            self.drAssets[filepath] = drFilepath
+        return drFilepath
+
+    def addAsset(self, filepath):
+        if filepath in self.assets or filepath in self.missing:
+            return
+        if os.path.isfile(filepath):
+            self.assets.add(filepath)
+        else:
+            self.missing.add(filepath)
+
+    def getAssets(self):
+        return sorted(self.assets)
+
+    def writeManifest(self, filepath):
+        manifest = {
+            'assets'    : self.getAssets(),
+            'dr_assets' : {src : str(dst) for src, dst in sorted(self.drAssets.items())},
+        }
+        try:
+            with open(filepath, 'w') as f:
+                json.dump(manifest, f, indent=2)
+        except OSError as e:
+            debug.PrintError("Error writing assets manifest: %s" % e)
+
+    def printStats(self):
+        debug.Debug("Paths: %i resolved, %i lookups, %i directories, %i assets, %i missing" % (
+            len(self.resolved), self.lookups, len(self.dirs), len(self.assets), len(self.missing)))
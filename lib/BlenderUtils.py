@@ -28,7 +28,7 @@ import tempfile
 
 import bpy
 
-from . import LibUtils
+from . import NameUtils
 from . import PathUtils
 
 
@@ -193,7 +193,7 @@ def GetObjectName(ob, prefix=None):
     name = prefix + ob.name
     if ob.library:
         name = 'LI' + PathUtils.GetFilename(ob.library.filepath) + name
-    return LibUtils.CleanString(name)
+    return NameUtils.NameRegistry.getName(ob.as_pointer(), prefix, name)
 
 
 def GetGroupObjects(groupName):
@@ -273,6 +273,9 @@ def ObjectOnVisibleLayers(scene, ob):
 
 
 def ObjectVisible(bus, ob):
+    if 'visibility' in bus:
+        return bus['visibility'].objectVisible(ob)
+
     scene = bus['scene']
 
     VRayScene = scene.vray
@@ -371,7 +374,11 @@ def GetSceneAndCamera(bus):
     return scene, camera
 
 
-def generateVfbTheme(filepath):
+# Hash of the last written VFB theme file content
+VfbThemeHash = None
+
+
+def getVfbThemeData():
     import mathutils
 
     def rgbToHex(color):
@@ -401,7 +408,6 @@ def generateVfbTheme(filepath):
 
     rollout = rgbToHex(themeUI.wcol_box.inner)
 
-    import xml.etree.ElementTree
     from xml.etree.ElementTree import Element, SubElement, tostring
 
     elVfb = Element("VFB")
@@ -420,7 +426,31 @@ def generateVfbTheme(filepath):
     SubElement(elTheme, 'hiLight').text        = shadow
     SubElement(elTheme, 'darkShadow').text     = shadow
 
-    tree = xml.etree.ElementTree.ElementTree(elVfb) 
+    return tostring(elVfb, encoding='utf-8')
+
+
+# Theme file is written only if theme colors have changed.
+# File is replaced atomically, so concurrently starting V-Ray
+# processes never read partially written theme.
+#
+def generateVfbTheme(filepath):
+    global VfbThemeHash
+
+    import hashlib
+
+    themeData = getVfbThemeData()
+    themeHash = hashlib.sha1(themeData).hexdigest()
+
+    if VfbThemeHash is None and os.path.exists(filepath):
+        with open(filepath, 'rb') as f:
+            VfbThemeHash = hashlib.sha1(f.read()).hexdigest()
+
+    if themeHash == VfbThemeHash and os.path.exists(filepath):
+        return
+
+    tmpFilepath = "%s.%i.tmp" % (filepath, os.getpid())
+    with open(tmpFilepath, 'wb') as f:
+        f.write(themeData)
+    os.replace(tmpFilepath, filepath)
 
-    with open(filepath, 'wb') as f:
-        tree.write(f, encoding='utf-8')
+    VfbThemeHash = themeHash
@@ -0,0 +1,262 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import json
+import os
+
+import bpy
+
+from vb30 import debug
+
+from . import BlenderUtils, PathUtils, SysUtils
+from . import VisibilityUtils
+from .VRayStream import PluginTypeToFile
+
+
+# Estimated V-Ray memory per unit; only used to get
+# an order of magnitude before the real export
+#
+BytesPerVertex   = 12          # Vector
+BytesPerTriangle = 12 + 12 + 4 # Face indices, face normals indices, material ID
+BytesPerNormal   = 12 * 3      # Per face-vertex normals
+BytesPerUV       = 12 * 3 + 12 # Per face-vertex UVW + UVW face indices
+
+BytesPerInstance = 64 + 48     # Node plugin + transform
+
+# Last estimate; shown in the UI
+LastEstimate = {}
+
+
+# Sum of (loop_total - 2) over polygons; loop_total of all polygons
+# sums up to the loop count, so no per-polygon access is needed
+#
+def GetTriangleCount(mesh):
+    return len(mesh.loops) - 2 * len(mesh.polygons)
+
+
+def GetSubdivisionFactor(ob):
+    factor = 1
+    for md in ob.modifiers:
+        if not md.show_render:
+            continue
+        if md.type in {'SUBSURF', 'MULTIRES'}:
+            levels = md.render_levels
+            factor *= 4 ** levels
+    return factor
+
+
+def GetInstanceCount(ob):
+    instances = 0
+
+    if ob.dupli_type == 'GROUP' and ob.dupli_group:
+        instances += len(ob.dupli_group.objects)
+
+    for psys in ob.particle_systems:
+        settings = psys.settings
+        if settings.render_type not in {'OBJECT', 'GROUP'}:
+            continue
+        count = settings.count
+        if settings.child_type != 'NONE':
+            count += count * settings.rendered_child_count
+        instances += count
+
+    return instances
+
+
+def GetSceneTextures():
+    textures = {}
+    for image in bpy.data.images:
+        if not image.users or image.source not in {'FILE', 'SEQUENCE', 'TILED'}:
+            continue
+        if not image.filepath:
+            continue
+        filepath = BlenderUtils.GetFullFilepath(image.filepath, image)
+        if filepath in textures:
+            continue
+        try:
+            textures[filepath] = os.path.getsize(filepath)
+        except OSError:
+            textures[filepath] = 0
+    return textures
+
+
+# Walks the scene applying the same visibility rules as object export
+# and estimates what the export / render will cost
+#
+def EstimateSceneCost(bus):
+    scene = bus['scene']
+
+    if 'visibility' in bus:
+        visibility = bus['visibility']
+    else:
+        visibility = VisibilityUtils.VRayVisibilityResolver(scene)
+
+    skipObjects = set(ob.as_pointer() for ob in bus.get('skipObjects', ()))
+
+    stats = {
+        'objects'   : 0,
+        'lights'    : 0,
+        'instances' : 0,
+        'polygons'  : 0,
+        'triangles' : 0,
+        'animated'  : 0,
+        'static'    : 0,
+        'geometry_bytes' : 0,
+        'texture_count'  : 0,
+        'texture_bytes'  : 0,
+        'plugins' : {},
+    }
+
+    pluginCounts = {pluginType : 0 for pluginType in PluginTypeToFile}
+
+    meshes    = set()
+    materials = set()
+
+    for ob in scene.objects:
+        if ob.as_pointer() in skipObjects:
+            continue
+        if not visibility.objectVisible(ob):
+            continue
+
+        if BlenderUtils.IsAnimated(ob) or BlenderUtils.IsDataAnimated(ob):
+            stats['animated'] += 1
+        else:
+            stats['static'] += 1
+
+        if ob.type == 'LAMP':
+            stats['lights'] += 1
+            pluginCounts['LIGHT'] += 1
+            continue
+
+        if ob.type in BlenderUtils.NonGeometryTypes and ob.dupli_type != 'GROUP':
+            continue
+
+        instances = GetInstanceCount(ob)
+        stats['instances'] += instances
+        stats['geometry_bytes'] += instances * BytesPerInstance
+        pluginCounts['OBJECT'] += instances
+
+        for ma in BlenderUtils.ObjectMaterialsIt([ob]):
+            materials.add(ma.name)
+
+        if ob.type != 'MESH':
+            continue
+
+        stats['objects'] += 1
+        pluginCounts['OBJECT'] += 1
+
+        mesh = ob.data
+        factor = GetSubdivisionFactor(ob)
+
+        stats['polygons'] += len(mesh.polygons) * factor
+
+        # Shared mesh data is exported once
+        meshKey = (mesh.name, factor)
+        if meshKey in meshes:
+            continue
+        meshes.add(meshKey)
+
+        pluginCounts['GEOMETRY'] += 1
+
+        triangles = GetTriangleCount(mesh) * factor
+        vertices  = len(mesh.vertices) * factor
+
+        stats['triangles'] += triangles
+        stats['geometry_bytes'] += vertices * BytesPerVertex
+        stats['geometry_bytes'] += triangles * (BytesPerTriangle + BytesPerNormal)
+        stats['geometry_bytes'] += triangles * BytesPerUV * len(mesh.uv_textures)
+
+    textures = GetSceneTextures()
+    stats['texture_count'] = len(textures)
+    stats['texture_bytes'] = sum(textures.values())
+
+    pluginCounts['MATERIAL'] += len(materials)
+    pluginCounts['TEXTURE']  += len(textures)
+    pluginCounts['CAMERA']   += 1
+
+    for pluginType in pluginCounts:
+        fileType = PluginTypeToFile[pluginType]
+        stats['plugins'][fileType] = stats['plugins'].get(fileType, 0) + pluginCounts[pluginType]
+
+    stats['memory_bytes'] = stats['geometry_bytes'] + stats['texture_bytes']
+
+    return stats
+
+
+def FormatBytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024.0:
+            return "%.1f %s" % (size, unit)
+        size /= 1024.0
+    return "%.1f TB" % size
+
+
+def GetDefaultReportFilepath():
+    reportDir = PathUtils.CreateDirectory(os.path.join(PathUtils.GetTmpDirectory(), "vrayblender_%s" % SysUtils.GetUsername()))
+    return os.path.join(reportDir, "scene_cost.json")
+
+
+def WriteReport(stats, filepath):
+    try:
+        with open(filepath, 'w') as f:
+            json.dump(stats, f, indent=4, sort_keys=True)
+    except OSError as e:
+        debug.PrintError("Error writing scene cost report: %s" % e)
+
+
+# Returns warning message if the scene exceeds the configured thresholds
+#
+def CheckThresholds(scene, stats):
+    VRayExporter = scene.vray.Exporter
+
+    warnings = []
+
+    maxMemory = VRayExporter.cost_max_memory * 1024 * 1024 * 1024
+    if maxMemory and stats['memory_bytes'] > maxMemory:
+        warnings.append("estimated memory %s exceeds %.1f GB" % (FormatBytes(stats['memory_bytes']), VRayExporter.cost_max_memory))
+
+    maxPolygons = VRayExporter.cost_max_polygons * 1000000
+    if maxPolygons and stats['polygons'] > maxPolygons:
+        warnings.append("%i polygons exceed %i M" % (stats['polygons'], VRayExporter.cost_max_polygons))
+
+    if not warnings:
+        return None
+
+    return "Scene cost: %s" % "; ".join(warnings)
+
+
+def Estimate(bus, reportFilepath=None):
+    global LastEstimate
+
+    stats = EstimateSceneCost(bus)
+
+    if reportFilepath is None:
+        reportFilepath = GetDefaultReportFilepath()
+    WriteReport(stats, reportFilepath)
+
+    LastEstimate = stats
+    LastEstimate['report'] = reportFilepath
+
+    return stats
@@ -0,0 +1,175 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import concurrent.futures
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+from vb30 import debug
+
+from . import SysUtils
+
+
+ImageExtensions = {
+    '.bmp',
+    '.exr',
+    '.hdr',
+    '.jpeg',
+    '.jpg',
+    '.png',
+    '.tga',
+    '.tif',
+    '.tiff',
+}
+
+
+def GetResizeTool():
+    tool = shutil.which("magick")
+    if tool:
+        return [tool, "convert"]
+    # On Windows "convert" is a system tool
+    if sys.platform != 'win32':
+        tool = shutil.which("convert")
+        if tool:
+            return [tool]
+    return None
+
+
+# Draft renders don't need full resolution textures.
+# Cache keeps downscaled copies of bitmaps keyed by source path,
+# modification time and target size. Copies are generated in background
+# worker threads; until a copy is ready the original file is used.
+#
+class VRayDraftTextureCache:
+    def __init__(self, maxWorkers=2):
+        self.maxWorkers = maxWorkers
+
+        self.lock     = threading.Lock()
+        self.executor = None
+        self.pending  = set()
+        self.failed   = set()
+
+        self.cacheDir = None
+
+    def getCacheDir(self):
+        if self.cacheDir is None:
+            self.cacheDir = os.path.join(SysUtils.GetUserCacheDir(), "draft_textures")
+        if not os.path.exists(self.cacheDir):
+            os.makedirs(self.cacheDir)
+        return self.cacheDir
+
+    def getProxyFilepath(self, srcFilepath, size):
+        fileName = os.path.basename(srcFilepath)
+        fileBase, fileExt = os.path.splitext(fileName)
+
+        key = "%s|%i|%i" % (srcFilepath, os.path.getmtime(srcFilepath), size)
+        keyHash = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+        return os.path.join(self.getCacheDir(), "%s_%i_%s%s" % (fileBase, size, keyHash, fileExt))
+
+    # Returns proxy filepath if it's ready, otherwise schedules
+    # proxy generation and returns the original filepath
+    #
+    def get(self, srcFilepath, size):
+        if os.path.splitext(srcFilepath)[1].lower() not in ImageExtensions:
+            return srcFilepath
+        if not os.path.isfile(srcFilepath):
+            return srcFilepath
+
+        proxyFilepath = self.getProxyFilepath(srcFilepath, size)
+        if os.path.exists(proxyFilepath):
+            return proxyFilepath
+
+        self.schedule(srcFilepath, proxyFilepath, size)
+
+        return srcFilepath
+
+    def schedule(self, srcFilepath, proxyFilepath, size):
+        with self.lock:
+            if proxyFilepath in self.pending or proxyFilepath in self.failed:
+                return
+
+            resizeTool = GetResizeTool()
+            if not resizeTool:
+                debug.PrintError("Draft textures: ImageMagick is not found, using original textures")
+                self.failed.add(proxyFilepath)
+                return
+
+            if self.executor is None:
+                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.maxWorkers)
+
+            self.pending.add(proxyFilepath)
+            self.executor.submit(self.generate, resizeTool, srcFilepath, proxyFilepath, size)
+
+    def generate(self, resizeTool, srcFilepath, proxyFilepath, size):
+        # Write under a temporary per-process name, so the proxy never gets
+        # used half-written; extension is kept for ImageMagick output format
+        fileBase, fileExt = os.path.splitext(proxyFilepath)
+        tmpFilepath = "%s.%i.tmp%s" % (fileBase, os.getpid(), fileExt)
+
+        cmd = resizeTool + [
+            srcFilepath,
+            # ">" means: only shrink larger images
+            "-resize", "%ix%i>" % (size, size),
+            tmpFilepath,
+        ]
+
+        ok = False
+        try:
+            ok = subprocess.call(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0
+            if ok:
+                os.replace(tmpFilepath, proxyFilepath)
+        except Exception as e:
+            debug.PrintError("Draft textures: Error generating \"%s\": %s" % (proxyFilepath, e))
+            ok = False
+
+        with self.lock:
+            self.pending.discard(proxyFilepath)
+            if not ok:
+                self.failed.add(proxyFilepath)
+                if os.path.exists(tmpFilepath):
+                    os.remove(tmpFilepath)
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+            self.pending = set()
+
+
+TextureCache = VRayDraftTextureCache()
+
+
+def GetDraftTexture(filepath, size):
+    try:
+        return TextureCache.get(filepath, size)
+    except OSError as e:
+        debug.PrintError("Draft textures: %s" % e)
+    return filepath
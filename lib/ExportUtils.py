@@ -26,20 +26,28 @@ import os
 
 import bpy
 
-from vb30.debug import Debug, PrintDict
+from vb30.debug import Log, LOG_ERROR
 
-from . import AttributeUtils, PathUtils, BlenderUtils
+from . import AttributeUtils, PathUtils, BlenderUtils, DraftUtils, ListUtils
+
+
+# File attributes written by V-Ray, not referenced assets
+OutputFileAttributes = {
+    'auto_save_file',
+    'img_file',
+}
 
 
 def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
     scene = bus['scene']
     o     = bus['output']
 
-    VRayScene = scene.vray
-    VRayDR    = VRayScene.VRayDR
+    VRayScene    = scene.vray
+    VRayExporter = VRayScene.Exporter
+    VRayDR       = VRayScene.VRayDR
 
     if not hasattr(pluginModule, 'PluginParams'):
-        Debug("Module %s doesn't have PluginParams!" % pluginModule.ID, msgType='ERROR')
+        Log('SETTINGS', LOG_ERROR, "Module %s doesn't have PluginParams!", pluginModule.ID)
         return
 
     for attrDesc in sorted(pluginModule.PluginParams, key=lambda t: t['attr']):
@@ -77,11 +85,17 @@ def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
                 o.writeAttibute(attrName, value)
                 continue
 
+        # List data (sequence, array, memoryview or numpy array)
+        # is encoded according to the export data format
+        if ListUtils.IsListType(attrDesc['type']) and value is not None and not isinstance(value, str):
+            o.writeAttibute(attrName, ListUtils.FormatList(value, attrDesc['type'], VRayExporter.data_format))
+            continue
+
         if value is None:
             value = getattr(propGroup, attrName)
 
         if value is None:
-            Debug("%s.%s value is None!" % (pluginName, attrName), msgType='ERROR')
+            Log('SETTINGS', LOG_ERROR, "%s.%s value is None!", pluginName, attrName)
             continue
 
         if attrDesc['type'] in AttributeUtils.PluginTypes and not value:
@@ -97,12 +111,21 @@ def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
 
             subtype = attrDesc.get('subtype')
             if subtype in {'FILE_PATH', 'DIR_PATH'}:
-                value = BlenderUtils.GetFullFilepath(value)
+                # Path service is set only for scene export
+                paths = bus.get('paths')
+
+                value = paths.getFullFilepath(value) if paths else BlenderUtils.GetFullFilepath(value)
 
                 if subtype == 'FILE_PATH':
+                    if paths and attrName not in OutputFileAttributes:
+                        paths.addAsset(value)
+
+                    if VRayExporter.draft and VRayExporter.draft_texture_size != 'NONE':
+                        value = DraftUtils.GetDraftTexture(value, int(VRayExporter.draft_texture_size))
+
                     if VRayDR.on:
                         if VRayDR.assetSharing == 'SHARE':
-                            value = PathUtils.CopyDRAsset(bus, value)
+                            value = paths.copyDRAsset(bus, value) if paths else PathUtils.CopyDRAsset(bus, value)
 
                 elif subtype == 'DIR_PATH':
                     # Ensure slash at the end of directory path
@@ -118,7 +141,7 @@ def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
                         needCreateDir = False
 
                 if needCreateDir:
-                    value = PathUtils.CreateDirectoryFromFilepath(value)
+                    value = paths.createDirectoryFromFilepath(value) if paths else PathUtils.CreateDirectoryFromFilepath(value)
 
             value = '"%s"' % value
 
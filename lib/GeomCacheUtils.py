@@ -0,0 +1,323 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import array
+import hashlib
+import os
+
+import bpy
+
+import _vray_for_blender
+
+from vb30 import debug, version
+
+from . import SysUtils
+
+
+# Modifiers whose result depends on time (simulations, caches, etc.);
+# current frame is added to the key of the objects using them
+TimeModifiers = {
+    'BUILD',
+    'CLOTH',
+    'COLLISION',
+    'DYNAMIC_PAINT',
+    'EXPLODE',
+    'FLUID_SIMULATION',
+    'MESH_CACHE',
+    'MESH_SEQUENCE_CACHE',
+    'OCEAN',
+    'PARTICLE_INSTANCE',
+    'PARTICLE_SYSTEM',
+    'SMOKE',
+    'SOFT_BODY',
+    'WAVE',
+}
+
+# Modifiers using vertex weights even without "vertex_group" set
+WeightModifiers = {
+    'ARMATURE',
+    'MESH_DEFORM',
+}
+
+# Depth of the referenced objects (modifier objects of the
+# modifier objects, etc.) followed when building the key
+InputsDepth = 2
+
+# Node properties that don't affect export
+NodeLayoutProperties = {
+    'location', 'width', 'width_hidden', 'height', 'dimensions',
+    'select', 'show_options', 'show_preview', 'show_texture', 'hide',
+    'label', 'color', 'use_custom_color',
+}
+
+
+# Content addressed geometry cache for the Bulk Instancer prototypes;
+# scene meshes are written by the native exporter and are not cached.
+#
+# Key is the hash of the mesh data, modifier stack with its inputs and
+# V-Ray geometry settings; meshes are never evaluated to compute it.
+# Geometry plugin is named by the key and written into a file named by it,
+# so identical meshes of different objects, frames and .blend files sharing
+# the same cache directory are written only once.
+#
+class VRayGeometryCache:
+    def __init__(self):
+        self.cacheDir = None
+
+        self.hits   = 0
+        self.misses = 0
+
+    def setCacheDir(self, cacheDir):
+        if not cacheDir:
+            cacheDir = os.path.join(SysUtils.GetUserCacheDir(), "geometry")
+        if not os.path.exists(cacheDir):
+            os.makedirs(cacheDir)
+        self.cacheDir = cacheDir
+
+    def resetStats(self):
+        self.hits   = 0
+        self.misses = 0
+
+    def printStats(self):
+        total = self.hits + self.misses
+        if not total:
+            return
+        debug.Debug("Geometry cache: %i hits, %i misses (%.1f%% hit rate)" % (
+            self.hits, self.misses, 100.0 * self.hits / total))
+
+    @staticmethod
+    def hashCollection(h, collection, attr, typecode, itemSize):
+        if typecode is None:
+            # Boolean properties don't have matching array type
+            data = [False] * (len(collection) * itemSize)
+            collection.foreach_get(attr, data)
+            h.update(bytes(data))
+        else:
+            data = array.array(typecode, [0]) * (len(collection) * itemSize)
+            collection.foreach_get(attr, data)
+            h.update(memoryview(data).cast('B'))
+
+    @staticmethod
+    def hashMesh(h, me):
+        h.update(b"%i %i %i" % (len(me.vertices), len(me.polygons), len(me.loops)))
+
+        VRayGeometryCache.hashCollection(h, me.vertices, 'co',          'f', 3)
+        VRayGeometryCache.hashCollection(h, me.loops,    'vertex_index', 'i', 1)
+        VRayGeometryCache.hashCollection(h, me.loops,    'normal',       'f', 3)
+        VRayGeometryCache.hashCollection(h, me.polygons, 'loop_total',   'i', 1)
+        VRayGeometryCache.hashCollection(h, me.polygons, 'material_index', 'i', 1)
+        VRayGeometryCache.hashCollection(h, me.polygons, 'use_smooth',   None, 1)
+
+        for uvLayer in me.uv_layers:
+            h.update(uvLayer.name.encode('utf-8'))
+            VRayGeometryCache.hashCollection(h, uvLayer.data, 'uv', 'f', 2)
+
+        for colLayer in me.vertex_colors:
+            h.update(colLayer.name.encode('utf-8'))
+            VRayGeometryCache.hashCollection(h, colLayer.data, 'color', 'f', 3)
+
+    @staticmethod
+    def hashShapeKeys(h, me):
+        if not me.shape_keys:
+            return
+        for keyBlock in me.shape_keys.key_blocks:
+            h.update(("%s=%r,%r;" % (keyBlock.name, keyBlock.value, keyBlock.mute)).encode('utf-8'))
+            VRayGeometryCache.hashCollection(h, keyBlock.data, 'co', 'f', 3)
+
+    @staticmethod
+    def hashProperties(h, propGroup, depth=0, skip=frozenset()):
+        """Hashes property values; ID pointers are hashed by name and
+        nested property groups are followed 'depth' levels deep"""
+        for prop in propGroup.bl_rna.properties:
+            if prop.identifier in {'rna_type', 'name'} or prop.identifier in skip:
+                continue
+            if prop.type in {'COLLECTION'} or 'SKIP_SAVE' in prop.options:
+                continue
+            value = getattr(propGroup, prop.identifier)
+            if prop.type in {'POINTER'}:
+                if isinstance(value, bpy.types.ID):
+                    value = value.name
+                elif value is not None and depth > 0:
+                    h.update(prop.identifier.encode('utf-8'))
+                    VRayGeometryCache.hashProperties(h, value, depth - 1, skip)
+                    continue
+                else:
+                    continue
+            elif prop.type in {'BOOLEAN', 'INT', 'FLOAT'} and getattr(prop, 'is_array', False):
+                value = tuple(value)
+            h.update(("%s=%r;" % (prop.identifier, value)).encode('utf-8'))
+
+    @staticmethod
+    def hashNodeTree(h, ntree):
+        for node in ntree.nodes:
+            h.update(("%s:%s;" % (node.bl_idname, node.name)).encode('utf-8'))
+            VRayGeometryCache.hashProperties(h, node, 1, NodeLayoutProperties)
+        for link in ntree.links:
+            h.update(("%s.%s>%s.%s;" % (link.from_node.name, link.from_socket.identifier,
+                                        link.to_node.name, link.to_socket.identifier)).encode('utf-8'))
+
+    @staticmethod
+    def getModifierInputs(mod):
+        """Returns objects and textures the modifier reads"""
+        inputs = []
+        for prop in mod.bl_rna.properties:
+            if prop.type in {'POINTER'}:
+                value = getattr(mod, prop.identifier)
+                if isinstance(value, (bpy.types.Object, bpy.types.Texture)):
+                    inputs.append(value)
+        return inputs
+
+    @staticmethod
+    def hashVertexWeights(h, ob):
+        h.update(repr([vg.name for vg in ob.vertex_groups]).encode('utf-8'))
+        weights = array.array('f', (g.weight for v in ob.data.vertices for g in v.groups))
+        groups  = array.array('i', (g.group for v in ob.data.vertices for g in v.groups))
+        h.update(memoryview(weights).cast('B'))
+        h.update(memoryview(groups).cast('B'))
+
+    @staticmethod
+    def hashTexture(h, tex):
+        VRayGeometryCache.hashProperties(h, tex)
+        image = getattr(tex, 'image', None)
+        if image is not None:
+            h.update(("%s;%s" % (image.filepath, image.source)).encode('utf-8'))
+
+    @staticmethod
+    def hashObjectData(h, ob):
+        """Hashes geometry of the modifier input object"""
+        if ob.type == 'MESH':
+            VRayGeometryCache.hashMesh(h, ob.data)
+            VRayGeometryCache.hashShapeKeys(h, ob.data)
+        elif ob.type == 'ARMATURE':
+            for poseBone in ob.pose.bones:
+                h.update(repr(tuple(v for row in poseBone.matrix for v in row)).encode('utf-8'))
+        elif ob.type == 'LATTICE':
+            VRayGeometryCache.hashCollection(h, ob.data.points, 'co_deform', 'f', 3)
+        elif ob.type in {'CURVE', 'SURFACE'}:
+            for spline in ob.data.splines:
+                VRayGeometryCache.hashCollection(h, spline.points,        'co', 'f', 4)
+                VRayGeometryCache.hashCollection(h, spline.bezier_points, 'co', 'f', 3)
+        elif ob.data is not None:
+            VRayGeometryCache.hashProperties(h, ob.data)
+
+    @staticmethod
+    def hashModifiers(h, scene, ob, depth):
+        """Hashes modifier stack and everything it reads instead
+        of evaluating the mesh"""
+        useWeights = False
+        for mod in ob.modifiers:
+            if not mod.show_render:
+                continue
+
+            h.update(mod.type.encode('utf-8'))
+            VRayGeometryCache.hashProperties(h, mod)
+
+            if mod.type in TimeModifiers:
+                h.update(b"frame=%r" % scene.frame_current_final)
+            if mod.type in WeightModifiers or getattr(mod, 'vertex_group', ""):
+                useWeights = True
+
+            for modInput in VRayGeometryCache.getModifierInputs(mod):
+                if isinstance(modInput, bpy.types.Texture):
+                    VRayGeometryCache.hashTexture(h, modInput)
+                    continue
+
+                # Offsets are relative to the object
+                tm = ob.matrix_world.inverted() * modInput.matrix_world
+                h.update(repr(tuple(v for row in tm for v in row)).encode('utf-8'))
+
+                if depth > 0:
+                    VRayGeometryCache.hashObjectData(h, modInput)
+                    VRayGeometryCache.hashModifiers(h, scene, modInput, depth - 1)
+                else:
+                    # Too deep to follow; could only be keyed by time
+                    h.update(b"frame=%r" % scene.frame_current_final)
+
+        if useWeights and ob.type == 'MESH':
+            VRayGeometryCache.hashVertexWeights(h, ob)
+
+    def getKey(self, scene, ob):
+        h = hashlib.sha1()
+        h.update(version.VERSION.encode('utf-8'))
+        h.update(b"osd=%i" % scene.vray.Exporter.subsurf_to_osd)
+        h.update(b"displace=%i" % scene.vray.Exporter.use_displace)
+
+        # V-Ray geometry settings: displacement, subdivision, etc.
+        self.hashProperties(h, ob.data.vray, 1)
+        self.hashProperties(h, ob.vray, 1)
+        if ob.vray.ntree:
+            self.hashNodeTree(h, ob.vray.ntree)
+
+        self.hashMesh(h, ob.data)
+        self.hashShapeKeys(h, ob.data)
+        self.hashModifiers(h, scene, ob, InputsDepth)
+
+        return h.hexdigest()
+
+    def getFilepath(self, key):
+        return os.path.join(self.cacheDir, key[:2], "%s.vrscene" % key)
+
+    # Exports object mesh into the cache if needed, includes cached file
+    # into the output file once per export and returns geometry plugin name
+    #
+    def exportMesh(self, scene, ob, outputFile, exportedMeshes):
+        key = self.getKey(scene, ob)
+
+        geomName = "IPME%s" % key
+        if geomName in exportedMeshes:
+            return geomName
+
+        filepath = self.getFilepath(key)
+
+        if os.path.exists(filepath):
+            self.hits += 1
+        else:
+            self.misses += 1
+
+            fileDir = os.path.dirname(filepath)
+            if not os.path.exists(fileDir):
+                os.makedirs(fileDir)
+
+            # Write under a temporary name, so concurrent exports
+            # never include half-written file
+            tmpFilepath = "%s.%i.tmp" % (filepath, os.getpid())
+            with open(tmpFilepath, 'w') as tmpFile:
+                _vray_for_blender.exportMesh(
+                    bpy.context.as_pointer(),
+                    ob.as_pointer(),
+                    geomName,
+                    None,
+                    tmpFile
+                )
+            os.replace(tmpFilepath, filepath)
+
+        outputFile.write('\n#include "%s"\n' % filepath)
+
+        exportedMeshes.add(geomName)
+
+        return geomName
+
+
+GeometryCache = VRayGeometryCache()
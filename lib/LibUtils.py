@@ -93,17 +93,28 @@ def GetAsList(value):
 #
 # NOTE: Some unicode conversion support?
 #
+class CleanStringTable(dict):
+    """str.translate() table: allowed characters map to themselves,
+    anything else (including non-ASCII) is replaced with "_"
+    """
+    def __init__(self, stripSigns):
+        for c in "|@0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz":
+            self[ord(c)] = c
+        if stripSigns:
+            self[ord("+")] = "p"
+            self[ord("-")] = "m"
+
+    def __missing__(self, key):
+        self[key] = "_"
+        return "_"
+
+
+CleanStringSigns   = CleanStringTable(stripSigns=True)
+CleanStringNoSigns = CleanStringTable(stripSigns=False)
+
+
 def CleanString(s, stripSigns=True):
-    if stripSigns:
-        s = s.replace("+", "p")
-        s = s.replace("-", "m")
-    for i in range(len(s)):
-        c = s[i]
-        if c in "|@":
-            continue
-        if not ((c >= 'A' and c <= 'Z') or (c >= 'a' and c <= 'z') or (c >= '0' and c <= '9')):
-            s = s.replace(c, "_")
-    return s
+    return s.translate(CleanStringSigns if stripSigns else CleanStringNoSigns)
 
 
 # Return value in .vrscene format
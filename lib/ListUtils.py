@@ -0,0 +1,167 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import array
+import binascii
+import itertools
+import sys
+import time
+import zlib
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Encodes list attributes in .vrscene list formats.
+# Data is packed with 'array' (or numpy if available) and converted to hex
+# in one call, so there is no per-element formatting.
+#
+# Type: (array typecode, components, hex list name, ascii list name, ascii item format)
+#
+ListTypes = {
+    'INT_LIST'    : ('i', 1, 'ListIntHex',    'ListInt',    "%i"),
+    'FLOAT_LIST'  : ('f', 1, 'ListFloatHex',  'ListFloat',  "%.6g"),
+    'VECTOR_LIST' : ('f', 3, 'ListVectorHex', 'ListVector', "Vector(%.6g,%.6g,%.6g)"),
+    'COLOR_LIST'  : ('f', 3, 'ListColorHex',  'ListColor',  "Color(%.6g,%.6g,%.6g)"),
+}
+
+# Fast compression level, list data is large and compresses well anyway
+ZipLevel = 1
+
+NumpyTypes = {
+    'i' : 'int32',
+    'f' : 'float32',
+}
+
+
+def IsListType(attrType):
+    return attrType in ListTypes
+
+
+# Returns list data as bytes in little-endian order
+#
+def GetListBytes(value, typecode, components=1):
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        data = numpy.ascontiguousarray(value, dtype=numpy.dtype(NumpyTypes[typecode]).newbyteorder('<'))
+        return data.tobytes()
+
+    if isinstance(value, array.array) and value.typecode == typecode:
+        arr = value
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        arr = array.array(typecode)
+        arr.frombytes(value)
+    elif components > 1 and len(value) and not isinstance(value[0], (int, float)):
+        arr = array.array(typecode, itertools.chain.from_iterable(value))
+    else:
+        arr = array.array(typecode, value)
+
+    if sys.byteorder != 'little':
+        if arr is value:
+            arr = array.array(typecode, arr)
+        arr.byteswap()
+
+    return memoryview(arr).cast('B')
+
+
+def GetHex(data):
+    return binascii.hexlify(data).decode('ascii').upper()
+
+
+# "ZIPB" + uncompressed size + compressed size + compressed data in hex
+#
+def GetZip(data):
+    zipped = zlib.compress(data, ZipLevel)
+    return "ZIPB%08X%08X%s" % (len(data), len(zipped), GetHex(zipped))
+
+
+def FormatListAscii(value, attrType):
+    typecode, components, hexName, asciiName, itemFormat = ListTypes[attrType]
+
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        value = value.reshape(-1).tolist()
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        arr = array.array(typecode)
+        arr.frombytes(value)
+        value = arr
+
+    if components > 1:
+        if len(value) and isinstance(value[0], (int, float)):
+            value = zip(*[iter(value)] * components)
+        items = (itemFormat % tuple(item) for item in value)
+    else:
+        items = (itemFormat % item for item in value)
+
+    return "%s(%s)" % (asciiName, ",".join(items))
+
+
+# Returns list attribute value in .vrscene format
+#  dataFormat: 'ZIP', 'HEX' or 'ASCII' (VRayExporter.data_format)
+#
+def FormatList(value, attrType, dataFormat='ZIP'):
+    typecode, components, hexName, asciiName, itemFormat = ListTypes[attrType]
+
+    if dataFormat == 'ASCII':
+        return FormatListAscii(value, attrType)
+
+    data = GetListBytes(value, typecode, components)
+
+    if dataFormat == 'ZIP':
+        return '%s("%s")' % (hexName, GetZip(data))
+
+    return '%s("%s")' % (hexName, GetHex(data))
+
+
+# Micro-benchmark:
+#   python ListUtils.py [number of vectors]
+#
+def Benchmark(numVectors=10000000):
+    vectors = array.array('f', range(numVectors * 3))
+
+    print("Encoding %i vectors (%.1f MB)" % (numVectors, len(vectors) * vectors.itemsize / 1024.0 / 1024.0))
+
+    inputs = [("array", vectors)]
+    if numpy is not None:
+        inputs.append(("numpy", numpy.frombuffer(vectors, dtype=numpy.float32)))
+
+    for inputName, value in inputs:
+        for dataFormat in ('HEX', 'ZIP'):
+            ts = time.time()
+            result = FormatList(value, 'VECTOR_LIST', dataFormat)
+            te = time.time() - ts
+            print("  %-5s %-3s: %.3f sec, %.1f M vectors/sec, %.1f MB output" % (
+                inputName, dataFormat, te, numVectors / te / 1.0e6, len(result) / 1024.0 / 1024.0))
+
+    # Reference: per-element formatting
+    numSlice = min(numVectors, 1000000)
+    ts = time.time()
+    "".join("%08X" % v for v in array.array('I', memoryview(vectors).cast('B').cast('I')[:numSlice * 3]))
+    te = time.time() - ts
+    print("  per-element hex formatting: %.1f M vectors/sec" % (numSlice / te / 1.0e6))
+
+
+if __name__ == '__main__':
+    Benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000000)
@@ -0,0 +1,320 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+
+
+# Index of material library files (.vrscene / .vrmat / .vismat):
+# material name -> plugin blocks (byte offset, length) it depends on.
+# Index is stored in the cache directory and rebuilt when file mtime / size
+# changes, so material names could be listed and a single material could be
+# extracted without parsing the whole library.
+#
+# Module doesn't depend on Blender and could be used from command line:
+#   python MatLibUtils.py library.vrscene [--material NAME --output FILE]
+#
+
+IndexVersion = 1
+
+PluginStartRe = re.compile(br'^\s*([A-Za-z_]\w*)\s+([^\s{]+)\s*\{')
+QuotedRe      = re.compile(br'"[^"]*"')
+TokenRe       = re.compile(br'[A-Za-z_@|][\w@|:]*')
+
+AssetTagRe  = re.compile(br'<Asset\b[^>]*>|</Asset>')
+AssetUrlRe  = re.compile(br'\burl="([^"]+)"')
+AssetTypeRe = re.compile(br'\btype="([^"]+)"')
+AssetRefRe  = re.compile(br'(/[^<>"\s]+)')
+
+
+def IsXmlLibrary(filepath):
+    return not filepath.lower().endswith(".vrscene")
+
+
+def Decode(b):
+    return b.decode('utf-8', errors='replace')
+
+
+def GetDependencies(name, refs):
+    deps  = set()
+    stack = [name]
+    while stack:
+        pluginName = stack.pop()
+        if pluginName in deps:
+            continue
+        deps.add(pluginName)
+        stack.extend(refs.get(pluginName, ()))
+    return deps
+
+
+def BuildMaterials(plugins, refs, materialNames):
+    materials = {}
+    for name in materialNames:
+        deps = GetDependencies(name, refs)
+        # Keep file order, so dependencies are defined as in the library
+        materials[name] = sorted(deps, key=lambda n: plugins[n][0])
+    return materials
+
+
+def IndexVrscene(filepath):
+    plugins       = {}
+    tokens        = {}
+    materialNames = []
+
+    with open(filepath, 'rb') as f:
+        offset     = 0
+        depth      = 0
+        pluginName = None
+        blockStart = 0
+
+        for line in f:
+            lineStart = offset
+            offset   += len(line)
+
+            code = QuotedRe.sub(b'', line).split(b'//', 1)[0]
+
+            if depth == 0:
+                m = PluginStartRe.match(code)
+                if not m:
+                    continue
+                pluginName = Decode(m.group(2))
+                blockStart = lineStart
+                tokens[pluginName] = set()
+                if m.group(1).startswith(b'Mtl'):
+                    materialNames.append(pluginName)
+                code = code[m.end():]
+                depth = 1
+
+            depth += code.count(b'{') - code.count(b'}')
+
+            tokens[pluginName].update(TokenRe.findall(code))
+
+            if depth <= 0:
+                plugins[pluginName] = [blockStart, offset - blockStart]
+                pluginName = None
+                depth = 0
+
+    names = set(plugins)
+    refs  = {}
+    for pluginName, pluginTokens in tokens.items():
+        refs[pluginName] = [n for n in map(Decode, pluginTokens) if n in names and n != pluginName]
+
+    return {
+        'type'      : 'vrscene',
+        'plugins'   : plugins,
+        'materials' : BuildMaterials(plugins, refs, [n for n in materialNames if n in plugins]),
+    }
+
+
+def IndexXml(filepath):
+    plugins       = {}
+    bodies        = {}
+    materialNames = []
+
+    header = None
+    footer = None
+
+    with open(filepath, 'rb') as f:
+        fileSize = os.fstat(f.fileno()).st_size
+        if not fileSize:
+            return None
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            url   = None
+            start = 0
+
+            for m in AssetTagRe.finditer(mm):
+                tag = m.group(0)
+                if tag == b'</Asset>':
+                    if url is None:
+                        continue
+                    plugins[url] = [start, m.end() - start]
+                    bodies[url]  = (start, m.end())
+                    footer = m.end()
+                    url    = None
+                elif url is None:
+                    urlMatch = AssetUrlRe.search(tag)
+                    if not urlMatch:
+                        continue
+                    url   = Decode(urlMatch.group(1))
+                    start = m.start()
+                    if header is None:
+                        header = start
+                    typeMatch = AssetTypeRe.search(tag)
+                    if typeMatch and typeMatch.group(1) == b'material':
+                        materialNames.append(url)
+
+            if header is None:
+                return None
+
+            names = set(plugins)
+            refs  = {}
+            for url, (start, end) in bodies.items():
+                refs[url] = [n for n in set(map(Decode, AssetRefRe.findall(mm[start:end]))) if n in names and n != url]
+
+    return {
+        'type'      : 'xml',
+        'plugins'   : plugins,
+        'materials' : BuildMaterials(plugins, refs, [n for n in materialNames if n in plugins]),
+        'header'    : [0, header],
+        'footer'    : [footer, fileSize - footer],
+    }
+
+
+class VRayMaterialLibraryIndex:
+    def __init__(self):
+        self.cacheDir = None
+
+        # filepath -> index
+        self.indices = {}
+
+    def setCacheDir(self, cacheDir):
+        self.cacheDir = cacheDir
+
+    def getIndexFilepath(self, filepath):
+        if not self.cacheDir:
+            return None
+        key = hashlib.sha1(os.path.normcase(os.path.abspath(filepath)).encode('utf-8')).hexdigest()
+        return os.path.join(self.cacheDir, "%s.json" % key)
+
+    def loadIndex(self, indexFilepath, st):
+        if not indexFilepath or not os.path.exists(indexFilepath):
+            return None
+        try:
+            with open(indexFilepath, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get('version') != IndexVersion:
+            return None
+        if index.get('mtime') != st.st_mtime or index.get('size') != st.st_size:
+            return None
+        return index
+
+    def saveIndex(self, indexFilepath, index):
+        if not indexFilepath:
+            return
+        try:
+            if not os.path.exists(self.cacheDir):
+                os.makedirs(self.cacheDir)
+            with open(indexFilepath + ".tmp", 'w') as f:
+                json.dump(index, f)
+            os.replace(indexFilepath + ".tmp", indexFilepath)
+        except OSError:
+            pass
+
+    def getIndex(self, filepath):
+        st = os.stat(filepath)
+
+        index = self.indices.get(filepath)
+        if index and index['mtime'] == st.st_mtime and index['size'] == st.st_size:
+            return index
+
+        indexFilepath = self.getIndexFilepath(filepath)
+
+        index = self.loadIndex(indexFilepath, st)
+        if index is None:
+            index = IndexXml(filepath) if IsXmlLibrary(filepath) else IndexVrscene(filepath)
+            if index is None:
+                return None
+            index['version']  = IndexVersion
+            index['filepath'] = filepath
+            index['mtime']    = st.st_mtime
+            index['size']     = st.st_size
+            self.saveIndex(indexFilepath, index)
+
+        self.indices[filepath] = index
+
+        return index
+
+    # Returns names as shown in UI; XML asset urls are without leading "/"
+    #
+    def getMaterialNames(self, filepath):
+        index = self.getIndex(filepath)
+        if index is None:
+            return []
+        names = sorted(index['materials'])
+        if index['type'] == 'xml':
+            names = [n.lstrip("/") for n in names]
+        return names
+
+    # Writes material with its dependencies into outputFilepath.
+    # Returns False if material is not indexed.
+    #
+    def extractMaterial(self, filepath, mtlName, outputFilepath):
+        index = self.getIndex(filepath)
+        if index is None:
+            return False
+
+        if index['type'] == 'xml' and not mtlName.startswith("/"):
+            mtlName = "/" + mtlName
+
+        deps = index['materials'].get(mtlName)
+        if not deps:
+            return False
+
+        blocks = [index['plugins'][n] for n in deps]
+        if index['type'] == 'xml':
+            blocks = [index['header']] + blocks + [index['footer']]
+
+        with open(filepath, 'rb') as f, open(outputFilepath, 'wb') as out:
+            for offset, length in blocks:
+                f.seek(offset)
+                out.write(f.read(length))
+
+        return True
+
+
+LibraryIndex = VRayMaterialLibraryIndex()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index material library and extract materials")
+    parser.add_argument('filepath', help=".vrscene / .vrmat / .vismat file")
+    parser.add_argument('--cache',    help="Index cache directory")
+    parser.add_argument('--material', help="Material to extract")
+    parser.add_argument('--output',   help="Extracted material filepath")
+    args = parser.parse_args()
+
+    LibraryIndex.setCacheDir(args.cache)
+
+    if args.material:
+        if not args.output:
+            parser.error("--output is required with --material")
+        if not LibraryIndex.extractMaterial(args.filepath, args.material, args.output):
+            sys.stderr.write("Material \"%s\" is not found!\n" % args.material)
+            sys.exit(1)
+    else:
+        for name in LibraryIndex.getMaterialNames(args.filepath):
+            print(name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import sys
+
+from vb30 import debug
+
+from . import LibUtils
+
+
+class VRayNameRegistry:
+    """Per-export plugin name registry.
+
+    Sanitized names are memoized by (datablock pointer, prefix) and interned,
+    so repeated lookups of the same object / node cost a dict access.
+    Names must match the ones written by the native exporter, so different
+    datablocks that sanitize to the same name ("Cube.001" and "Cube_001")
+    are only reported.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # (pointer, prefix) -> (raw name, plugin name)
+        self.names  = {}
+        # plugin name -> (pointer, prefix)
+        self.owners = {}
+
+        self.lookups    = 0
+        self.computed   = 0
+        self.collisions = 0
+
+    def getName(self, pointer, prefix, rawName):
+        key = (pointer, prefix)
+
+        entry = self.names.get(key)
+        # Raw name is compared to catch renames between exports
+        if entry is not None and entry[0] == rawName:
+            self.lookups += 1
+            return entry[1]
+
+        self.computed += 1
+
+        name = sys.intern(LibUtils.CleanString(rawName))
+
+        owner = self.owners.get(name)
+        if owner is not None and owner != key:
+            self.collisions += 1
+            debug.Debug("Plugin name collision: \"%s\" -> \"%s\"" % (rawName, name), msgType='ERROR')
+
+        self.owners[name] = key
+        self.names[key] = (rawName, name)
+
+        return name
+
+    def printStats(self):
+        debug.Debug("Plugin names: %i lookups, %i computed, %i collisions" % (
+            self.lookups, self.computed, self.collisions))
+
+
+NameRegistry = VRayNameRegistry()
@@ -0,0 +1,117 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import concurrent.futures
+import socket
+import threading
+import time
+
+
+# Probes distributed rendering hosts with short TCP connects.
+# Module doesn't depend on Blender data, so it could be checked
+# against local listening sockets.
+#
+def ProbeHost(address, port, timeout):
+    ts = time.time()
+    try:
+        conn = socket.create_connection((address, port), timeout)
+    except (OSError, ValueError):
+        return None
+    conn.close()
+    return time.time() - ts
+
+
+class VRayHostProber:
+    # Max concurrent probes
+    maxWorkers = 16
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+        # (address, port) -> (probe time, latency or None)
+        self.results = {}
+
+    def getResult(self, address, port, ttl=None):
+        with self.lock:
+            result = self.results.get((address, port))
+        if result is None:
+            return None
+        probeTime, latency = result
+        if ttl is not None and time.time() - probeTime > ttl:
+            return None
+        return result
+
+    def isReachable(self, address, port):
+        result = self.getResult(address, port)
+        return result is not None and result[1] is not None
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+
+    # Probes hosts which are not cached or cache is older than 'ttl'.
+    # hosts is a list of (address, port).
+    #
+    def probe(self, hosts, timeout=0.5, ttl=60.0):
+        toProbe = []
+        for host in set(hosts):
+            if ttl <= 0.0 or self.getResult(host[0], host[1], ttl) is None:
+                toProbe.append(host)
+
+        if not toProbe:
+            return
+
+        numWorkers = min(len(toProbe), self.maxWorkers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=numWorkers) as executor:
+            futures = {
+                executor.submit(ProbeHost, address, port, timeout) : (address, port)
+                    for address, port in toProbe
+            }
+            for future in concurrent.futures.as_completed(futures):
+                probeTime = time.time()
+                with self.lock:
+                    self.results[futures[future]] = (probeTime, future.result())
+
+    # Returns (reachable, unreachable) lists of hosts.
+    # Reachable hosts are ordered by latency, unreachable keep the original order.
+    # hosts is a list of (key, address, port), key is returned as is.
+    #
+    def rank(self, hosts, timeout=0.5, ttl=60.0):
+        self.probe([(address, port) for key, address, port in hosts], timeout, ttl)
+
+        reachable   = []
+        unreachable = []
+        for i, host in enumerate(hosts):
+            key, address, port = host
+            result = self.getResult(address, port)
+            if result is None or result[1] is None:
+                unreachable.append(key)
+            else:
+                reachable.append((result[1], i, key))
+
+        return [key for latency, i, key in sorted(reachable)], unreachable
+
+
+Prober = VRayHostProber()
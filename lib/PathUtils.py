@@ -159,15 +159,15 @@ def CopyDRAsset(bus, srcFilepath):
     else:
         if os.path.exists(dstFilepath):
             if not filecmp.cmp(srcFilepath, dstFilepath):
-                debug.Debug('Copying "%s" to "%s"'% (debug.Color(srcFilename, 'magenta'), dstRoot))
+                debug.Log('DR', debug.LOG_DEBUG, 'Copying "%s" to "%s"', srcFilename, dstRoot)
 
                 shutil.copyfile(srcFilepath, dstFilepath)
 
             else:
-                debug.Debug('File "%s" exists and not modified.'% debug.Color(srcFilename, 'magenta'))
+                debug.Log('DR', debug.LOG_DEBUG, 'File "%s" exists and not modified.', srcFilename)
 
         else:
-            debug.Debug('Copying "%s" to "%s"' % (debug.Color(srcFilename, 'magenta'), dstRoot))
+            debug.Log('DR', debug.LOG_DEBUG, 'Copying "%s" to "%s"', srcFilename, dstRoot)
 
             shutil.copyfile(srcFilepath, dstFilepath)
 
@@ -0,0 +1,258 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+from vb30 import debug
+
+from . import SysUtils
+
+
+# Material / world previews are requested by Blender on every frame change
+# and on every property tweak; most of these requests are obsolete before
+# V-Ray even starts. Scheduler coalesces requests arriving within a time
+# window, drops superseded ones and allows only one preview render at a time.
+#
+class VRayPreviewScheduler:
+    def __init__(self):
+        # Guards counters and generation
+        self.stateLock = threading.Lock()
+
+        # Only one preview render at a time
+        self.renderLock = threading.Lock()
+
+        # Incremented on every request; request is superseded
+        # when generation has moved on
+        self.generation = 0
+
+        # Currently running preview VRayProcess
+        self.process = None
+
+        # Statistics
+        self.requested = 0
+        self.rendered  = 0
+        self.dropped   = 0
+        self.killed    = 0
+
+    def request(self):
+        with self.stateLock:
+            self.generation += 1
+            self.requested  += 1
+            ticket = self.generation
+
+        # Newer request makes the in-flight preview obsolete
+        self.killProcess()
+
+        return ticket
+
+    def isSuperseded(self, ticket):
+        return ticket != self.generation
+
+    def drop(self):
+        with self.stateLock:
+            self.dropped += 1
+
+    def markRendered(self):
+        with self.stateLock:
+            self.rendered += 1
+
+    # Waits for the coalesce window to pass.
+    # Returns False if request was superseded or cancelled meanwhile
+    #
+    def wait(self, ticket, delay, engine=None):
+        deadline = time.time() + delay
+        while True:
+            if self.isSuperseded(ticket) or (engine and engine.test_break()):
+                self.drop()
+                return False
+            if time.time() >= deadline:
+                break
+            time.sleep(0.01)
+        return True
+
+    def setProcess(self, process):
+        with self.stateLock:
+            self.process = process
+
+    def killProcess(self):
+        with self.stateLock:
+            process = self.process
+            self.process = None
+
+        if process is not None and process.is_running():
+            debug.Debug("Preview: Terminating obsolete preview render")
+            process.kill()
+            with self.stateLock:
+                self.killed += 1
+
+    def getStats(self):
+        return {
+            'requested' : self.requested,
+            'rendered'  : self.rendered,
+            'dropped'   : self.dropped,
+            'killed'    : self.killed,
+        }
+
+    def printStats(self):
+        debug.Debug("Preview: requested %i, rendered %i, dropped %i, killed %i" % (
+            self.requested, self.rendered, self.dropped, self.killed))
+
+
+# Preview images cache keyed by the hash of the exported preview scene.
+# Exported scene contains material / texture plugins, preview geometry,
+# camera and output settings, so identical text means identical image.
+#
+class VRayPreviewCache:
+    def __init__(self, cacheDir=None):
+        self.cacheDir = cacheDir
+
+        self.hits   = 0
+        self.misses = 0
+
+    def getCacheDir(self):
+        if self.cacheDir is None:
+            self.cacheDir = os.path.join(SysUtils.GetUserCacheDir(), "preview")
+        if not os.path.exists(self.cacheDir):
+            os.makedirs(self.cacheDir)
+        return self.cacheDir
+
+    def getKey(self, sceneFilepath, previewType):
+        h = hashlib.sha1()
+        h.update(previewType.encode('utf-8'))
+        with open(sceneFilepath, 'rb') as f:
+            for l in f:
+                # Skip comments: file header contains export time
+                if l.startswith(b'//'):
+                    continue
+                h.update(l)
+        return h.hexdigest()
+
+    def getImageFilepath(self, key, ext):
+        return os.path.join(self.getCacheDir(), "%s%s" % (key, ext))
+
+    def get(self, key, ext):
+        imageFilepath = self.getImageFilepath(key, ext)
+        if not os.path.exists(imageFilepath):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        # Mark as recently used
+        try:
+            os.utime(imageFilepath, None)
+        except OSError:
+            pass
+
+        return imageFilepath
+
+    def store(self, key, imageFilepath, maxSize):
+        if not os.path.exists(imageFilepath):
+            return
+
+        ext = os.path.splitext(imageFilepath)[1]
+        cachedFilepath = self.getImageFilepath(key, ext)
+
+        # Write under temporary name first, so concurrent
+        # reader never sees partially copied image
+        tmpFilepath = "%s.%i.tmp" % (cachedFilepath, os.getpid())
+        try:
+            shutil.copyfile(imageFilepath, tmpFilepath)
+            os.replace(tmpFilepath, cachedFilepath)
+        except OSError as e:
+            debug.PrintError("Preview cache: Error storing image: %s" % e)
+            return
+
+        self.evict(maxSize)
+
+    # Removes least recently used images until cache fits into 'maxSize' bytes
+    #
+    def evict(self, maxSize):
+        cacheDir = self.getCacheDir()
+
+        entries = []
+        totalSize = 0
+        for fileName in os.listdir(cacheDir):
+            filepath = os.path.join(cacheDir, fileName)
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, filepath))
+            totalSize += st.st_size
+
+        if totalSize <= maxSize:
+            return
+
+        for mtime, size, filepath in sorted(entries):
+            try:
+                os.remove(filepath)
+            except OSError:
+                continue
+            totalSize -= size
+            if totalSize <= maxSize:
+                break
+
+    def clear(self):
+        cacheDir = self.getCacheDir()
+        for fileName in os.listdir(cacheDir):
+            try:
+                os.remove(os.path.join(cacheDir, fileName))
+            except OSError:
+                pass
+
+    def printStats(self):
+        debug.Debug("Preview cache: hits %i, misses %i" % (self.hits, self.misses))
+
+
+Scheduler = VRayPreviewScheduler()
+Cache     = VRayPreviewCache()
+
+
+def RenderPreview(engine, scene, renderFunc, delay):
+    ticket = Scheduler.request()
+
+    if not Scheduler.wait(ticket, delay, engine):
+        Scheduler.printStats()
+        return None
+
+    with Scheduler.renderLock:
+        # Newer request could arrive while we've waited for the lock
+        if Scheduler.isSuperseded(ticket):
+            Scheduler.drop()
+            Scheduler.printStats()
+            return None
+
+        err = renderFunc(engine, scene)
+        if err is None:
+            Scheduler.markRendered()
+
+    Scheduler.printStats()
+
+    return err
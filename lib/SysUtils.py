@@ -23,8 +23,10 @@
 #
 
 import getpass
+import json
 import os
 import socket
+import subprocess
 import sys
 import shutil
 import platform
@@ -52,7 +54,7 @@ def GetArch():
     return 'x86_64'
 
 
-def GetVRayStandalones():
+def FindVRayStandalones():
     VRayPreferences = bpy.context.user_preferences.addons['vb30'].preferences
 
     vrayExe   = "vray.exe" if sys.platform == 'win32' else "vray"
@@ -108,7 +110,7 @@ def GetVRayStandalones():
     return vrayPaths
 
 
-def GetVRayStandalonePath():
+def FindVRayStandalonePath():
     VRayPreferences = bpy.context.user_preferences.addons['vb30'].preferences
 
     vray_bin = "vray"
@@ -199,6 +201,128 @@ def GetVRayStandalonePath():
     return shutil.which(vray_bin)
 
 
+# Resolved paths are cached in memory and in the user cache directory,
+# so render setup doesn't re-scan environment and filesystem.
+# Cache is invalidated when V-Ray preferences change, on request and
+# when the cached binary is missing.
+#
+DiscoveryCache = None
+
+# Template contents are cached per session
+TemplateCache = {}
+
+# Discovery cache key of the last unsuccessful V-Ray search. Kept in memory
+# only, so V-Ray installed between sessions is found on the next start
+MissingStandaloneKey = None
+
+
+def GetDiscoveryCacheFilepath():
+    return os.path.join(GetUserCacheDir(), "discovery.json")
+
+
+def GetDiscoveryCacheKey():
+    VRayPreferences = bpy.context.user_preferences.addons['vb30'].preferences
+    return "%i:%s" % (VRayPreferences.detect_vray, VRayPreferences.vray_binary)
+
+
+def GetDiscoveryCache():
+    global DiscoveryCache
+
+    cacheKey = GetDiscoveryCacheKey()
+
+    if DiscoveryCache is None:
+        DiscoveryCache = {}
+        try:
+            with open(GetDiscoveryCacheFilepath(), 'r') as cacheFile:
+                DiscoveryCache = json.load(cacheFile)
+        except (OSError, ValueError):
+            pass
+
+    if DiscoveryCache.get('key') != cacheKey:
+        DiscoveryCache = {'key' : cacheKey}
+
+    return DiscoveryCache
+
+
+def SaveDiscoveryCache():
+    if DiscoveryCache is None:
+        return
+    cacheFilepath = GetDiscoveryCacheFilepath()
+    try:
+        with open(cacheFilepath + ".tmp", 'w') as cacheFile:
+            json.dump(DiscoveryCache, cacheFile, indent=2)
+        os.replace(cacheFilepath + ".tmp", cacheFilepath)
+    except OSError as e:
+        debug.PrintError("Error saving discovery cache: %s" % e)
+
+
+def InvalidateDiscoveryCache():
+    global DiscoveryCache
+    global MissingStandaloneKey
+    DiscoveryCache = {}
+    MissingStandaloneKey = None
+    TemplateCache.clear()
+    if os.path.exists(GetDiscoveryCacheFilepath()):
+        os.remove(GetDiscoveryCacheFilepath())
+
+
+def GetVRayStandalones():
+    cache = GetDiscoveryCache()
+    if 'standalones' not in cache:
+        cache['standalones'] = FindVRayStandalones()
+        SaveDiscoveryCache()
+    return cache['standalones']
+
+
+# Not found result is remembered for the session, so UI drawing doesn't
+# re-scan the filesystem; use "Rescan" to search again.
+# Version is probed only here, when a new binary is discovered.
+#
+def GetVRayStandalonePath():
+    global MissingStandaloneKey
+
+    cache = GetDiscoveryCache()
+
+    vrayPath = cache.get('standalone')
+    if vrayPath and not os.path.exists(vrayPath):
+        debug.PrintInfo("Cached V-Ray Standalone is missing: %s" % vrayPath)
+        vrayPath = None
+
+    if not vrayPath:
+        if MissingStandaloneKey == cache['key']:
+            return ""
+
+        vrayPath = FindVRayStandalonePath()
+        if not vrayPath:
+            MissingStandaloneKey = cache['key']
+            return ""
+
+        cache['standalone'] = vrayPath
+        cache['standalone_version'] = ProbeVRayStandaloneVersion(vrayPath)
+        SaveDiscoveryCache()
+
+    return vrayPath
+
+
+def ProbeVRayStandaloneVersion(vrayPath):
+    try:
+        out = subprocess.check_output([vrayPath, "-version"], stderr=subprocess.STDOUT, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    for l in out.decode('utf-8', 'replace').splitlines():
+        if 'V-Ray' in l:
+            return l.strip()
+    return ""
+
+
+# Returns the version stored on discovery; never runs V-Ray
+#
+def GetVRayStandaloneVersion():
+    if not GetVRayStandalonePath():
+        return ""
+    return GetDiscoveryCache().get('standalone_version') or ""
+
+
 def GetExporterPath():
     for path in bpy.utils.script_paths(os.path.join('addons','vb30')):
         if path:
@@ -213,7 +337,17 @@ def GetUserConfigDir():
     return userConfigDirpath
 
 
+def GetUserCacheDir():
+    userCacheDirpath = os.path.join(GetUserConfigDir(), "cache")
+    if not os.path.exists(userCacheDirpath):
+        os.makedirs(userCacheDirpath)
+    return userCacheDirpath
+
+
 def GetVRsceneTemplate(filename):
+    if filename in TemplateCache:
+        return TemplateCache[filename]
+
     templatesDir = os.path.join(GetExporterPath(), "templates")
     templateFilepath = os.path.join(templatesDir, filename)
 
@@ -223,9 +357,14 @@ def GetVRsceneTemplate(filename):
         templateFilepath = templateFilepathUser
 
     if not os.path.exists(templateFilepath):
-        return ""
+        template = ""
+    else:
+        with open(templateFilepath, 'r') as templateFile:
+            template = templateFile.read()
+
+    TemplateCache[filename] = template
 
-    return open(templateFilepath, 'r').read()
+    return template
 
 
 def GetPreviewBlend():
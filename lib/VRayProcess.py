@@ -238,7 +238,7 @@ class VRayProcess:
         if not self.isPreview:
             commandLine = " ".join(cmd)
 
-            debug.PrintInfo("Command Line: %s" % commandLine)
+            debug.Log('PROCESS', debug.LOG_INFO, "Command Line: %s", commandLine)
 
             if self.gen_run_file:
                 baseFile = self.sceneFile
@@ -253,7 +253,7 @@ class VRayProcess:
                 runFilename = "render_%s.%s" % (sceneFileName, runExt)
                 runFilepath = os.path.join(os.path.dirname(baseFile), runFilename)
 
-                debug.PrintInfo("Generating %s..." % runFilename)
+                debug.Log('PROCESS', debug.LOG_INFO, "Generating %s...", runFilename)
 
                 cmdJoin = " %s\n" % cmdSep
 
@@ -268,6 +268,20 @@ class VRayProcess:
                 if sys.platform not in {'win32'}:
                     os.chmod(runFilepath, 0o744)
 
+        self.setupEnvironment()
+
+        if self.autorun:
+            self.process = subprocess.Popen(cmd)
+            if self.waitExit:
+                errCode = self.process.wait()
+
+        return errCode
+
+
+    # Environment is shared by all V-Ray processes started from Blender;
+    # must be called from the main thread
+    #
+    def setupEnvironment(self):
         VRayExporter = bpy.context.scene.vray.Exporter
 
         if not VRayExporter.vfb_global_preset_file_use:
@@ -288,13 +302,6 @@ class VRayProcess:
 
         os.environ['VRAY_VFB_THEME_FILE'] = vfbThemeFilepath
 
-        if self.autorun:
-            self.process = subprocess.Popen(cmd)
-            if self.waitExit:
-                errCode = self.process.wait()
-
-        return errCode
-
 
     def kill(self):
         if self.is_running():
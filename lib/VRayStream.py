@@ -30,7 +30,7 @@ import datetime
 import os
 import sys
 
-from vb30.debug import Debug
+from vb30.debug import Debug, Log, IsLogEnabled, LOG_DEBUG
 
 from . import LibUtils, PathUtils, SysUtils, BlenderUtils
 from . import PluginUtils
@@ -116,22 +116,24 @@ class VRayFilePaths:
         return self.separateFiles
 
     def printInfo(self):
-        Debug('Export directory: "%s"' % self.exportDirectory)
+        if not IsLogEnabled('STREAM'):
+            return
+        Log('STREAM', LOG_DEBUG, 'Export directory: "%s"', self.exportDirectory)
         if self.assetSubdirs:
-            Debug('Asset directories:')
-            Debug('  Images: "%s"' % self.assetSubdirs['image'])
-            Debug('  IES: "%s"'    % self.assetSubdirs['ies'])
-            Debug('  Proxy: "%s"'  % self.assetSubdirs['proxy'])
-            Debug('  Misc: "%s"'   % self.assetSubdirs['misc'])
-        Debug('Export filename: "%s"' % self.exportFilename)
+            Log('STREAM', LOG_DEBUG, 'Asset directories:')
+            Log('STREAM', LOG_DEBUG, '  Images: "%s"', self.assetSubdirs['image'])
+            Log('STREAM', LOG_DEBUG, '  IES: "%s"',    self.assetSubdirs['ies'])
+            Log('STREAM', LOG_DEBUG, '  Proxy: "%s"',  self.assetSubdirs['proxy'])
+            Log('STREAM', LOG_DEBUG, '  Misc: "%s"',   self.assetSubdirs['misc'])
+        Log('STREAM', LOG_DEBUG, 'Export filename: "%s"', self.exportFilename)
         if self.filePrefix:
-            Debug('Expicit prefix: "%s"' % self.filePrefix)
-        Debug('Separate files: %s' % self.separateFiles)
+            Log('STREAM', LOG_DEBUG, 'Expicit prefix: "%s"', self.filePrefix)
+        Log('STREAM', LOG_DEBUG, 'Separate files: %s', self.separateFiles)
 
         if self.imgFilename is not None:
-            Debug('Output directory: "%s"' % self.imgDirectory)
-            Debug('Output file: "%s"' % self.imgFilename)
-            Debug('Load file:   "%s"' % self.imgLoadFilename)
+            Log('STREAM', LOG_DEBUG, 'Output directory: "%s"', self.imgDirectory)
+            Log('STREAM', LOG_DEBUG, 'Output file: "%s"', self.imgFilename)
+            Log('STREAM', LOG_DEBUG, 'Load file:   "%s"', self.imgLoadFilename)
 
     def initFromScene(self, engine, scene):
         if engine.is_preview:
@@ -343,7 +345,7 @@ class VRayExportFiles:
 
 
     def closeFiles(self):
-        Debug("VRayExportFiles::closeFiles()")
+        Log('STREAM', LOG_DEBUG, "VRayExportFiles::closeFiles()")
         if not self.files:
             return
         for fileType in self.files:
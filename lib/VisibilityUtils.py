@@ -0,0 +1,196 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import bpy
+
+
+HideTypes = ('all', 'camera', 'gi', 'reflect', 'refract', 'shadows')
+
+
+def LayersToMask(layers):
+    mask = 0
+    for l in range(20):
+        if layers[l]:
+            mask |= 1 << l
+    return mask
+
+
+# Resolves object / group name lists ("name;name;...") used by "Hide From View"
+# into sets of object pointers.
+#
+# Built once per exported frame: group membership, name lookup and layer masks
+# are precomputed, so resolving any list becomes a dict lookup and set operations.
+# Camera loop exports reuse the resolver for all cameras of a frame; it is
+# rebuilt when the frame changes, when marked dirty or when objects / groups
+# were added or removed.
+#
+class VRayVisibilityResolver:
+    def __init__(self, scene):
+        self.scene = scene
+
+        self.objects     = {}
+        self.groups      = {}
+        self.dupliGroups = {}
+        self.layerMasks  = {}
+
+        # (objectNames, groupNames) -> frozenset of object pointers
+        self.listCache = {}
+
+        self.activeLayersMask = 0
+
+        self.numObjects = -1
+        self.numGroups  = -1
+        self.frame      = None
+
+        self.dirty = True
+
+        self.update()
+
+    def markDirty(self):
+        self.dirty = True
+
+    def isDirty(self):
+        if self.dirty:
+            return True
+        # Group membership and layers could be animated
+        if self.scene.frame_current != self.frame:
+            return True
+        if len(bpy.data.objects) != self.numObjects:
+            return True
+        if len(bpy.data.groups) != self.numGroups:
+            return True
+        return False
+
+    def update(self):
+        if not self.isDirty():
+            return
+        self.build()
+
+    def build(self):
+        scene = self.scene
+
+        VRayExporter = scene.vray.Exporter
+
+        self.objects = {}
+        self.dupliGroups = {}
+        for ob in bpy.data.objects:
+            self.objects[ob.name] = ob
+            if ob.dupli_type == 'GROUP' and ob.dupli_group:
+                self.dupliGroups[ob.as_pointer()] = ob.dupli_group.name
+
+        self.groups = {}
+        for gr in bpy.data.groups:
+            self.groups[gr.name] = tuple(gr.objects)
+
+        self.layerMasks = {}
+        self.listCache  = {}
+
+        if VRayExporter.activeLayers == 'ALL':
+            self.activeLayersMask = (1 << 20) - 1
+        elif VRayExporter.activeLayers == 'CUSTOM':
+            self.activeLayersMask = LayersToMask(VRayExporter.customRenderLayers)
+        else:
+            self.activeLayersMask = LayersToMask(scene.layers)
+
+        self.numObjects = len(bpy.data.objects)
+        self.numGroups  = len(bpy.data.groups)
+        self.frame      = self.scene.frame_current
+
+        self.dirty = False
+
+    def getObjects(self, objectNames=None, groupNames=None):
+        objectList = []
+
+        if objectNames:
+            for obName in objectNames.split(';'):
+                ob = self.objects.get(obName)
+                if ob is not None:
+                    objectList.append(ob)
+
+        if groupNames:
+            for grName in groupNames.split(';'):
+                objectList.extend(self.groups.get(grName, ()))
+
+        dupliGroup = []
+        for ob in objectList:
+            grName = self.dupliGroups.get(ob.as_pointer())
+            if grName is not None:
+                dupliGroup.extend(self.groups.get(grName, ()))
+        objectList.extend(dupliGroup)
+
+        return objectList
+
+    def getPointers(self, objectNames=None, groupNames=None):
+        key = (objectNames, groupNames)
+        pointers = self.listCache.get(key)
+        if pointers is None:
+            pointers = frozenset(ob.as_pointer() for ob in self.getObjects(objectNames, groupNames))
+            self.listCache[key] = pointers
+        return pointers
+
+    def getCameraHideLists(self, camera):
+        VRayCamera = camera.data.vray
+
+        visibility = {}
+        for hideType in HideTypes:
+            visibility[hideType] = set()
+
+        if not VRayCamera.hide_from_view:
+            return visibility
+
+        for hideType in HideTypes:
+            if not getattr(VRayCamera, 'hf_%s' % hideType):
+                continue
+            if getattr(VRayCamera, 'hf_%s_auto' % hideType):
+                pointers = self.getPointers(groupNames='hf_%s' % camera.name)
+            else:
+                pointers = self.getPointers(getattr(VRayCamera, 'hf_%s_objects' % hideType),
+                                            getattr(VRayCamera, 'hf_%s_groups' % hideType))
+            visibility[hideType] |= pointers
+
+        return visibility
+
+    def getLayerMask(self, ob):
+        obPointer = ob.as_pointer()
+        mask = self.layerMasks.get(obPointer)
+        if mask is None:
+            mask = LayersToMask(ob.layers)
+            self.layerMasks[obPointer] = mask
+        return mask
+
+    def objectOnVisibleLayers(self, ob):
+        return bool(self.getLayerMask(ob) & self.activeLayersMask)
+
+    def objectVisible(self, ob):
+        SettingsOptions = self.scene.vray.SettingsOptions
+
+        if ob.hide_render or not self.objectOnVisibleLayers(ob):
+            if ob.type == 'LAMP':
+                if not SettingsOptions.light_doHiddenLights:
+                    return False
+            if not SettingsOptions.geom_doHidden:
+                return False
+
+        return True
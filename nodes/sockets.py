@@ -24,7 +24,7 @@
 
 import bpy
 
-from vb30.debug import Debug
+from vb30.debug import Log, LOG_DEBUG
 
 
 def CheckLinkedSockets(node_sockets):
@@ -38,7 +38,7 @@ def AddInput(node, socketType, socketName, attrName=None, default=None):
     if socketName in node.inputs:
         return
 
-    Debug("Adding input socket: '%s' <= '%s'" % (socketName, attrName), msgType='INFO')
+    Log('NODES', LOG_DEBUG, "Adding input socket: '%s' <= '%s'", socketName, attrName)
 
     node.inputs.new(socketType, socketName)
 
@@ -60,7 +60,7 @@ def AddOutput(node, socketType, socketName, attrName=None):
     if socketName in node.outputs:
         return
 
-    Debug("Adding output socket: '%s' <= '%s'" % (socketName, attrName), msgType='INFO')
+    Log('NODES', LOG_DEBUG, "Adding output socket: '%s' <= '%s'", socketName, attrName)
 
     node.outputs.new(socketType, socketName)
 
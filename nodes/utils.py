@@ -25,13 +25,14 @@
 import bpy
 
 from vb30.lib import LibUtils
+from vb30.lib import NameUtils
 from vb30.lib import AttributeUtils
 
 from . import sockets as SocketUtils
 
 
 def GetNodeName(ntree, node):
-    return LibUtils.CleanString("NT%sN%s" % (ntree.name, node.name))
+    return NameUtils.NameRegistry.getName(node.as_pointer(), ntree.as_pointer(), "NT%sN%s" % (ntree.name, node.name))
 
 
 def GetConnectedNode(ntree, nodeSocket):
@@ -38,6 +38,10 @@ import vb30.proxy
 
 from vb30.lib     import LibUtils, BlenderUtils, PathUtils, SysUtils
 from vb30.lib     import ColorUtils
+from vb30.lib     import PreviewUtils
+from vb30.lib     import CostUtils
+from vb30.lib     import NetworkUtils
+from vb30.lib     import AnalyzeUtils
 from vb30.plugins import PLUGINS, PLUGINS_ID
 from vb30         import debug
 
@@ -180,6 +184,23 @@ class VRAY_OT_node_del(bpy.types.Operator):
 		return {'FINISHED'}
 
 
+class VRAY_OT_dr_nodes_check(bpy.types.Operator):
+	bl_idname      = "vray.dr_nodes_check"
+	bl_label       = "Check Hosts"
+	bl_description = "Check render nodes reachability"
+
+	def execute(self, context):
+		VRayDR = context.scene.vray.VRayDR
+
+		hosts = []
+		for n in VRayDR.nodes:
+			hosts.append((n.address, n.port if n.port_override else VRayDR.port))
+
+		NetworkUtils.Prober.probe(hosts, VRayDR.probeTimeout, ttl=0.0)
+
+		return {'FINISHED'}
+
+
 class VRAY_OT_dr_nodes_load(bpy.types.Operator):
 	bl_idname      = "vray.dr_nodes_load"
 	bl_label       = "Load DR Nodes"
@@ -505,12 +526,76 @@ class VRayOpZmqRun(bpy.types.Operator):
 		return {'FINISHED'}
 
 
+class VRayOpEstimateSceneCost(bpy.types.Operator):
+	bl_idname      = "vray.estimate_scene_cost"
+	bl_label       = "Estimate Scene Cost"
+	bl_description = "Estimate polygon, instance and texture counts and memory usage of the scene"
+
+	def execute(self, context):
+		scene = context.scene
+
+		bus = {
+			'scene'       : scene,
+			'skipObjects' : set(),
+		}
+
+		stats = CostUtils.Estimate(bus)
+
+		warning = CostUtils.CheckThresholds(scene, stats)
+		if warning:
+			self.report({'WARNING'}, warning)
+		else:
+			self.report({'INFO'}, "Estimated memory: %s" % CostUtils.FormatBytes(stats['memory_bytes']))
+
+		return {'FINISHED'}
+
+
+class VRayOpAnalyzeScene(bpy.types.Operator):
+	bl_idname      = "vray.analyze_vrscene"
+	bl_label       = "Analyze Scene File"
+	bl_description = "Report size and composition of the exported scene file"
+
+	filepath = bpy.props.StringProperty(name="Filepath (*.vrscene)", subtype="FILE_PATH")
+
+	filter_glob = bpy.props.StringProperty(default="*.vrscene", options={'HIDDEN'})
+
+	def invoke(self, context, event):
+		if not self.filepath:
+			self.filepath = AnalyzeUtils.LastExportFilepath
+		context.window_manager.fileselect_add(self)
+		return {'RUNNING_MODAL'}
+
+	def execute(self, context):
+		filepath = bpy.path.abspath(self.filepath)
+		if not os.path.isfile(filepath):
+			self.report({'ERROR'}, "File not found: %s" % filepath)
+			return {'CANCELLED'}
+
+		report = AnalyzeUtils.Analyze(filepath)
+
+		self.report({'INFO'}, "%s in %i plugins, report: %s" % (
+			CostUtils.FormatBytes(report['bytes']), report['plugins'], report['report']))
+
+		return {'FINISHED'}
+
+
+class VRayOpPreviewCacheClear(bpy.types.Operator):
+	bl_idname      = "vray.preview_cache_clear"
+	bl_label       = "Clear Preview Cache"
+	bl_description = "Remove all cached material preview images"
+
+	def execute(self, context):
+		PreviewUtils.Cache.clear()
+		return {'FINISHED'}
+
+
 def GetRegClasses():
 	return (
 		VRAY_OT_update,
 		VRAY_OT_lens_shift,
 		VRAY_OT_node_add,
 		VRAY_OT_node_del,
+		VRAY_OT_dr_nodes_check,
 		VRAY_OT_dr_nodes_load,
 		VRAY_OT_dr_nodes_save,
 		VRAY_OT_settings_to_text,
@@ -521,6 +606,9 @@ def GetRegClasses():
 		VRayOpSwitchSlotsObject,
 		VRayOpNewMaterial,
 		VRayOpZmqRun,
+		VRayOpPreviewCacheClear,
+		VRayOpEstimateSceneCost,
+		VRayOpAnalyzeScene,
 	)
 
 
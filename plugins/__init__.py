@@ -462,6 +462,12 @@ class VRayObject(bpy.types.PropertyGroup):
 		default     = 0
 	)
 
+	motion_blur_deform = bpy.props.BoolProperty(
+		name        = "Deforming",
+		description = "Re-export geometry for every motion blur subframe (\"Transform\" motion blur sampling)",
+		default     = False
+	)
+
 
 ##     ## ########  ######  ##     ##
 ###   ### ##       ##    ## ##     ##
@@ -817,6 +823,39 @@ class VRayDR(bpy.types.PropertyGroup):
 		default     = 0
 	)
 
+	probeHosts = bpy.props.BoolProperty(
+		name        = "Check Hosts",
+		description = "Check render hosts reachability before rendering and order them by response time",
+		default     = False
+	)
+
+	probeTimeout = bpy.props.FloatProperty(
+		name        = "Timeout",
+		description = "Host connection timeout (seconds)",
+		min         = 0.05,
+		max         = 10.0,
+		precision   = 2,
+		default     = 0.5
+	)
+
+	probeCacheTime = bpy.props.IntProperty(
+		name        = "Cache Time",
+		description = "Reuse host check results for this time (seconds)",
+		min         = 0,
+		max         = 3600,
+		default     = 60
+	)
+
+	probeUnreachable = bpy.props.EnumProperty(
+		name        = "Unreachable Hosts",
+		description = "What to do with unreachable hosts",
+		items = (
+			('SKIP', "Skip", "Don't pass unreachable hosts to V-Ray"),
+			('LAST', "Last", "Pass unreachable hosts after the reachable ones"),
+		),
+		default = 'SKIP'
+	)
+
 
 ########  ########  ######   ####  ######  ######## ########     ###    ######## ####  #######  ##    ##
 ##     ## ##       ##    ##   ##  ##    ##    ##    ##     ##   ## ##      ##     ##  ##     ## ###   ##
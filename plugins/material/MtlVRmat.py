@@ -23,6 +23,7 @@
 #
 
 import os
+import tempfile
 
 from pprint import pprint
 
@@ -38,10 +39,40 @@ from vb30.debug import Debug
 
 from vb30.lib import ExportUtils
 from vb30.lib import PluginUtils
+from vb30.lib import SysUtils
+from vb30.lib import MatLibUtils
 
 PluginUtils.loadPluginOnModule(globals(), __name__)
 
 
+def GetLibraryIndex():
+    MatLibUtils.LibraryIndex.setCacheDir(os.path.join(SysUtils.GetUserCacheDir(), "matlib"))
+    return MatLibUtils.LibraryIndex
+
+
+# Parses only the requested material and its dependencies
+# extracted with the library index; parses the whole file
+# if material is not indexed
+#
+def ParseLibraryMaterial(filePath, mtlName):
+    libraryIndex = GetLibraryIndex()
+
+    parseFunc = ParseVrscene if filePath.endswith(".vrscene") else ParseVrmat
+
+    # Unique file per extraction, so concurrent parses don't overwrite each other
+    fd, extractFilepath = tempfile.mkstemp(prefix="vb30_matlib_", suffix=os.path.splitext(filePath)[1])
+    os.close(fd)
+    try:
+        if libraryIndex.extractMaterial(filePath, mtlName, extractFilepath):
+            return parseFunc(extractFilepath)
+    except Exception as e:
+        Debug("Material library index error: %s" % e, msgType='ERROR')
+    finally:
+        os.remove(extractFilepath)
+
+    return parseFunc(filePath)
+
+
 class VRayMaterialNameMenu(bpy.types.Menu):
     bl_label = "Select Material Name"
     bl_idname = "VRayMaterialNameMenu"
@@ -104,10 +135,14 @@ class VRayGetMaterialName(bpy.types.Operator):
             Debug.PrintError("File doesn't exist!")
             return {'CANCELLED'}
 
-        if filePath.endswith(".vrscene"):
-            VRayMaterialNameMenu.ma_list = GetMaterialsNames(filePath)
-        else:
-            VRayMaterialNameMenu.ma_list = GetXMLMaterialsNames(filePath)
+        try:
+            VRayMaterialNameMenu.ma_list = GetLibraryIndex().getMaterialNames(filePath)
+        except Exception as e:
+            Debug("Material library index error: %s" % e, msgType='ERROR')
+            if filePath.endswith(".vrscene"):
+                VRayMaterialNameMenu.ma_list = GetMaterialsNames(filePath)
+            else:
+                VRayMaterialNameMenu.ma_list = GetXMLMaterialsNames(filePath)
 
         bpy.ops.wm.call_menu(name=VRayMaterialNameMenu.bl_idname)
 
@@ -152,13 +187,11 @@ class VRayMaterialExpand(bpy.types.Operator):
             return {'CANCELLED'}
 
         namePrefix  = ""
-        vrsceneDict = []
-        if filePath.endswith(".vrscene"):
-            vrsceneDict = ParseVrscene(filePath)
-        else:
-            vrsceneDict = ParseVrmat(filePath)
+        if not filePath.endswith(".vrscene"):
             namePrefix  = "/"
 
+        vrsceneDict = ParseLibraryMaterial(filePath, MtlVRmat.mtlname)
+
         # Preview data from the file
         #
         # for pluginDesc in vrsceneDict:
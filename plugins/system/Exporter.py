@@ -61,6 +61,17 @@ class VRayExporterSetBinary(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class VRayExporterRescanBinary(bpy.types.Operator):
+    bl_idname      = "vray.rescan_vray_std"
+    bl_label       = "Rescan"
+    bl_description = "Clear cached V-Ray Standalone location and search again"
+
+    def execute(self, context):
+        SysUtils.InvalidateDiscoveryCache()
+        SysUtils.GetVRayStandalonePath()
+        return {'FINISHED'}
+
+
 class VRayExporterPreferences(bpy.types.AddonPreferences):
     bl_idname = "vb30"
 
@@ -81,6 +92,14 @@ class VRayExporterPreferences(bpy.types.AddonPreferences):
 
         layout.label(text="Exporter revision: %s" % version.VERSION)
 
+        vrayPath = SysUtils.GetVRayStandalonePath()
+        split = layout.split(percentage=0.8)
+        if vrayPath:
+            split.column().label(text="V-Ray Standalone: %s %s" % (vrayPath, SysUtils.GetVRayStandaloneVersion()))
+        else:
+            split.column().label(text="V-Ray Standalone is not found!", icon='ERROR')
+        split.column().operator('vray.rescan_vray_std', icon='FILE_REFRESH')
+
         layout.prop(self, "detect_vray")
         if not self.detect_vray:
             vrayStds = SysUtils.GetVRayStandalones()
@@ -178,6 +197,37 @@ class VRayExporter(bpy.types.PropertyGroup):
         default = True
     )
 
+    geometry_cache = bpy.props.BoolProperty(
+        name = "Instancer Geometry Cache",
+        description = "Write unchanged Bulk Instancer geometry only once into a shared content addressed cache (not used with DR)",
+        default = False
+    )
+
+    geometry_cache_dir = bpy.props.StringProperty(
+        name = "Geometry Cache Directory",
+        subtype = 'DIR_PATH',
+        description = "Geometry cache directory (user cache directory if empty)",
+        default = ""
+    )
+
+    light_shapes = bpy.props.EnumProperty(
+        name = "Light Shapes",
+        description = "Draw V-Ray light shapes in the viewport",
+        items = (
+            ('NONE',     "None",     "Don't draw light shapes"),
+            ('ACTIVE',   "Active",   "Draw shape of the active light"),
+            ('SELECTED', "Selected", "Draw shapes of the selected lights"),
+            ('ALL',      "All",      "Draw shapes of all visible lights"),
+        ),
+        default = 'ACTIVE'
+    )
+
+    use_python_instancer = bpy.props.BoolProperty(
+        name = "Bulk Instancer",
+        description = "Export particles and dupli groups of objects with \"Use Instancer\" as a single Instancer2 per source",
+        default = False
+    )
+
     use_smoke = bpy.props.BoolProperty(
         name = "Export Smoke",
         description = "Render smoke",
@@ -190,6 +240,34 @@ class VRayExporter(bpy.types.PropertyGroup):
         default = False
     )
 
+    camera_loop_split = bpy.props.BoolProperty(
+        name = "Export Once",
+        description = "Export the scene once and render every \"Camera Loop\" camera as a separate job from a small camera override file",
+        default = False
+    )
+
+    use_render_layers = bpy.props.BoolProperty(
+        name = "Render Layers",
+        description = "Export objects of all enabled render layers once and render each render layer from a small override file including the shared scene",
+        default = False
+    )
+
+    render_layers_processes = bpy.props.IntProperty(
+        name = "Concurrent Renders",
+        description = "Number of V-Ray processes rendering render layers at the same time",
+        min = 1,
+        soft_max = 8,
+        default = 1
+    )
+
+    camera_loop_processes = bpy.props.IntProperty(
+        name = "Concurrent Renders",
+        description = "Number of V-Ray processes rendering \"Camera Loop\" cameras at the same time",
+        min = 1,
+        soft_max = 8,
+        default = 2
+    )
+
     auto_meshes = bpy.props.BoolProperty(
         name = "Re-Export Meshes",
         description = "Re-Export meshes",
@@ -202,6 +280,26 @@ class VRayExporter(bpy.types.PropertyGroup):
         default = False
     )
 
+    log_categories = bpy.props.EnumProperty(
+        name = "Log Categories",
+        description = "Write debug messages for these categories even if \"Debug\" is disabled",
+        options = {'ENUM_FLAG'},
+        items = (
+            ('STREAM',   "Stream",   "Export files"),
+            ('SETTINGS', "Settings", "Plugin settings"),
+            ('NODES',    "Nodes",    "Node trees"),
+            ('DR',       "DR",       "Distributed rendering assets"),
+            ('PROCESS',  "Process",  "Renderer process"),
+        ),
+        default = set()
+    )
+
+    log_filepath = bpy.props.StringProperty(
+        name = "Log File",
+        subtype = 'FILE_PATH',
+        description = "Write export log to this file instead of the console"
+    )
+
     output = bpy.props.EnumProperty(
         name = "Exporting Directory",
         description = "Exporting directory",
@@ -241,6 +339,29 @@ class VRayExporter(bpy.types.PropertyGroup):
         default     = True
     )
 
+    preview_delay = bpy.props.IntProperty(
+        name        = "Preview Delay",
+        description = "Coalesce material preview requests arriving within this time window (ms)",
+        min         = 0,
+        max         = 5000,
+        soft_max    = 1000,
+        default     = 200
+    )
+
+    preview_cache = bpy.props.BoolProperty(
+        name        = "Preview Cache",
+        description = "Reuse previously rendered preview images for unchanged materials",
+        default     = True
+    )
+
+    preview_cache_size = bpy.props.IntProperty(
+        name        = "Preview Cache Size",
+        description = "Maximum size of the preview images cache (MB)",
+        min         = 1,
+        soft_max    = 1024,
+        default     = 256
+    )
+
     useSeparateFiles = bpy.props.BoolProperty(
         name        = "Separate Files",
         description = "Export plugins to separate files",
@@ -280,18 +401,61 @@ class VRayExporter(bpy.types.PropertyGroup):
         default = 'NONE'
     )
 
+    motion_blur_sampling = bpy.props.EnumProperty(
+        name = "Motion Blur Sampling",
+        description = "What to export for motion blur subframes",
+        items = (
+            ('FULL',      "Full",      "Export the whole scene for every subframe"),
+            ('TRANSFORM', "Transform", "Export camera and moving object transforms only; geometry is re-exported only for objects marked as \"Deforming\""),
+        ),
+        default = 'FULL'
+    )
+
     draft = bpy.props.BoolProperty(
         name = "Draft Render",
         description = "Render with low settings",
         default = False
     )
 
+    draft_texture_size = bpy.props.EnumProperty(
+        name = "Draft Texture Size",
+        description = "Use downscaled texture copies for draft renders",
+        items = (
+            ('NONE', "Original", "Use original textures"),
+            ('1024', "1K",       "Downscale textures to 1024 pixels max"),
+            ('2048', "2K",       "Downscale textures to 2048 pixels max"),
+        ),
+        default = '1024'
+    )
+
     select_node_preview = bpy.props.BoolProperty(
         name = "Selected node preview",
         description = "Enable material preview of selected node in node editor",
         default = False
     )
 
+    cost_check = bpy.props.BoolProperty(
+        name = "Check Scene Cost",
+        description = "Estimate scene cost before export and warn if it exceeds the thresholds",
+        default = False
+    )
+
+    cost_max_memory = bpy.props.FloatProperty(
+        name = "Max. Memory",
+        description = "Warn if estimated geometry and textures memory exceeds this value (GB); 0 - no limit",
+        min = 0.0,
+        soft_max = 256.0,
+        precision = 1,
+        default = 16.0
+    )
+
+    cost_max_polygons = bpy.props.IntProperty(
+        name = "Max. Polygons",
+        description = "Warn if polygon count exceeds this value (millions); 0 - no limit",
+        min = 0,
+        default = 0
+    )
+
     image_to_blender = bpy.props.BoolProperty(
         name = "Image To Blender",
         description = "Pass image to Blender on render end (EXR file format is used)",
@@ -524,6 +688,20 @@ class VRayExporter(bpy.types.PropertyGroup):
         default = 'ERROR'
     )
 
+    zmq_warm_start = bpy.props.BoolProperty(
+        name = "Warm Start",
+        description = "Start local server on file load or when switching to V-Ray engine",
+        default = False
+    )
+
+    zmq_idle_timeout = bpy.props.IntProperty(
+        name = "Idle Timeout",
+        description = "Shut down local server after this many minutes without rendering (0 - never)",
+        min = 0,
+        max = 1440,
+        default = 0
+    )
+
     vfb_global_preset_file_use = bpy.props.BoolProperty(
         name = "Use Global Preset File",
         description = "Use VFB global preset file",
@@ -608,6 +786,7 @@ def GetRegClasses():
         VRayExporter,
         VRayExporterPreferences,
         VRayExporterSetBinary,
+        VRayExporterRescanBinary,
     )
 
 
@@ -47,8 +47,26 @@ PARAMS = (
 
 
 def stereoRigUpdate(self, context):
-	# Dirty hack to update stereo rig drivers
-	context.scene.frame_set(context.scene.frame_current)
+	# Set the values rig drivers evaluate to and tag only the rig objects;
+	# frame_set() here would re-evaluate the whole scene
+	angle  = math.radians(self.CalcAngle(self))
+	offset = self.stereo_base / 2
+
+	for camName, sign in ((self.LeftCam, -1.0), (self.RightCam, 1.0)):
+		ob = bpy.data.objects.get(camName)
+		if ob is None:
+			continue
+
+		ob.location[0]       = sign * offset
+		ob.rotation_euler[1] = sign * angle
+		ob.hide              = not self.show_cams
+		ob.data.show_limits  = self.show_limits
+		ob.update_tag({'OBJECT'})
+
+	target = bpy.data.objects.get(self.TargetCam)
+	if target is not None:
+		target.location[2] = -self.stereo_distance
+		target.update_tag({'OBJECT'})
 
 
 class CameraStereoscopic(bpy.types.PropertyGroup):
@@ -22,6 +22,7 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import copy
 import os
 
 import bpy
@@ -67,6 +68,117 @@ PresetTypePlugins = {
     ),
 }
 
+#### ##    ## ########  ######## ##     ##
+ ##  ###   ## ##     ## ##        ##   ##
+ ##  ####  ## ##     ## ##         ## ##
+ ##  ## ## ## ##     ## ######      ###
+ ##  ##  #### ##     ## ##         ## ##
+ ##  ##   ### ##     ## ##        ##   ##
+#### ##    ## ########  ######## ##     ##
+
+# Caches preset directory listings and parsed presets;
+# directories and files are re-read only when their mtime changes
+#
+class VRayPresetIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # directory -> (mtime, [(filename, filepath), ...])
+        self.dirs = {}
+
+        # filepath -> (mtime, size, vrsceneDict)
+        self.presets = {}
+
+        # filepath -> [(pluginID, [(attrName, attrValue), ...]), ...]
+        self.settings = {}
+
+        # pluginID -> {attrName : attrDesc}
+        self.paramDescs = {}
+
+    def getFiles(self, directory):
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            self.dirs.pop(directory, None)
+            return []
+
+        cached = self.dirs.get(directory)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        files = [(f, os.path.join(directory, f))
+                 for f in os.listdir(directory)
+                 if not f.startswith(".") and os.path.splitext(f)[1].lower() == ".vrscene"]
+
+        self.dirs[directory] = (mtime, files)
+
+        return files
+
+    def getPreset(self, filepath):
+        st = os.stat(filepath)
+
+        cached = self.presets.get(filepath)
+        if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+            return cached[2]
+
+        vrsceneDict = ParseVrscene(filepath)
+
+        self.presets[filepath] = (st.st_mtime, st.st_size, vrsceneDict)
+        self.settings.pop(filepath, None)
+
+        return vrsceneDict
+
+    def getParamDescs(self, pluginID, pluginModule):
+        paramDescs = self.paramDescs.get(pluginID)
+        if paramDescs is None:
+            paramDescs = {attrDesc['attr'] : attrDesc for attrDesc in pluginModule.PluginParams}
+            self.paramDescs[pluginID] = paramDescs
+        return paramDescs
+
+    # Returns settings preset mapped to attribute descriptors:
+    # only known plugins and attributes, values converted to property types
+    #
+    def getSettings(self, filepath):
+        vrsceneDict = self.getPreset(filepath)
+
+        settings = self.settings.get(filepath)
+        if settings is not None:
+            return settings
+
+        settings = []
+        for pluginDesc in vrsceneDict:
+            pluginID    = pluginDesc['ID']
+            pluginAttrs = pluginDesc['Attributes']
+
+            pluginModule = PLUGINS_ID.get(pluginID)
+            if pluginModule is None:
+                continue
+
+            paramDescs = self.getParamDescs(pluginID, pluginModule)
+
+            attrs = []
+            for attrName in pluginAttrs:
+                attrDesc = paramDescs.get(attrName)
+                if attrDesc is None:
+                    continue
+
+                attrValue = pluginAttrs[attrName]
+                if attrDesc['type'] == 'ENUM':
+                    attrValue = str(attrValue)
+
+                attrs.append((attrName, attrValue))
+
+            settings.append((pluginID, attrs))
+
+        self.settings[filepath] = settings
+
+        return settings
+
+
+PresetIndex = VRayPresetIndex()
+
+
 ##     ## ######## ##    ## ##     ##    ########     ###     ######  ########
 ###   ### ##       ###   ## ##     ##    ##     ##   ## ##   ##    ## ##
 #### #### ##       ####  ## ##     ##    ##     ##  ##   ##  ##       ##
@@ -79,19 +191,12 @@ class VRayPresetMenuBase(bpy.types.Menu):
     preset_operator = None
 
     def path_menu(self, searchpaths):
-        filter_ext = lambda ext: ext.lower() == ".vrscene"
-
-        if not searchpaths:
-            self.layout.label("* No Preset Data *")
-
         files = []
         for directory in searchpaths:
-            files.extend([(f, os.path.join(directory, f))
-                          for f in os.listdir(directory)
-                          if (not f.startswith("."))
-                          if ((filter_ext is None) or
-                              (filter_ext(os.path.splitext(f)[1])))
-                          ])
+            files.extend(PresetIndex.getFiles(directory))
+
+        if not files:
+            self.layout.label("* No Preset Data *")
 
         files.sort()
 
@@ -109,10 +214,8 @@ class VRayPresetMenuBase(bpy.types.Menu):
             os.path.join(SysUtils.GetUserConfigDir(), "presets", self.preset_subdir),
         }
 
-        paths = []
-        for path in presetPaths:
-            if os.path.exists(path):
-                paths.append(path)
+        # Missing directories are skipped by the index
+        paths = sorted(presetPaths)
 
         if hasattr(self, 'menu_item_save') and self.menu_item_save:
             op = self.layout.operator('vray.export_asset', text="Save Selected", icon='FILE_TICK')
@@ -142,7 +245,7 @@ class VRayPresetExecuteBase:
         options     = {'SKIP_SAVE'},
     )
 
-    def _execute(self, context, vrsceneDict):
+    def _execute(self, context, filepath):
         return {'FINISHED'}
 
     def execute(self, context):
@@ -156,40 +259,22 @@ class VRayPresetExecuteBase:
         #
         debug.PrintInfo('Applying preset from "%s"' % filepath)
 
-        vrsceneDict = ParseVrscene(filepath)
-
-        return self._execute(context, vrsceneDict)
+        return self._execute(context, filepath)
 
 
 class VRayPresetApply(VRayPresetExecuteBase, bpy.types.Operator):
     bl_idname = "vray.preset_apply"
     bl_label = "Apply V-Ray preset"
 
-    def _execute(self, context, vrsceneDict):
-        for pluginDesc in vrsceneDict:
-            pluginID    = pluginDesc['ID']
-            pluginName  = pluginDesc['Name']
-            pluginAttrs = pluginDesc['Attributes']
-
-            pluginModule = PLUGINS_ID.get(pluginID)
-            if pluginModule is None:
-                continue
-
+    def _execute(self, context, filepath):
+        for pluginID, attrs in PresetIndex.getSettings(filepath):
             if not hasattr(context.scene.vray, pluginID):
                 # TODO: Add warning?
                 continue
 
             propGroup = getattr(context.scene.vray, pluginID)
 
-            for attrName in pluginAttrs:
-                attrDesc  = NodesImport.getParamDesc(pluginModule.PluginParams, attrName)
-                if attrDesc is None:
-                    continue
-
-                attrValue = pluginAttrs[attrName]
-                if attrDesc['type'] == 'ENUM':
-                    attrValue = str(attrValue)
-
+            for attrName, attrValue in attrs:
                 setattr(propGroup, attrName, attrValue)
 
         return {'FINISHED'}
@@ -199,10 +284,13 @@ class VRayPresetApplyNode(VRayPresetExecuteBase, bpy.types.Operator):
     bl_idname = "vray.preset_node_apply"
     bl_label = "Apply V-Ray node preset"
 
-    def _execute(self, context, vrsceneDict):
+    def _execute(self, context, filepath):
         space = context.space_data
         ntree = space.edit_tree
 
+        # Node import could modify descriptions
+        vrsceneDict = copy.deepcopy(PresetIndex.getPreset(filepath))
+
         # Deselect before import
         NodesTools.deselectNodes(ntree)
 
@@ -256,6 +344,16 @@ class VRayPresetApplyNode(VRayPresetExecuteBase, bpy.types.Operator):
         return {'FINISHED'}
 
 
+class VRayPresetRefresh(bpy.types.Operator):
+    bl_idname      = "vray.preset_refresh"
+    bl_label       = "Refresh Presets"
+    bl_description = "Re-read preset directories and preset files"
+
+    def execute(self, context):
+        PresetIndex.clear()
+        return {'FINISHED'}
+
+
    ###    ########  ########           ##    ########  ######## ##     ##  #######  ##     ## ########
   ## ##   ##     ## ##     ##         ##     ##     ## ##       ###   ### ##     ## ##     ## ##
  ##   ##  ##     ## ##     ##        ##      ##     ## ##       #### #### ##     ## ##     ## ##
@@ -436,6 +534,7 @@ def PresetBase(layout, menuName, menuOperator):
     row.menu(menuName, text=menuClass.bl_label)
     row.operator(menuOperator, text="", icon="ZOOMIN")
     row.operator(menuOperator, text="", icon="ZOOMOUT").remove_active = True
+    row.operator('vray.preset_refresh', text="", icon='FILE_REFRESH')
     layout.separator()
 
 
@@ -456,6 +555,8 @@ class VRayNodeTemplatesSubMenus(bpy.types.Menu):
         self.layout.menu("VRayPresetMenuNodeTexture",  icon='TEXTURE')
         self.layout.menu("VRayPresetMenuNodeRenderChannel", icon='SCENE_DATA')
         self.layout.menu("VRayPresetMenuNodeEffects", icon='GHOST_ENABLED')
+        self.layout.separator()
+        self.layout.operator('vray.preset_refresh', icon='FILE_REFRESH')
 
 
 def VRayNodeTemplatesMenu(self, context):
@@ -593,6 +694,7 @@ def GetRegClasses():
 
         VRayPresetApply,
         VRayPresetApplyNode,
+        VRayPresetRefresh,
 
         VRayPresetMenuNodeEffects,
         VRayPresetMenuNodeRenderChannel,
@@ -26,6 +26,7 @@ import bpy
 
 from vb30.lib import LibUtils
 from vb30.lib import DrawUtils
+from vb30.lib import NetworkUtils
 from vb30     import plugins
 
 
@@ -73,6 +74,8 @@ PanelGroups = {
     '4' : (
         'VRAY_RP_exporter',
         'VRAY_RP_dr',
+        'VRAY_RP_SceneCost',
+        'VRAY_RP_SceneAnalysis',
         'VRAY_RP_SettingsSystem',
         'VRAY_RP_SettingsVFB',
     ),
@@ -502,6 +505,17 @@ class VRayListDR(bpy.types.UIList):
         port_override = ":%s" % item.port if item.port_override else ""
 
         layout.label("%s [%s%s]" % (item.name, item.address, port_override))
+
+        if data.probeHosts:
+            port = item.port if item.port_override else data.port
+            result = NetworkUtils.Prober.getResult(item.address, port)
+            if result is None:
+                layout.label("")
+            elif result[1] is None:
+                layout.label("Unreachable", icon='ERROR')
+            else:
+                layout.label("%i ms" % int(result[1] * 1000.0))
+
         layout.prop(item, 'use', text="")
 
 
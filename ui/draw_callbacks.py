@@ -28,8 +28,6 @@ import bpy
 import bgl
 import mathutils
 
-from bpy_extras.view3d_utils import location_3d_to_region_2d
-
 from vb30.lib import LibUtils
 
 
@@ -91,95 +89,219 @@ lamp_color = ui_theme.view_3d.lamp
 lamp_color_off = (0.0,0.0,0.0,1.0)
 
 
-def vray_draw_point(p, mult, tm=mathutils.Matrix.Identity(4)):
-    _p = mathutils.Vector((p[0], p[1], p[2])) * mult
-    _p3d = tm * _p
-    _p2d = location_3d_to_region_2d(bpy.context.region, bpy.context.space_data.region_3d, _p3d)
-    if _p2d:
-        bgl.glVertex2f(*_p2d)
+# Light shapes are drawn in 3D space (POST_VIEW) from display lists with
+# world space lines; list is compiled only when shape parameters or object
+# transform change. Visible lights of the same color are drawn with
+# a single glCallLists().
+#
+# ob.as_pointer() -> (shapeKey, transform, displayList, center, radius)
+ShapeCache = {}
+
+
+def GetLightShapeKey(ob):
+    la = ob.data
+
+    if la.type == 'POINT':
+        if la.vray.omni_type == 'SPHERE':
+            return ('SPHERE', la.vray.LightSphere.radius)
+    elif la.type == 'SUN':
+        if la.vray.direct_type == 'DIRECT':
+            LightDirectMax = la.vray.LightDirectMax
+            return ('DIRECT', LightDirectMax.shape_type, LightDirectMax.fallsize, la.distance)
+
+    return None
+
+
+def AddShapeLines(verts, shape, mult, tm):
+    points = [(tm * (mathutils.Vector(p) * mult))[:] for p in shape]
+    for i in range(len(points)):
+        verts.append(points[i])
+        verts.append(points[(i + 1) % len(points)])
+
+
+def AddConnectLines(verts, shape, mult, top_tm, bottom_tm):
+    for p in shape:
+        p = mathutils.Vector(p) * mult
+        verts.append((top_tm * p)[:])
+        verts.append((bottom_tm * p)[:])
+
 
+def GetLightShapeVertices(ob, shapeKey):
+    tm    = ob.matrix_world
+    verts = []
 
-def vray_draw_shape(shape, mult, tm=mathutils.Matrix.Identity(4)):
+    if shapeKey[0] == 'SPHERE':
+        r = shapeKey[1]
+
+        AddShapeLines(verts, CircleShape, r, tm)
+        AddShapeLines(verts, CircleShape, r, tm * mathutils.Matrix.Rotation(math.radians(90.0), 4, 'X'))
+        AddShapeLines(verts, CircleShape, r, tm * mathutils.Matrix.Rotation(math.radians(90.0), 4, 'Y'))
+
+    elif shapeKey[0] == 'DIRECT':
+        shapeType, r, distance = shapeKey[1:]
+
+        top_tm    = tm
+        bottom_tm = tm * mathutils.Matrix.Translation((0.0, 0.0, -distance))
+
+        if shapeType == '0':
+            AddShapeLines(verts, CircleShape, r, top_tm)
+            AddShapeLines(verts, CircleShape, r, bottom_tm)
+            AddConnectLines(verts, RectangleShape2, r, top_tm, bottom_tm)
+        else:
+            AddShapeLines(verts, RectangleShape, r, top_tm)
+            AddShapeLines(verts, RectangleShape, r, bottom_tm)
+            AddConnectLines(verts, RectangleShape, r, top_tm, bottom_tm)
+
+    return verts
+
+
+def GetBoundingSphere(verts):
+    bbMin = [min(v[i] for v in verts) for i in range(3)]
+    bbMax = [max(v[i] for v in verts) for i in range(3)]
+
+    center = (mathutils.Vector(bbMin) + mathutils.Vector(bbMax)) * 0.5
+    radius = (mathutils.Vector(bbMax) - center).length
+
+    return center, radius
+
+
+def CompileDisplayList(verts):
+    displayList = bgl.glGenLists(1)
+    bgl.glNewList(displayList, bgl.GL_COMPILE)
     bgl.glBegin(bgl.GL_LINES)
-    i = 0
-    while i < len(shape):
-        ci = i
-        ni = 0 if i == len(shape) - 1 else i + 1
-        vray_draw_point(shape[ci], mult, tm)
-        vray_draw_point(shape[ni], mult, tm)
-        i += 1
+    for v in verts:
+        bgl.glVertex3f(*v)
     bgl.glEnd()
+    bgl.glEndList()
+    return displayList
 
 
-def vray_draw_light_sphere_shape(ob):
-    r = ob.data.vray.LightSphere.radius
-
-    vray_draw_shape(CircleShape, r, ob.matrix_world)
-    vray_draw_shape(CircleShape, r, ob.matrix_world * mathutils.Matrix.Rotation(math.radians(90.0), 4, 'X'))
-    vray_draw_shape(CircleShape, r, ob.matrix_world * mathutils.Matrix.Rotation(math.radians(90.0), 4, 'Y'))
-
-
-def vray_draw_light_direct_shape(ob):
-    r = ob.data.vray.LightDirectMax.fallsize
-
-    top_tm    = ob.matrix_world
-    bottom_tm = ob.matrix_world * mathutils.Matrix.Translation((0.0, 0.0, -ob.data.distance))
-
-    if ob.data.vray.LightDirectMax.shape_type == '0':
-        vray_draw_shape(CircleShape, r, top_tm)
-        vray_draw_shape(CircleShape, r, bottom_tm)
-
-        bgl.glBegin(bgl.GL_LINES)
-        vray_draw_point(RectangleShape2[0], r, top_tm)
-        vray_draw_point(RectangleShape2[0], r, bottom_tm)
-        vray_draw_point(RectangleShape2[1], r, top_tm)
-        vray_draw_point(RectangleShape2[1], r, bottom_tm)
-        vray_draw_point(RectangleShape2[2], r, top_tm)
-        vray_draw_point(RectangleShape2[2], r, bottom_tm)
-        vray_draw_point(RectangleShape2[3], r, top_tm)
-        vray_draw_point(RectangleShape2[3], r, bottom_tm)
-        bgl.glEnd()
-    else:
-        vray_draw_shape(RectangleShape, r, top_tm)
-        vray_draw_shape(RectangleShape, r, bottom_tm)
-
-        bgl.glBegin(bgl.GL_LINES)
-        vray_draw_point(RectangleShape[0], r, top_tm)
-        vray_draw_point(RectangleShape[0], r, bottom_tm)
-        vray_draw_point(RectangleShape[1], r, top_tm)
-        vray_draw_point(RectangleShape[1], r, bottom_tm)
-        vray_draw_point(RectangleShape[2], r, top_tm)
-        vray_draw_point(RectangleShape[2], r, bottom_tm)
-        vray_draw_point(RectangleShape[3], r, top_tm)
-        vray_draw_point(RectangleShape[3], r, bottom_tm)
-        bgl.glEnd()
-
-
-def vray_draw_light_shape():
-    if not bpy.context:
-        return
-    ob = bpy.context.active_object
-    if not ob:
+# Must be called from the draw callback (with GL context)
+#
+def FreeShapeEntry(entry):
+    bgl.glDeleteLists(entry[2], 1)
+
+
+def GetLightShape(ob, cache):
+    shapeKey = GetLightShapeKey(ob)
+    if shapeKey is None:
+        return None
+
+    key = ob.as_pointer()
+    tm  = tuple(v for row in ob.matrix_world for v in row)
+
+    entry = ShapeCache.get(key)
+    if entry is None or entry[0] != shapeKey or entry[1] != tm:
+        if entry is not None:
+            FreeShapeEntry(entry)
+            del ShapeCache[key]
+        verts = GetLightShapeVertices(ob, shapeKey)
+        if not verts:
+            return None
+        center, radius = GetBoundingSphere(verts)
+        entry = (shapeKey, tm, CompileDisplayList(verts), center, radius)
+
+    cache[key] = entry
+
+    return entry
+
+
+# Frustum planes (normal, distance) from the view projection matrix
+#
+def GetFrustumPlanes(perspectiveMatrix):
+    rows = [perspectiveMatrix[i] for i in range(4)]
+
+    planes = []
+    for i in range(3):
+        for sign in (1.0, -1.0):
+            p = rows[3] + rows[i] * sign
+            n = p.xyz.length
+            if n > 0.0:
+                planes.append((p.xyz / n, p.w / n))
+
+    return planes
+
+
+def IsSphereVisible(planes, center, radius):
+    for normal, d in planes:
+        if normal.dot(center) + d < -radius:
+            return False
+    return True
+
+
+def GetShapeLights(context):
+    scene = context.scene
+
+    mode = scene.vray.Exporter.light_shapes
+
+    if mode == 'ACTIVE':
+        ob = context.active_object
+        return [ob] if ob and ob.type == 'LAMP' else []
+
+    lights = []
+    for ob in scene.objects:
+        if ob.type != 'LAMP':
+            continue
+        if mode == 'SELECTED' and not ob.select:
+            continue
+        if not ob.is_visible(scene):
+            continue
+        lights.append(ob)
+
+    return lights
+
+
+def vray_draw_light_shapes():
+    global ShapeCache
+
+    context = bpy.context
+    if not context or not context.scene:
         return
-    if ob.type not in {'LAMP'}:
+    if context.scene.vray.Exporter.light_shapes == 'NONE':
         return
 
-    la = ob.data
+    region3d = context.region_data
+    planes   = GetFrustumPlanes(region3d.perspective_matrix) if region3d else []
+
+    # Display lists batched by "enabled" state (line color)
+    batches = {
+        True  : [],
+        False : [],
+    }
+
+    cache = {}
+    for ob in GetShapeLights(context):
+        entry = GetLightShape(ob, cache)
+        if entry is None:
+            continue
+
+        shapeKey, tm, displayList, center, radius = entry
+        if not IsSphereVisible(planes, center, radius):
+            continue
+
+        VRayLight = LibUtils.GetLightPropGroup(ob.data)
 
-    VRayLight = LibUtils.GetLightPropGroup(la)
+        batches[bool(VRayLight.enabled)].append(displayList)
 
-    bgl.glEnable(bgl.GL_POINT_SMOOTH)
+    # Drop removed / hidden lights
+    for key, entry in ShapeCache.items():
+        if key not in cache:
+            FreeShapeEntry(entry)
+    ShapeCache = cache
+
+    if not batches[True] and not batches[False]:
+        return
+
+    bgl.glEnable(bgl.GL_BLEND)
     bgl.glBlendFunc(bgl.GL_SRC_ALPHA, bgl.GL_ONE_MINUS_SRC_ALPHA)
 
-    col = lamp_color if VRayLight.enabled else lamp_color_off
-    bgl.glColor4f(*col)
+    for enabled, displayLists in batches.items():
+        if not displayLists:
+            continue
 
-    if la.type == 'POINT':
-        if la.vray.omni_type == 'SPHERE':
-            vray_draw_light_sphere_shape(ob)
-    elif la.type == 'SUN':
-        if la.vray.direct_type == 'DIRECT':
-            vray_draw_light_direct_shape(ob)
+        bgl.glColor4f(*(lamp_color if enabled else lamp_color_off))
+
+        bgl.glCallLists(len(displayLists), bgl.GL_INT, bgl.Buffer(bgl.GL_INT, len(displayLists), displayLists))
 
     # Reset draw
     bgl.glLineWidth(1)
@@ -194,12 +316,12 @@ def register():
     global handlers
 
     def vray_draw_handler_add(cb):
-        handlers.append(bpy.types.SpaceView3D.draw_handler_add(cb, (), 'WINDOW', 'POST_PIXEL'))
+        handlers.append(bpy.types.SpaceView3D.draw_handler_add(cb, (), 'WINDOW', 'POST_VIEW'))
 
     for regClass in RegClasses:
         bpy.utils.register_class(regClass)
 
-    vray_draw_handler_add(vray_draw_light_shape)
+    vray_draw_handler_add(vray_draw_light_shapes)
 
 
 def unregister():
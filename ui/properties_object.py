@@ -401,11 +401,13 @@ class VRayObjectPanelAdvanced(classes.VRayObjectPanel):
 		box = self.layout.box()
 		box.label("Duplication / Particles:")
 		box.prop(VRayObject, 'dupliShowEmitter', text="Force Show Emitter")
+		box.prop(VRayObject, 'use_instancer', text="Use Instancer")
 		box.prop(VRayObject, 'dupliGroupIDOverride', text="Object ID Override")
 
 		box = self.layout.box()
 		box.label("Animation:")
 		box.prop(VRayObject, 'subframes')
+		box.prop(VRayObject, 'motion_blur_deform')
 
 
 def GetRegClasses():
@@ -27,7 +27,7 @@ import sys
 
 import bpy
 
-from vb30.lib import LibUtils, SysUtils, DrawUtils
+from vb30.lib import LibUtils, SysUtils, DrawUtils, CostUtils, AnalyzeUtils
 from vb30.ui  import classes
 from vb30     import plugins, preset, engine, debug
 
@@ -256,6 +256,19 @@ class VRAY_RP_render(classes.VRayRenderPanel):
 			row.prop(rd, "use_lock_interface", text="")
 
 		layout.prop(VRayExporter, 'animation_mode', text="Animation")
+		layout.prop(VRayExporter, 'motion_blur_sampling', text="MB Sampling")
+		if VRayExporter.animation_mode == 'NONE':
+			row = layout.row()
+			row.prop(VRayExporter, 'use_render_layers')
+			sub = row.row()
+			sub.active = VRayExporter.use_render_layers
+			sub.prop(VRayExporter, 'render_layers_processes', text="Processes")
+		if VRayExporter.animation_mode == 'CAMERA_LOOP':
+			row = layout.row()
+			row.prop(VRayExporter, 'camera_loop_split')
+			sub = row.row()
+			sub.active = VRayExporter.camera_loop_split
+			sub.prop(VRayExporter, 'camera_loop_processes', text="Processes")
 		layout.separator()
 
 		if VRayExporter.useSeparateFiles:
@@ -276,6 +289,8 @@ class VRAY_RP_render(classes.VRayRenderPanel):
 			col.prop(VRayExporter, 'customRenderLayers', text="")
 		col.prop(SettingsOptions, 'gi_dontRenderImage')
 		col.prop(VRayExporter, 'draft')
+		if VRayExporter.draft:
+			col.prop(VRayExporter, 'draft_texture_size', text="Textures")
 
 		if context.scene.render.engine == 'VRAY_RENDER_RT':
 			col.prop(VRayExporter, 'select_node_preview')
@@ -541,6 +556,9 @@ class VRAY_RP_exporter(classes.VRayRenderPanel):
 					icon = 'CANCEL'
 
 				box.label(text='ZMQ server status: %s' % stat)
+				latency = engine.ZMQ.get_heartbeat_latency()
+				if stat == 'RUNNING' and latency is not None:
+					box.label(text='Heartbeat latency: %.1f ms' % (latency * 1000.0))
 				if not engine.ZMQ.is_local():
 					box.prop(VRayExporter, 'zmq_address')
 
@@ -550,6 +568,10 @@ class VRAY_RP_exporter(classes.VRayRenderPanel):
 				box.prop(VRayExporter, 'zmq_port')
 				if engine.ZMQ.is_local() and not engine.ZMQ.is_running():
 					box.prop(VRayExporter, 'zmq_log_level')
+				if engine.ZMQ.is_local():
+					row = box.row()
+					row.prop(VRayExporter, 'zmq_warm_start')
+					row.prop(VRayExporter, 'zmq_idle_timeout')
 
 				box.prop(VRayExporter, 'viewport_jpeg_quality', text="Quality")
 
@@ -573,9 +595,17 @@ class VRAY_RP_exporter(classes.VRayRenderPanel):
 		if wide_ui:
 			col = split.column()
 		col.prop(VRayExporter, 'subsurf_to_osd')
+		col.prop(VRayExporter, 'use_python_instancer')
+		if VRayExporter.use_python_instancer:
+			row = layout.row()
+			row.prop(VRayExporter, 'geometry_cache', text="Instancer Geometry Cache")
+			sub = row.row()
+			sub.active = VRayExporter.geometry_cache
+			sub.prop(VRayExporter, 'geometry_cache_dir', text="")
 
 		layout.separator()
 		layout.prop(VRayExporter, 'default_mapping', text="Def. Mapping")
+		layout.prop(VRayExporter, 'light_shapes')
 
 		layout.separator()
 		layout.label(text="V-Ray Frame Buffer:")
@@ -612,6 +642,19 @@ class VRAY_RP_exporter(classes.VRayRenderPanel):
 			col = split.column()
 		col.prop(VRayExporter, 'output_unique', text="Unique Filename")
 
+		layout.separator()
+		layout.label(text="Material Preview:")
+		layout.prop(VRayExporter, 'preview_delay', text="Update Delay (ms)")
+		split = layout.split()
+		col = split.column()
+		col.prop(VRayExporter, 'preview_cache', text="Cache")
+		if wide_ui:
+			col = split.column()
+		sub = col.row()
+		sub.active = VRayExporter.preview_cache
+		sub.prop(VRayExporter, 'preview_cache_size', text="Size (MB)")
+		layout.operator('vray.preview_cache_clear', icon='CANCEL')
+
 		layout.separator()
 		layout.label(text="Run:")
 		split = layout.split()
@@ -622,6 +665,10 @@ class VRAY_RP_exporter(classes.VRayRenderPanel):
 			col = split.column()
 		col.prop(VRayExporter, 'gen_run_file')
 
+		layout.label(text="Log Categories:")
+		layout.row().prop(VRayExporter, 'log_categories')
+		layout.prop(VRayExporter, 'log_filepath')
+
 		if sys.platform == "linux":
 			split = layout.split()
 			col = split.column()
@@ -1215,6 +1262,113 @@ class VRAY_RP_displace(classes.VRayRenderPanel):
 		col.prop(SettingsDefaultDisplacement, 'relative')
 
 
+ ######   #######   ######  ########
+##    ## ##     ## ##    ##    ##
+##       ##     ## ##          ##
+##       ##     ##  ######     ##
+##       ##     ##       ##    ##
+##    ## ##     ## ##    ##    ##
+ ######   #######   ######     ##
+
+class VRAY_RP_SceneCost(classes.VRayRenderPanel):
+	bl_label   = "Scene Cost"
+	bl_options = {'DEFAULT_CLOSED'}
+	bl_panel_groups = PanelGroups
+
+	def draw(self, context):
+		layout = self.layout
+
+		VRayExporter = context.scene.vray.Exporter
+
+		layout.prop(VRayExporter, 'cost_check', text="Check Before Export")
+
+		split = layout.split()
+		col = split.column()
+		col.prop(VRayExporter, 'cost_max_memory', text="Max. Memory (GB)")
+		col = split.column()
+		col.prop(VRayExporter, 'cost_max_polygons', text="Max. Polygons (M)")
+
+		layout.operator('vray.estimate_scene_cost', icon='INFO')
+
+		stats = CostUtils.LastEstimate
+		if not stats:
+			return
+
+		box = layout.box()
+		split = box.split()
+		col = split.column()
+		col.label("Polygons: %i" % stats['polygons'])
+		col.label("Triangles: %i" % stats['triangles'])
+		col.label("Objects: %i" % stats['objects'])
+		col.label("Instances: %i" % stats['instances'])
+		col.label("Lights: %i" % stats['lights'])
+		col = split.column()
+		col.label("Animated: %i" % stats['animated'])
+		col.label("Static: %i" % stats['static'])
+		col.label("Textures: %i" % stats['texture_count'])
+		col.label("Textures Size: %s" % CostUtils.FormatBytes(stats['texture_bytes']))
+		col.label("Geometry Size: %s" % CostUtils.FormatBytes(stats['geometry_bytes']))
+
+		box.label("Estimated Memory: %s" % CostUtils.FormatBytes(stats['memory_bytes']))
+
+		box = layout.box()
+		box.label("Plugins:")
+		for fileType in sorted(stats['plugins']):
+			box.label("  %s: %i" % (fileType, stats['plugins'][fileType]))
+
+		layout.label("Report: %s" % stats['report'])
+
+
+class VRAY_RP_SceneAnalysis(classes.VRayRenderPanel):
+	bl_label   = "Scene File Analysis"
+	bl_options = {'DEFAULT_CLOSED'}
+	bl_panel_groups = PanelGroups
+
+	def draw(self, context):
+		layout = self.layout
+
+		layout.operator('vray.analyze_vrscene', icon='VIEWZOOM')
+
+		report = AnalyzeUtils.LastAnalysis
+		if not report:
+			return
+
+		box = layout.box()
+		box.label("Size: %s in %i files" % (CostUtils.FormatBytes(report['bytes']), len(report['files'])))
+		box.label("Plugins: %i" % report['plugins'])
+		box.label("Attributes: %i animated, %i static" % (report['attributes']['animated'], report['attributes']['static']))
+		box.label("Duplicates: %s" % CostUtils.FormatBytes(report['duplicate_bytes']))
+
+		box = layout.box()
+		box.label("Plugin Types:")
+		types = report['types']
+		for pluginType in sorted(types, key=lambda t: types[t]['bytes'], reverse=True)[:10]:
+			split = box.split(percentage=0.5)
+			split.label("  %s" % pluginType)
+			split.label("%i / %s" % (types[pluginType]['count'], CostUtils.FormatBytes(types[pluginType]['bytes'])))
+
+		box = layout.box()
+		box.label("Largest Plugins:")
+		for item in report['top'][:10]:
+			split = box.split(percentage=0.5)
+			split.label("  %s" % item['name'])
+			split.label(CostUtils.FormatBytes(item['bytes']))
+
+		if report['interpolate_keys']:
+			box = layout.box()
+			box.label("Interpolate Keys:")
+			for item in report['interpolate_keys'][:5]:
+				box.label("  %s: %i" % (item['attr'], item['keys']))
+
+		if report['duplicates']:
+			box = layout.box()
+			box.label("Duplicate Plugins:")
+			for item in report['duplicates'][:5]:
+				box.label("  %s x%i: %s" % (item['type'], item['count'], ", ".join(item['names'][:3])))
+
+		layout.label("Report: %s" % report['report'])
+
+
 ########  ########
 ##     ## ##     ##
 ##     ## ##     ##
@@ -1272,6 +1426,17 @@ class VRAY_RP_dr(classes.VRayRenderPanel):
 		layout.prop(VRayDR, 'limitHosts')
 		layout.separator()
 
+		layout.prop(VRayDR, 'probeHosts')
+		if VRayDR.probeHosts:
+			split = layout.split()
+			col = split.column()
+			col.prop(VRayDR, 'probeTimeout')
+			col.prop(VRayDR, 'probeCacheTime')
+			col = split.column()
+			col.prop(VRayDR, 'probeUnreachable', text="")
+			col.operator('vray.dr_nodes_check', icon='FILE_REFRESH')
+		layout.separator()
+
 		split= layout.split()
 		row= split.row()
 		row.template_list("VRayListDR", "", VRayDR, 'nodes', VRayDR, 'nodes_selected', rows= 3)
@@ -1549,6 +1714,8 @@ def GetRegClasses():
 		VRAY_RP_GI_lc,
 		VRAY_RP_displace,
 		VRAY_RP_dr,
+		VRAY_RP_SceneCost,
+		VRAY_RP_SceneAnalysis,
 		VRAY_RP_SettingsVFB,
 		VRAY_RP_SettingsSystem,
 		VRAY_RP_VRayStereoscopicSettings,